@@ -9,7 +9,7 @@ import sys
 
 from stopwatch import Stopwatch
 
-from app.helpers.dev import is_frozen, configure_pyglet
+from app.helpers.dev import is_frozen, configure_pyglet, configure_tracer
 from app.utils.log import configure_logger
 
 # Start a stopwatch
@@ -22,6 +22,9 @@ configure_logger()
 # Configure pyglet
 configure_pyglet()
 
+# Configure tracer
+configure_tracer()
+
 if is_frozen():
     root_dir = os.path.dirname(os.path.abspath(sys.executable))
 else:
@@ -3,5 +3,11 @@
 FONT_DEFAULT = 'Cruft'
 FONT_MONOTYPE = 'Consola Mono'
 
+# Font name => file in resources/fonts
+FONT_FILES = {
+    FONT_DEFAULT: 'cruft.ttf',
+    FONT_MONOTYPE: 'consolamonobook.ttf'
+}
+
 FONT_SIZE_BUTTON = 12
 FONT_SIZE_LABEL = 12
@@ -9,6 +9,8 @@ KEY_CONFIRM = [
 ]
 
 KEY_SCREENSHOT = [arcade.key.F12]
+KEY_FRAME_TIMES = [arcade.key.F10]
+KEY_TRACE = [arcade.key.F9]
 
 KEY_LEFT = [arcade.key.A, arcade.key.LEFT, arcade.key.NUM_LEFT]
 KEY_RIGHT = [arcade.key.D, arcade.key.RIGHT, arcade.key.NUM_RIGHT]
@@ -12,8 +12,33 @@ LAYER_FADEOUT = 'fadeout'
 LAYER_FADEIN = 'fadein'
 LAYER_EAGLE = 'Eagle'
 LAYER_DOUBLEJUMP = 'DoubleJump'
+LAYER_TUMBLEWEED = 'Tumbleweed'
 
 LAYERS_VOICEOVER = [
     LAYER_FIRST_VOICEOVER,
     LAYER_RANDOM_VOICEOVER,
 ]
+
+# Layers SpriteList.update() has to run on
+LAYERS_DYNAMIC = [
+    LAYER_PLAYER,
+]
+
+# Layers the effects move around, no spatial hash for them
+LAYERS_MOVING = [
+    LAYER_PLAYER,
+    LAYER_CLOUD,
+    LAYER_PARTICLES,
+    LAYER_EAGLE,
+    LAYER_FIRST_VOICEOVER,
+    LAYER_RANDOM_VOICEOVER,
+    LAYER_TUMBLEWEED,
+    LAYER_FADEIN,
+    LAYER_FADEOUT,
+]
+
+# Layers the effects change in place, they are never baked
+LAYERS_CHANGING = [
+    LAYER_BUSH,
+    LAYER_DOUBLEJUMP,
+]
@@ -5,6 +5,10 @@ SETTINGS_DEFAULT_FULLSCREEN = True
 SETTINGS_DEFAULT_VSYNC = True
 SETTINGS_DEFAULT_ANTIALIASING = 4
 SETTINGS_DEFAULT_PARTICLES = 1.0
+SETTINGS_DEFAULT_BAKE_LAYERS = False
+# Milliseconds the effects may take per frame, 0 disables the throttling
+SETTINGS_DEFAULT_EFFECT_BUDGET = 4.0
+SETTINGS_DEFAULT_QUALITY_AUTO = False
 SETTINGS_DEFAULT_SHOW_FPS = False
 SETTINGS_DEFAULT_DEBUG = False
 ANTIALIASING_VALUES = 0, 2, 4, 8, 16
@@ -40,5 +44,11 @@ SETTINGS_DEFAULT_VOLUME_MASTER = 100
 SETTINGS_DEFAULT_SUBTITLE_ENABLED = False
 SETTINGS_DEFAULT_SUBTITLE_SIZE = 18
 
+# Memory budget for decoded sound effects in bytes
+SOUND_BANK_BUDGET = 32 * 1024 * 1024
+
+# Delay of the write-behind of the settings in seconds
+SETTINGS_SAVE_DELAY = 0.5
+
 # Game
 SETTINGS_DEFAULT_RUMBLE = True
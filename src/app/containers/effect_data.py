@@ -2,6 +2,9 @@
 
 import arcade
 
+from app.containers.map_config import MapConfig
+from app.utils.proximitytriggers import ProximityTriggers
+
 
 class EffectData:
     """ Data container for effect setup() method  """
@@ -11,6 +14,8 @@ class EffectData:
             scene: arcade.scene.Scene = None,
             tilemap: arcade.tilemap.tilemap = None,
             root_dir: str = None,
+            map_config: MapConfig = None,
+            triggers: ProximityTriggers = None,
             options: dict = None
     ):
         """
@@ -19,9 +24,13 @@ class EffectData:
         :param scene:
         :param tilemap:
         :param root_dir:
-        :param options:
+        :param map_config:
+        :param triggers:
+        :param options: Mutable state shared by the effects
         """
         self.scene = scene
         self.tilemap = tilemap
         self.root_dir = root_dir
-        self.options = options
+        self.map_config = map_config
+        self.triggers = triggers
+        self.options = options if options is not None else {}
@@ -0,0 +1,45 @@
+""" Data container for a loaded level """
+
+import arcade
+
+from app.containers.map_config import MapConfig
+from app.utils.loadprofiler import LoadProfiler
+
+
+class LevelData:
+    """ Data container for a loaded level """
+
+    def __init__(
+            self,
+            map_name: str = None,
+            map_config: MapConfig = None,
+            tilemap: arcade.TileMap = None,
+            scene: arcade.Scene = None,
+            music: arcade.Sound = None,
+            atmo: arcade.Sound = None,
+            subtitles: dict = None,
+            walls: arcade.SpriteList = None,
+            profiler: LoadProfiler = None
+    ):
+        """
+        Constructor.
+
+        :param map_name:
+        :param map_config:
+        :param tilemap:
+        :param scene:
+        :param music:
+        :param atmo:
+        :param subtitles:
+        :param walls: Physics only collision boxes of the wall layer
+        :param profiler: Measures the load stages until the level is set up
+        """
+        self.map_name = map_name
+        self.map_config = map_config
+        self.tilemap = tilemap
+        self.scene = scene
+        self.music = music
+        self.atmo = atmo
+        self.subtitles = subtitles or {}
+        self.walls = walls
+        self.profiler = profiler or LoadProfiler(map_name)
@@ -0,0 +1,159 @@
+""" Map config record """
+
+CLOUD_MODE_CLOUDS = 'clouds'
+CLOUD_MODE_TEXTURE = 'texture'
+CLOUD_MODES = [
+    CLOUD_MODE_CLOUDS,
+    CLOUD_MODE_TEXTURE
+]
+
+EFFECT_PARTICLES = 'particles'
+EFFECT_TUMBLEWEED = 'tumbleweed'
+
+# Key in maps.json => (attribute, type, default)
+# A default of None means the key is required
+FIELDS = {
+    'music': ('music', str, ''),
+    'musicLoop': ('music_loop', bool, False),
+    'particles': ('particles', bool, False),
+    'cloudSpeed': ('cloud_speed', (int, float), 0),
+    'cloudMode': ('cloud_mode', str, CLOUD_MODE_CLOUDS),
+    'tumbleweed': ('tumbleweed', bool, False),
+    'voiceovers': ('voiceovers', list, None),
+    'sounds': ('sounds', list, []),
+}
+
+
+class MapConfig:
+    """ Validated config of a single map from maps.json """
+
+    __slots__ = (
+        'name',
+        'music',
+        'music_loop',
+        'atmo',
+        'particles',
+        'cloud_speed',
+        'cloud_mode',
+        'tumbleweed',
+        'voiceovers',
+        'sounds'
+    )
+
+    def __init__(
+            self,
+            name: str,
+            music: str = '',
+            music_loop: bool = False,
+            atmo: str = '',
+            particles: bool = False,
+            cloud_speed: float = 0,
+            cloud_mode: str = CLOUD_MODE_CLOUDS,
+            tumbleweed: bool = False,
+            voiceovers: tuple = (1, 1),
+            sounds: tuple = ()
+    ):
+        """
+        Constructor.
+
+        :param name: Map name
+        :param music: Music file in resources/music
+        :param music_loop: Loop the music
+        :param atmo: Atmo file in resources/sounds/atmos
+        :param particles: Enable particles
+        :param cloud_speed: Cloud speed in pixels per second
+        :param cloud_mode: clouds or texture
+        :param tumbleweed: Enable tumbleweed
+        :param voiceovers: Voiceover range (start, end)
+        :param sounds: Effect sounds in resources/sounds to preload
+        """
+        self.name = name
+        self.music = music
+        self.music_loop = music_loop
+        self.atmo = atmo
+        self.particles = particles
+        self.cloud_speed = cloud_speed
+        self.cloud_mode = cloud_mode
+        self.tumbleweed = tumbleweed
+        self.voiceovers = voiceovers
+        self.sounds = sounds
+
+    @staticmethod
+    def from_dict(name: str, data: dict, atmo: str = ''):
+        """
+        Create a map config from its maps.json entry
+        @raise ValueError: if the entry is invalid
+        """
+
+        if not isinstance(data, dict):
+            raise ValueError(f"{name}: map config must be an object")
+
+        unknown = set(data) - set(FIELDS)
+        if unknown:
+            raise ValueError(
+                f"{name}: unknown map config keys {', '.join(sorted(unknown))}"
+            )
+
+        kwargs = {}
+
+        for key, (attribute, value_type, default) in FIELDS.items():
+            if key not in data:
+                if default is None:
+                    raise ValueError(f"{name}: map config key {key} is missing")
+                continue
+
+            value = data[key]
+
+            # bool is a subclass of int
+            if not isinstance(value, value_type) or (
+                    isinstance(value, bool) and value_type is not bool
+            ):
+                raise ValueError(f"{name}: {key} has an invalid type")
+
+            kwargs[attribute] = value
+
+        if kwargs.get('cloud_mode', CLOUD_MODE_CLOUDS) not in CLOUD_MODES:
+            raise ValueError(f"{name}: invalid cloudMode {kwargs['cloud_mode']}")
+
+        voiceovers = kwargs['voiceovers']
+        if (len(voiceovers) != 2
+                or not all(isinstance(i, int) and not isinstance(i, bool)
+                           for i in voiceovers)
+                or voiceovers[0] > voiceovers[1]):
+            raise ValueError(f"{name}: voiceovers must be a range [start, end]")
+
+        kwargs['voiceovers'] = tuple(voiceovers)
+
+        sounds = kwargs.get('sounds', [])
+        if not all(isinstance(sound, str) for sound in sounds):
+            raise ValueError(f"{name}: sounds must be a list of file names")
+
+        kwargs['sounds'] = tuple(sounds)
+
+        return MapConfig(name, atmo=atmo, **kwargs)
+
+    @property
+    def effects(self) -> list:
+        """ Optional effects enabled for this map """
+
+        effects = []
+
+        if self.particles:
+            effects.append(EFFECT_PARTICLES)
+
+        if self.tumbleweed:
+            effects.append(EFFECT_TUMBLEWEED)
+
+        return effects
+
+    @property
+    def assets(self) -> dict:
+        """ Asset manifest of the map """
+
+        return {
+            'music': self.music,
+            'atmo': self.atmo,
+            'voiceovers': self.voiceovers,
+            'sounds': self.sounds,
+            'effects': self.effects
+        }
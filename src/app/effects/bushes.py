@@ -2,9 +2,11 @@
 
 import arcade
 
-from app.constants.layers import LAYER_BUSH, LAYER_PLAYER
+from app.constants.layers import LAYER_BUSH
 from app.constants.ui import FADE_SPEED
+from app.containers.effect_data import EffectData
 from app.effects.effect import Effect
+from app.utils.tracer import trace
 
 ALPHA_MAX = 255
 ALPHA_MIN = 255 * 0.4
@@ -15,6 +17,32 @@ MIN_DISTANCE = 64
 class Bushes(Effect):
     """ Bushes effect """
 
+    def __init__(self):
+        """ Constructor """
+
+        super().__init__()
+        self._collides = False
+
+    def setup(self, data: EffectData) -> None:
+        """ Setup effect """
+
+        super().setup(data)
+        self._collides = False
+
+        if data.triggers:
+            data.triggers.add(
+                data.scene,
+                LAYER_BUSH,
+                MIN_DISTANCE,
+                self.on_proximity
+            )
+
+    def on_proximity(self, layer: str, sprites: list) -> None:
+        """ Called with the bushes near the player """
+
+        self._collides = len(sprites) > 0
+
+    @trace
     def on_fixed_update(self, delta_time: float) -> None:
         """
         Update it
@@ -26,17 +54,8 @@ class Bushes(Effect):
         except arcade.scene.SceneKeyError:
             return
 
-        collides = False
-        player = self._data.scene[LAYER_PLAYER][0]
-
-        for sprite in sprites:
-            if arcade.get_distance_between_sprites(sprite,
-                                                   player) < MIN_DISTANCE:
-                collides = True
-                break
-
         for sprite in sprites:
-            if collides:
+            if self._collides:
                 sprite.alpha = max(ALPHA_MIN, sprite.alpha - FADE_SPEED)
             else:
                 sprite.alpha = min(ALPHA_MAX, sprite.alpha + FADE_SPEED)
@@ -2,18 +2,23 @@
 
 from app.constants.layers import LAYER_CLOUD
 from app.containers.effect_data import EffectData
+from app.containers.map_config import CLOUD_MODE_TEXTURE
 from app.effects.effect import Effect
+from app.utils.tracer import trace
 
 
 class CloudAnimation(Effect):
     """ Moving clouds """
 
+    low_priority = True
+
     def setup(self, data: EffectData) -> None:
         """ Setup animation """
 
         super().setup(data)
         self._data.options['direction'] = 1
 
+    @trace
     def on_update(self, delta_time: float):
         """ Update animation"""
 
@@ -24,20 +29,20 @@ class CloudAnimation(Effect):
         change_direction = False
         for cloud in clouds:
             cloud.center_x -= (
-                    self._data.options['cloudSpeed'] *
+                    self._data.map_config.cloud_speed *
                     self._data.options['direction'] *
                     delta_time
             )
 
             if self._data.options['direction'] == 1 and cloud.right <= 0:
-                if self._data.options['cloudMode'] == 'texture':
+                if self._data.map_config.cloud_mode == CLOUD_MODE_TEXTURE:
                     change_direction = True
                 else:
                     cloud.right = width - abs(cloud.right)
 
             if self._data.options[
                 'direction'] == -1 and cloud.right >= width - cloud.width:
-                if self._data.options['cloudMode'] == 'texture':
+                if self._data.map_config.cloud_mode == CLOUD_MODE_TEXTURE:
                     change_direction = True
 
         if change_direction:
@@ -5,7 +5,8 @@ import random
 from app.constants.layers import LAYER_EAGLE
 from app.containers.effect_data import EffectData
 from app.effects.effect import Effect
-from app.helpers.sprite import load_animated_gif
+from app.utils.animationcache import AnimationCache
+from app.utils.tracer import trace
 
 FACE_LEFT = 0
 FACE_RIGHT = 1
@@ -37,8 +38,8 @@ class Eagle:
         position = self._sprite.position
 
         self.animations = [
-            load_animated_gif(path),
-            load_animated_gif(path, flip_horizontally=True)
+            AnimationCache.sprite(path),
+            AnimationCache.sprite(path, flip_horizontally=True)
         ]
 
         for animation in self.animations:
@@ -90,6 +91,8 @@ class Eagle:
 class Eagles(Effect):
     """ Eagles clouds """
 
+    low_priority = True
+
     def setup(self, data: EffectData) -> None:
         """ Setup animation """
 
@@ -105,6 +108,7 @@ class Eagles(Effect):
 
         self._data.options['eagles'] = eagles
 
+    @trace
     def on_update(self, delta_time: float):
         """ Update animation"""
 
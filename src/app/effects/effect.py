@@ -6,6 +6,9 @@ from app.containers.effect_data import EffectData
 class Effect:
     """ Effect """
 
+    # The effect manager throttles low priority effects over budget
+    low_priority = False
+
     def __init__(self):
         """ Constructor """
 
@@ -41,3 +44,8 @@ class Effect:
         """ Refresh effect """
 
         return
+
+    def teardown(self) -> None:
+        """ Release the resources of the effect """
+
+        self._data = None
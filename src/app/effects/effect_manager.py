@@ -1,8 +1,17 @@
 """ Effect manager """
 
+import logging
+import os
+import time
+
+import arcade
 import arcade.scene
 
+from app.constants.layers import LAYER_EAGLE
+
 from app.containers.effect_data import EffectData
+from app.containers.map_config import MapConfig, EFFECT_PARTICLES, \
+    EFFECT_TUMBLEWEED
 from app.effects.bushes import Bushes
 from app.effects.cloudanimation import CloudAnimation
 from app.effects.eagles import Eagles
@@ -10,23 +19,131 @@ from app.effects.filmgrain import Filmgrain
 from app.effects.particles import Particles
 from app.effects.tumbleweed import Tumbleweed
 from app.effects.vhs import Vhs
+from app.helpers.string import label_value
+from app.state.settingsstate import SettingsState, EVENT_QUALITY
+from app.utils.atlasmanifest import EFFECT_ANIMATIONS, EAGLE_ANIMATION
+from app.utils.proximitytriggers import ProximityTriggers
+from app.utils.tracer import trace
+
+# Weight of the latest sample in the rolling averages
+TIMING_SMOOTHING = 0.05
+
+# Frames an effect is updated every, 0 skips its updates
+THROTTLE_INTERVALS = [1, 2, 4, 0]
+
+# Frames to wait after a change before the next one
+THROTTLE_COOLDOWN = 60
+
+# Share of the budget which must stay free after restoring an effect
+THROTTLE_HEADROOM = 0.75
+
+
+class EffectTiming:
+    """
+    Rolling average cost of an effect and its update rate.
+
+    update_ms and draw_ms average the calls, frame_ms averages what the
+    effect costs per frame. A throttled effect is updated every few
+    frames with the time which passed since its last update. minimum
+    is the throttle the quality governor asks for.
+    """
+
+    def __init__(self, effect):
+        """ Constructor """
+
+        self.effect = effect
+        self.name = effect.__class__.__name__
+        self.update_ms = 0.0
+        self.draw_ms = 0.0
+        self.frame_ms = 0.0
+        self.throttle = 0
+        self.minimum = 0
+        self._spent_ms = 0.0
+        self._delta_times = {}
+
+    @property
+    def interval(self) -> int:
+        """ Frames the effect is updated every, 0 if it is skipped """
+
+        return THROTTLE_INTERVALS[max(self.throttle, self.minimum)]
+
+    def due(self, frame: int, event: str, delta_time: float) -> float | None:
+        """
+        Check if the effect is updated this frame
+        @return: Time since its last update or None
+        """
+
+        if not self.interval:
+            return None
+
+        delta_time += self._delta_times.get(event, 0)
+
+        if frame % self.interval:
+            self._delta_times[event] = delta_time
+            return None
+
+        self._delta_times[event] = 0
+
+        return delta_time
+
+    def add_update(self, seconds: float) -> None:
+        """ Add the duration of an update """
+
+        ms = seconds * 1000
+        self.update_ms += (ms - self.update_ms) * TIMING_SMOOTHING
+        self._spent_ms += ms
+
+    def add_draw(self, seconds: float) -> None:
+        """ Add the duration of a draw """
+
+        ms = seconds * 1000
+        self.draw_ms += (ms - self.draw_ms) * TIMING_SMOOTHING
+        self._spent_ms += ms
+
+    def end_frame(self) -> None:
+        """ Add the time spent this frame to the average """
+
+        self.frame_ms += (self._spent_ms - self.frame_ms) * TIMING_SMOOTHING
+        self._spent_ms = 0.0
+
+    def __str__(self) -> str:
+        text = f"update {self.update_ms:.3f} ms, draw {self.draw_ms:.3f} ms"
+
+        if self.interval != 1:
+            text += f", every {self.interval} frames" if self.interval else ", skipped"
+
+        return text
 
 
 class EffectManager:
-    """ Effect manager """
+    """
+    Effect manager
+
+    Every update and draw of an effect is timed. When the effects take
+    longer than the effect budget of the settings, the most expensive
+    low priority effect is updated less often, down to not at all.
+    With enough headroom the last throttled effect is restored.
+    """
 
     def __init__(self):
         """ Constructor """
 
         self._animations = []
+        self._timings = []
+        self._throttled = []
+        self._frame = 0
+        self._cooldown = THROTTLE_COOLDOWN
+        self._frame_ms = 0.0
+        self._budget_ms = 0.0
         self._vhs = None
 
     def setup(
             self,
-            map_config: dict,
+            map_config: MapConfig,
             scene: arcade.scene.Scene,
             tilemap: arcade.TileMap,
-            root_dir: str
+            root_dir: str,
+            triggers: ProximityTriggers = None
     ):
         """ Setup effects """
 
@@ -34,15 +151,16 @@ class EffectManager:
             scene,
             tilemap,
             root_dir,
-            map_config
+            map_config,
+            triggers
         )
 
         animations = []
 
-        if 'particles' in map_config and map_config['particles']:
+        if EFFECT_PARTICLES in map_config.effects:
             animations += [Particles()]
 
-        if 'tumbleweed' in map_config and map_config['tumbleweed']:
+        if EFFECT_TUMBLEWEED in map_config.effects:
             animations += [Tumbleweed()]
 
         self._vhs = Vhs()
@@ -60,30 +178,184 @@ class EffectManager:
             animation.setup(data)
 
         self._animations = animations
+        self._timings = [EffectTiming(animation) for animation in animations]
+        self._budget_ms = SettingsState.load().effect_budget
+        self.apply_quality()
+
+        SettingsState.subscribe(EVENT_QUALITY, self.on_change_quality)
+
+    def on_change_quality(self, state: SettingsState) -> None:
+        """ On change of the quality """
 
+        self.refresh()
+
+    def apply_quality(self) -> None:
+        """ Throttle the low priority effects as the quality governor asks """
+
+        effect_throttle = arcade.get_window().quality_governor.effect_throttle
+
+        for timing in self._timings:
+            if timing.effect.low_priority:
+                timing.minimum = effect_throttle
+
+    @trace
     def on_update(self, delta_time: float):
         """ Update all effects """
 
-        for animation in self._animations:
-            animation.on_update(delta_time)
+        for timing in self._timings:
+            effect_delta_time = timing.due(self._frame, 'on_update', delta_time)
 
+            if effect_delta_time is None:
+                continue
+
+            start = time.perf_counter()
+            timing.effect.on_update(effect_delta_time)
+            timing.add_update(time.perf_counter() - start)
+
+    @trace
     def on_fixed_update(self, delta_time: float):
         """ Update all effects """
-        for animation in self._animations:
-            animation.on_fixed_update(delta_time)
+        for timing in self._timings:
+            effect_delta_time = timing.due(self._frame, 'on_fixed_update', delta_time)
+
+            if effect_delta_time is None:
+                continue
+
+            start = time.perf_counter()
+            timing.effect.on_fixed_update(effect_delta_time)
+            timing.add_update(time.perf_counter() - start)
 
+    @trace
     def draw(self) -> None:
         """ Draw all effects """
 
-        for animation in self._animations:
-            animation.draw()
+        for timing in self._timings:
+            start = time.perf_counter()
+            timing.effect.draw()
+            timing.add_draw(time.perf_counter() - start)
+
+        self.end_frame()
+
+    def end_frame(self) -> None:
+        """ Throttle or restore effects depending on their cost """
+
+        self._frame += 1
+        self._frame_ms = 0.0
+
+        for timing in self._timings:
+            timing.end_frame()
+            self._frame_ms += timing.frame_ms
+
+        if self._budget_ms <= 0:
+            return
+
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return
+
+        if self._frame_ms > self._budget_ms:
+            self.throttle()
+        elif self._throttled:
+            self.restore()
+
+    def throttle(self) -> None:
+        """ Update the most expensive low priority effect less often """
+
+        candidates = [
+            timing for timing in self._timings
+            if timing.effect.low_priority
+            and timing.throttle < len(THROTTLE_INTERVALS) - 1
+        ]
+
+        if not candidates:
+            return
+
+        timing = max(candidates, key=lambda candidate: candidate.frame_ms)
+        timing.throttle += 1
+        self._throttled.append(timing)
+        self._cooldown = THROTTLE_COOLDOWN
+
+        logging.info(
+            label_value(
+                f"Effects over budget {self._frame_ms:.2f} ms, throttled {timing.name}",
+                timing
+            )
+        )
+
+    def restore(self) -> None:
+        """ Restore the last throttled effect if there is headroom """
+
+        timing = self._throttled[-1]
+
+        # Its update cost if it ran every frame again
+        if self._frame_ms + timing.update_ms > self._budget_ms * THROTTLE_HEADROOM:
+            return
+
+        timing.throttle -= 1
+        self._throttled.pop()
+        self._cooldown = THROTTLE_COOLDOWN
+
+        logging.info(
+            label_value(
+                f"Effects within budget {self._frame_ms:.2f} ms, restored {timing.name}",
+                timing
+            )
+        )
+
+    @property
+    def timings(self) -> list:
+        """ Timings of the effects """
+
+        return self._timings
+
+    @property
+    def frame_ms(self) -> float:
+        """ Average milliseconds all effects take per frame """
+
+        return self._frame_ms
+
+    def log_timings(self) -> None:
+        """ Log the average cost of every effect """
+
+        for timing in self._timings:
+            logging.info(label_value(f"Effect {timing.name}", timing))
 
     def refresh(self) -> None:
         """ Refresh all effects after changing settings """
 
+        self._budget_ms = SettingsState.load().effect_budget
+        self.apply_quality()
+
         for animation in self._animations:
             animation.refresh()
 
+    def teardown(self) -> None:
+        """ Release the resources of all effects """
+
+        SettingsState.unsubscribe(EVENT_QUALITY, self.on_change_quality)
+        self.log_timings()
+
+        for animation in self._animations:
+            animation.teardown()
+
+        self._animations = []
+        self._timings = []
+        self._throttled = []
+        self._vhs = None
+
+    @staticmethod
+    def animations(root_dir: str, scene: arcade.scene.Scene) -> list:
+        """ GIF animations the effects use in a scene """
+
+        animations = [
+            os.path.join(root_dir, animation) for animation in EFFECT_ANIMATIONS
+        ]
+
+        if LAYER_EAGLE in scene:
+            animations.append(os.path.join(root_dir, EAGLE_ANIMATION))
+
+        return animations
+
     @property
     def vhs(self) -> Vhs:
 
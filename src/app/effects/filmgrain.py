@@ -6,6 +6,8 @@ import arcade
 
 from app.containers.effect_data import EffectData
 from app.effects.effect import Effect
+from app.utils.animationcache import AnimationCache
+from app.utils.tracer import trace
 
 ALPHA = 20
 
@@ -29,7 +31,7 @@ class Filmgrain(Effect):
 
         self._camera = arcade.camera.Camera2D()
 
-        self._grain = arcade.load_animated_gif(
+        self._grain = AnimationCache.sprite(
             os.path.join(data.root_dir, 'resources', 'animations', 'grain.gif')
         )
         self._grain.size = arcade.get_window().get_size()
@@ -40,6 +42,7 @@ class Filmgrain(Effect):
 
         self._spritelist.alpha = ALPHA
 
+    @trace
     def on_update(self, delta_time: float) -> None:
         """
         Update it
@@ -48,8 +51,12 @@ class Filmgrain(Effect):
 
         self._grain.update_animation(delta_time=delta_time)
 
+    @trace
     def draw(self) -> None:
         """ Draw it """
 
+        if not arcade.get_window().quality_governor.overlays:
+            return
+
         self._camera.use()
         self._spritelist.draw()
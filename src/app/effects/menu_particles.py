@@ -1,12 +1,12 @@
 """ Menu background particles """
 
-import random
-
 import arcade
+import numpy as np
 
 from app.containers.effect_data import EffectData
 from app.effects.effect import Effect
-from app.state.settingsstate import SettingsState
+from app.state.settingsstate import SettingsState, EVENT_PARTICLES
+from app.utils.particlelist import ParticleList
 
 PARTICLES_SIZE_RANGE = 8
 PARTICLE_SPEED = 100
@@ -24,67 +24,92 @@ SCENE_LAYER_PARTICLES = 'particles'
 class MenuParticles(Effect):
     """ Menu background particles """
 
+    def __init__(self):
+        """ Constructor """
+
+        super().__init__()
+        self._particles = None
+
     def setup(self, data: EffectData) -> None:
         """ Setup effect """
 
         self._data = data
 
-        try:
-            self._data.scene[SCENE_LAYER_PARTICLES].clear()
-        except KeyError:
-            pass
+        self._particles = ParticleList.in_scene(
+            self._data.scene,
+            SCENE_LAYER_PARTICLES
+        )
+        self._particles.clear()
 
         state = SettingsState.load()
         particles_count = int(PARTICLES_COUNT * state.particles)
 
+        SettingsState.subscribe(EVENT_PARTICLES, self.on_change_particles)
+
         self.make(particles_count)
 
     def on_update(self, delta_time: float) -> None:
         """ On update """
         w, h = arcade.get_window().get_size()
 
-        particles = self._data.scene[SCENE_LAYER_PARTICLES]
-        for particle in particles:
-            particle.center_x -= PARTICLE_SPEED * delta_time
+        particles = self._particles
+        particles.positions[:, 0] -= PARTICLE_SPEED * delta_time
+
+        # Respawn the particles which left the screen on the right side
+        gone = particles.positions[:, 0] + particles.radii < 0
+
+        if not gone.any():
+            return
+
+        particles.positions[gone, 0] = w + particles.radii[gone] * 2
+        particles.positions[gone, 1] = particles.rng.integers(
+            0,
+            h,
+            size=np.count_nonzero(gone),
+            endpoint=True
+        )
 
-            if particle.right < 0:
-                particle.center_x = w + particle.width
-                particle.center_y = random.randint(0, h)
+    def on_change_particles(self, state: SettingsState) -> None:
+        """ On change particles setting """
+
+        self.refresh()
 
     def refresh(self) -> None:
         """ On refresh """
 
         modifier = SettingsState.load().particles
         new_count = int(PARTICLES_COUNT * modifier)
-        old_count = len(self._data.scene[SCENE_LAYER_PARTICLES])
-        if new_count == old_count:
-            return
+        old_count = self._particles.count
 
         if new_count > old_count:
             self.make(new_count - old_count)
             return
 
         if new_count < old_count:
-            diff = new_count - old_count
-
-            sprites = self._data.scene[SCENE_LAYER_PARTICLES][diff:]
-
-            for sprite in sprites:
-                self._data.scene[SCENE_LAYER_PARTICLES].remove(sprite)
+            self._particles.resize(new_count)
 
     def make(self, particles_count: int) -> None:
         """ Make particles """
 
-        for i in range(0, particles_count):
-            sprite = arcade.sprite.SpriteCircle(
-                color=random.choice(PARTICLE_COLORS),
-                soft=True,
-                radius=random.randint(1, PARTICLES_SIZE_RANGE)
-            )
-
-            w, h = arcade.get_window().get_size()
-
-            sprite.center_x = random.randint(0, w)
-            sprite.center_y = random.randint(0, h)
-
-            self._data.scene.add_sprite(SCENE_LAYER_PARTICLES, sprite)
+        w, h = arcade.get_window().get_size()
+        rng = self._particles.rng
+
+        positions = np.column_stack((
+            rng.integers(0, w, size=particles_count, endpoint=True),
+            rng.integers(0, h, size=particles_count, endpoint=True)
+        ))
+
+        colors = np.array(PARTICLE_COLORS)[
+            rng.integers(0, len(PARTICLE_COLORS), size=particles_count)
+        ]
+
+        self._particles.add(
+            positions,
+            rng.integers(
+                1,
+                PARTICLES_SIZE_RANGE,
+                size=particles_count,
+                endpoint=True
+            ),
+            colors
+        )
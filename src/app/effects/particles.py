@@ -1,13 +1,13 @@
 """ Particles """
-import logging
-import random
-
-import arcade.sprite
+import arcade
+import numpy as np
 
 from app.constants.layers import LAYER_PARTICLES
 from app.containers.effect_data import EffectData
 from app.effects.effect import Effect
-from app.state.settingsstate import SettingsState
+from app.state.settingsstate import SettingsState, EVENT_PARTICLES
+from app.utils.particlelist import ParticleList
+from app.utils.tracer import trace
 
 PARTICLES_COUNT = 300
 PARTICLES_RADIUS = 6
@@ -16,82 +16,132 @@ PARTICLES_Y_MAX = 800
 PARTICLE_SPEED = 15
 
 PARTICLES_COLOR = (255, 255, 255)
+PARTICLES_ALPHA_MIN = 80
+PARTICLES_ALPHA_MAX = 180
 
 
 class Particles(Effect):
     """ Effect """
 
+    low_priority = True
+
+    def __init__(self):
+        """ Constructor """
+
+        super().__init__()
+        self._particles = None
+
     def setup(self, data: EffectData) -> None:
         """ Setup animation """
 
         super().setup(data)
 
-        state = SettingsState.load()
-        particles_count = int(PARTICLES_COUNT * state.particles)
+        self._particles = ParticleList.in_scene(data.scene, LAYER_PARTICLES)
+
+        particles_count = self.count()
+
+        SettingsState.subscribe(EVENT_PARTICLES, self.on_change_particles)
 
         self.make_particles(particles_count)
 
+    @trace
     def on_update(self, delta_time: float) -> None:
         """
         Update it
         @param delta_time: float
         """
 
-        for sprite in self._data.scene[LAYER_PARTICLES]:
-            sprite.center_x -= PARTICLE_SPEED * delta_time
-            if sprite.right < 0:
-                sprite.center_x = (self._data.tilemap.width *
-                                   self._data.tilemap.tile_width)
-                sprite.center_y = random.randint(
-                    PARTICLES_Y_MIN,
-                    PARTICLES_Y_MAX
-                )
+        particles = self._particles
+        particles.positions[:, 0] -= PARTICLE_SPEED * delta_time
+
+        # Respawn the particles which left the map on the right side
+        gone = particles.positions[:, 0] + particles.radii < 0
 
+        if not gone.any():
+            return
+
+        particles.positions[gone, 0] = self.width
+        particles.positions[gone, 1] = particles.rng.integers(
+            PARTICLES_Y_MIN,
+            PARTICLES_Y_MAX,
+            size=np.count_nonzero(gone),
+            endpoint=True
+        )
+
+    @trace
     def draw(self) -> None:
         """ Draw effect """
 
         return
 
+    @property
+    def width(self) -> int:
+        """ Map width """
+
+        return self._data.tilemap.width * self._data.tilemap.tile_width
+
     def make_particles(self, particles_count: int) -> None:
         """
         Make particles
         """
-        width = self._data.tilemap.width * self._data.tilemap.tile_width
-
-        for i in range(0, particles_count):
-            logging.debug(f"Make particle {i}")
-            r, g, b = PARTICLES_COLOR
-            a = random.randint(80, 180)
-            color = r, g, b, a
-
-            sprite = arcade.sprite.SpriteCircle(
-                radius=random.randint(1, PARTICLES_RADIUS),
-                color=color,
-                soft=True
+
+        rng = self._particles.rng
+
+        positions = np.column_stack((
+            rng.integers(1, self.width, size=particles_count, endpoint=True),
+            rng.integers(
+                PARTICLES_Y_MIN,
+                PARTICLES_Y_MAX,
+                size=particles_count,
+                endpoint=True
             )
+        ))
 
-            sprite.center_x = random.randint(1, width)
-            sprite.center_y = random.randint(PARTICLES_Y_MIN, PARTICLES_Y_MAX)
+        colors = np.empty((particles_count, 4))
+        colors[:, :3] = PARTICLES_COLOR
+        colors[:, 3] = rng.integers(
+            PARTICLES_ALPHA_MIN,
+            PARTICLES_ALPHA_MAX,
+            size=particles_count,
+            endpoint=True
+        )
 
-            self._data.scene.add_sprite(LAYER_PARTICLES, sprite)
+        self._particles.add(
+            positions,
+            rng.integers(1, PARTICLES_RADIUS, size=particles_count, endpoint=True),
+            colors
+        )
 
-    def refresh(self):
+    def on_change_particles(self, state: SettingsState) -> None:
+        """ On change particles setting """
+
+        self.refresh()
+
+    def teardown(self) -> None:
+        """ Release the particles """
+
+        SettingsState.unsubscribe(EVENT_PARTICLES, self.on_change_particles)
+        self._particles = None
+
+        super().teardown()
+
+    @staticmethod
+    def count() -> int:
+        """ Particle count for the setting and the current quality """
 
         modifier = SettingsState.load().particles
+        modifier *= arcade.get_window().quality_governor.particles
 
-        new_count = int(PARTICLES_COUNT * modifier)
-        old_count = len(self._data.scene[LAYER_PARTICLES])
-        if new_count == old_count:
-            return
+        return int(PARTICLES_COUNT * modifier)
+
+    def refresh(self):
+
+        new_count = self.count()
+        old_count = self._particles.count
 
         if new_count > old_count:
             self.make_particles(new_count - old_count)
             return
 
         if new_count < old_count:
-            diff = new_count - old_count
-
-            sprites = self._data.scene[LAYER_PARTICLES][diff:]
-
-            for sprite in sprites:
-                self._data.scene[LAYER_PARTICLES].remove(sprite)
+            self._particles.resize(new_count)
@@ -1,13 +1,15 @@
 """ Move clouds """
 import random
 
+from app.constants.layers import LAYER_TUMBLEWEED
 from app.containers.effect_data import EffectData
 from app.effects.effect import Effect
+from app.utils.tracer import trace
 
 MOVE_SPEED = 1000
 MOVE_ANGLE = 500
 
-LAYER_NAME = 'Tumbleweed'
+LAYER_NAME = LAYER_TUMBLEWEED
 
 RANDOMIZE_DELTA = 1
 
@@ -20,6 +22,7 @@ class Tumbleweed(Effect):
 
         self._data.options['delta'] = 0
 
+    @trace
     def on_update(self, delta_time: float):
         """ Update animation"""
 
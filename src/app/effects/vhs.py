@@ -7,6 +7,8 @@ import arcade
 
 from app.containers.effect_data import EffectData
 from app.effects.effect import Effect
+from app.utils.animationcache import AnimationCache
+from app.utils.tracer import trace
 
 ALPHA_MIN = 0
 ALPHA_SPEED = 1
@@ -33,7 +35,7 @@ class Vhs(Effect):
 
         self._camera = arcade.camera.Camera2D()
 
-        self._vhs = arcade.load_animated_gif(
+        self._vhs = AnimationCache.sprite(
             os.path.join(data.root_dir, 'resources', 'animations', 'vhs.gif')
         )
         self._vhs.size = arcade.get_window().get_size()
@@ -44,6 +46,7 @@ class Vhs(Effect):
 
         self._spritelist.alpha = 0
 
+    @trace
     def on_fixed_update(self, delta_time: float) -> None:
         """
         Update it
@@ -68,12 +71,27 @@ class Vhs(Effect):
 
         self._vhs.update_animation(delta_time=delta_time)
 
+    @trace
     def draw(self) -> None:
         """ Draw it """
 
+        if not arcade.get_window().quality_governor.overlays:
+            return
+
+        # Drawn in the world pass, which may be rendered at a lower scale
+        self._camera.viewport = arcade.get_window().world_target.viewport
         self._camera.use()
         self._spritelist.draw()
 
+    def teardown(self) -> None:
+        """ Release the sprite list """
+
+        self._spritelist.clear()
+        self._spritelist = None
+        self._vhs = None
+
+        super().teardown()
+
     @property
     def enabled(self) -> bool:
         """ Get enabled state """
@@ -1,6 +1,5 @@
 """ Player entity"""
 import logging
-import os
 
 import arcade
 
@@ -34,17 +33,11 @@ class Player(Entity):
 
     def setup_sounds(self) -> None:
         """ Set up the sounds"""
-        fx_dir = os.path.join(self._root_dir, 'resources', 'sounds', 'fx')
+        sound_bank = arcade.get_window().sound_bank
 
         self._sounds = {
-            'jump': arcade.load_sound(
-                os.path.join(fx_dir, 'jump.mp3'),
-                streaming=False
-            ),
-            'landing': arcade.load_sound(
-                os.path.join(fx_dir, 'landing.mp3'),
-                streaming=False
-            )
+            'jump': sound_bank.get('fx/jump.mp3'),
+            'landing': sound_bank.get('fx/landing.mp3')
         }
 
     def setup_physics_engine(
@@ -10,17 +10,28 @@ import arcade
 import pyglet
 from arcade.gui import UIFlatButton
 
-from app.constants.fonts import FONT_DEFAULT, FONT_SIZE_BUTTON
-from app.constants.input.keyboard import KEY_SCREENSHOT
+from app.constants.fonts import FONT_DEFAULT, FONT_SIZE_BUTTON, FONT_FILES
+from app.constants.gameinfo import MAPS
+from app.constants.input.keyboard import KEY_SCREENSHOT, KEY_FRAME_TIMES, KEY_TRACE
 from app.helpers.paths import screenshot_path
 from app.helpers.string import label_value
 from app.state.settingsstate import SettingsState
+from app.utils.atlasmanifest import AtlasManifest
 from app.utils.audiovolumes import AudioVolumes
-from app.utils.fpscounter import FPSCounter
+from app.utils.mapregistry import MapRegistry
+from app.utils.performanceoverlay import PerformanceOverlay
+from app.utils.qualitygovernor import QualityGovernor
+from app.utils.rendertarget import RenderTarget
+from app.utils.soundbank import SoundBank
+from app.utils.tracer import Tracer
 from app.views.logo import Logo
 from app.views.mainmenu import MainMenu
 
 
+# Window events measured by the performance overlay and traced
+TIMED_EVENTS = ['on_update', 'on_fixed_update', 'on_draw']
+
+
 class GameWindow(arcade.Window):
     """
     Main application class
@@ -46,8 +57,11 @@ class GameWindow(arcade.Window):
         self._screen = None
         self._controller_manager = None
         self._controllers = []
-        self._fps_counter = None
+        self._performance_overlay = None
+        self._quality_governor = None
+        self._world_target = None
         self._audio_volumes = None
+        self._sound_bank = None
 
         # Call the parent class and set up the window
         super().__init__(
@@ -84,6 +98,9 @@ class GameWindow(arcade.Window):
         )
         self.set_icon(icon)
         self.setup_fonts()
+        self.setup_atlas()
+        MapRegistry.load(root_dir)
+        self._sound_bank = SoundBank(root_dir).setup()
         self.setup_controllers()
 
         if show_intro:
@@ -91,10 +108,20 @@ class GameWindow(arcade.Window):
         else:
             view = MainMenu
 
-        self._fps_counter = FPSCounter().setup(self)
+        self._performance_overlay = PerformanceOverlay().setup(self)
 
         state = SettingsState.load()
 
+        self._world_target = RenderTarget()
+
+        if state.quality_auto:
+            self._world_target.setup(self.ctx, self.size, state.antialiasing)
+
+        self._quality_governor = QualityGovernor().setup(
+            self._performance_overlay,
+            self._world_target
+        )
+
         if state.show_fps:
             arcade.enable_timings()
 
@@ -154,12 +181,7 @@ class GameWindow(arcade.Window):
     def setup_fonts(self):
         """ Load fonts """
 
-        fonts = [
-            'cruft.ttf',
-            'consolamonobook.ttf'
-        ]
-
-        for font in fonts:
+        for font in FONT_FILES.values():
             arcade.load_font(
                 os.path.join(
                     self._root_dir,
@@ -169,6 +191,26 @@ class GameWindow(arcade.Window):
                 )
             )
 
+    def setup_atlas(self) -> None:
+        """
+        Size the default texture atlas for the largest map,
+        while it is still empty, so it never grows later
+        """
+
+        manifests = [AtlasManifest.load(self._root_dir, map_name) for map_name in MAPS]
+        sizes = [manifest.size for manifest in manifests if manifest]
+
+        if not sizes:
+            return
+
+        atlas = self.ctx.default_atlas
+        width = max(atlas.width, *(size[0] for size in sizes))
+        height = max(atlas.height, *(size[1] for size in sizes))
+
+        atlas.resize((width, height))
+
+        logging.info(label_value('Texture atlas', f"{width}x{height}"))
+
     def on_button_press(self, joystick, key) -> None:
         """ On controller button pressed """
 
@@ -233,6 +275,12 @@ class GameWindow(arcade.Window):
         if symbol in KEY_SCREENSHOT:
             self.on_screenshot()
 
+        if symbol in KEY_FRAME_TIMES and self._performance_overlay:
+            self._performance_overlay.dump()
+
+        if symbol in KEY_TRACE:
+            Tracer.write()
+
     def on_screenshot(self):
         """ Save a screenshot """
 
@@ -249,25 +297,78 @@ class GameWindow(arcade.Window):
 
         logging.info(f"Screenshot saved as {filename} in {end} seconds")
 
-        sound = arcade.load_sound(
-            os.path.join(self._root_dir, 'resources', 'sounds', 'common',
-                         'screenshot.mp3')
+        self._sound_bank.play(
+            'common/screenshot.mp3',
+            volume=self._audio_volumes.volume_sound_normalized
         )
-        sound.play(volume=self._audio_volumes.volume_sound_normalized)
 
         return filename
 
     def on_update(self, delta_time: float):
         """ On update """
 
-        if self._fps_counter:
-            self._fps_counter.on_update()
+        if self._performance_overlay:
+            self._performance_overlay.on_update()
+
+        if self._quality_governor:
+            self._quality_governor.on_update()
+
+    def dispatch_event(self, *args) -> None:
+        """ Dispatch an event and measure the frame events """
+
+        event_type = args[0]
+
+        if event_type not in TIMED_EVENTS:
+            super().dispatch_event(*args)
+            return
+
+        start = time.perf_counter()
+        super().dispatch_event(*args)
+        end = time.perf_counter()
+
+        if self._performance_overlay:
+            self._performance_overlay.record(event_type, end - start)
+
+        if Tracer.enabled:
+            Tracer.add(f"GameWindow.{event_type}", start, end)
+
+    def on_close(self) -> None:
+        """ Release the render target while the context is still current """
+
+        if self._world_target:
+            self._world_target.release()
+
+        super().on_close()
 
     def draw_after(self):
         """ Draw after view """
 
-        if self._fps_counter:
-            self._fps_counter.draw()
+        if self._performance_overlay:
+            self._performance_overlay.draw()
+
+    @property
+    def performance_overlay(self) -> PerformanceOverlay:
+        """ Get the performance overlay """
+
+        return self._performance_overlay
+
+    @property
+    def quality_governor(self) -> QualityGovernor:
+        """ Get the quality governor """
+
+        return self._quality_governor
+
+    @property
+    def world_target(self) -> RenderTarget:
+        """ Get the render target of the world """
+
+        return self._world_target
+
+    @property
+    def sound_bank(self) -> SoundBank:
+        """ Get the sound bank """
+
+        return self._sound_bank
 
     @property
     def audio_volumes(self) -> AudioVolumes:
@@ -0,0 +1,106 @@
+""" Collision helpers """
+
+import arcade
+
+
+def is_full_tile(sprite: arcade.BasicSprite, tile_width: int,
+                 tile_height: int) -> bool:
+    """
+    Check if a sprite is an unrotated tile on the grid
+    whose hit box covers the whole tile
+    """
+
+    if sprite.angle % 360 != 0:
+        return False
+
+    if round(sprite.width) != tile_width or round(sprite.height) != tile_height:
+        return False
+
+    if sprite.left % tile_width or sprite.bottom % tile_height:
+        return False
+
+    points = sprite.hit_box.points
+
+    # The hit box has to be the rectangle of the tile
+    return len(points) == 4 and all(
+        round(abs(x) * 2) == tile_width and round(abs(y) * 2) == tile_height
+        for x, y in points
+    )
+
+
+def merge_cells(cells: set) -> list:
+    """
+    Greedily merge occupied grid cells into rectangles.
+
+    Every run of cells in a row is extended upwards
+    as long as the rows above are fully occupied too.
+    @param cells: Set of (column, row) tuples
+    @return: List of (column, row, columns, rows) tuples
+    """
+
+    remaining = set(cells)
+    rects = []
+
+    for column, row in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+        if (column, row) not in remaining:
+            continue
+
+        columns = 1
+        while (column + columns, row) in remaining:
+            columns += 1
+
+        rows = 1
+        while all(
+                (column + i, row + rows) in remaining for i in range(columns)
+        ):
+            rows += 1
+
+        for i in range(columns):
+            for j in range(rows):
+                remaining.discard((column + i, row + j))
+
+        rects.append((column, row, columns, rows))
+
+    return rects
+
+
+def collision_list(
+        sprites: arcade.SpriteList,
+        tile_width: int,
+        tile_height: int
+) -> arcade.SpriteList:
+    """
+    Build a physics only sprite list from a wall layer.
+
+    Full tiles are merged into as few invisible boxes as possible,
+    all other sprites are kept as they are.
+    The list is never drawn and uses a spatial hash.
+    """
+
+    cells = set()
+    others = []
+
+    for sprite in sprites:
+        if is_full_tile(sprite, tile_width, tile_height):
+            cells.add((
+                round(sprite.left) // tile_width,
+                round(sprite.bottom) // tile_height
+            ))
+        else:
+            others.append(sprite)
+
+    boxes = arcade.SpriteList(use_spatial_hash=True, lazy=True)
+
+    for column, row, columns, rows in merge_cells(cells):
+        box = arcade.SpriteSolidColor(
+            width=columns * tile_width,
+            height=rows * tile_height,
+            center_x=(column + columns / 2) * tile_width,
+            center_y=(row + rows / 2) * tile_height
+        )
+        box.visible = False
+        boxes.append(box)
+
+    boxes.extend(others)
+
+    return boxes
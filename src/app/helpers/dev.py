@@ -8,6 +8,7 @@ import pyglet
 from app.constants.settings import SETTINGS_DEFAULT_AUDIO_DRIVER
 from app.helpers.string import label_value
 from app.state.settingsstate import SettingsState
+from app.utils.tracer import Tracer, TRACE_ARGUMENT
 
 
 def configure_pyglet():
@@ -21,6 +22,13 @@ def configure_pyglet():
         pyglet.options.audio = (state.audio_driver,)
 
 
+def configure_tracer():
+    """ Tracing must be enabled before the traced modules are imported """
+
+    Tracer.enabled = TRACE_ARGUMENT in sys.argv
+    logging.info(label_value('Tracing', Tracer.enabled))
+
+
 def is_frozen() -> bool:
     """ Check is the app is frozen """
 
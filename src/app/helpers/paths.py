@@ -46,3 +46,9 @@ def log_path() -> str:
     """ Log path """
 
     return os.path.join(data_path(), 'logs')
+
+
+def cache_path() -> str:
+    """ Cache path """
+
+    return os.path.join(data_path(), 'cache')
@@ -14,7 +14,10 @@ from app.constants.settings import (UPDATE_RATE, FIXED_RATE)
 from app.gamewindow import GameWindow
 from app.helpers.string import label_value
 from app.state.settingsstate import SettingsState
+from app.utils.loadprofiler import LoadProfiler
 from app.utils.log import log_hardware_info
+from app.utils.statestore import StateStore
+from app.utils.tracer import Tracer, TRACE_ARGUMENT
 
 
 class Startup:
@@ -78,12 +81,16 @@ class Startup:
         state.base_width = BASE_WIDTH
         state.base_height = BASE_HEIGHT
         state.skip_slowmo = args.skip_slowmo
+        LoadProfiler.enabled = args.profile_load
 
         # Create settings state on first launch
         state.save()
+        StateStore.flush()
 
         samples = state.antialiasing
-        antialiasing = samples > 0
+
+        # With auto quality the world is multisampled offscreen
+        antialiasing = samples > 0 and not state.quality_auto
 
         # Update rate
         width, height = state.screen_resolution
@@ -122,6 +129,8 @@ class Startup:
         )
         arcade.run()
 
+        Tracer.write()
+
     @staticmethod
     def get_args() -> argparse.Namespace:
         """ Get args """
@@ -171,4 +180,18 @@ class Startup:
             default=False
         )
 
+        parser.add_argument(
+            '--profile-load',
+            action='store_true',
+            default=False,
+            help='Write a JSON report of every level load to the log directory'
+        )
+
+        parser.add_argument(
+            TRACE_ARGUMENT,
+            action='store_true',
+            default=False,
+            help='Record a Chrome trace of the game loop to the log directory'
+        )
+
         return parser.parse_args()
@@ -3,10 +3,9 @@
 import logging
 import os
 
-import jsonpickle
-
-from app.constants.gameinfo import MAPS, DEFAULT_ENCODING
+from app.constants.gameinfo import MAPS
 from app.helpers.paths import savegame_path
+from app.utils.statestore import StateStore
 
 VERSION = 1
 
@@ -22,7 +21,7 @@ class SavegameState:
     def exists() -> bool:
         """ Check if there is an existing savegame """
 
-        return os.path.exists(savegame_path())
+        return StateStore.exists(savegame_path())
 
     @property
     def lastmodified(self) -> float:
@@ -39,6 +38,18 @@ class SavegameState:
         except IndexError:
             return None
 
+    @property
+    def current_level_index(self) -> int:
+        """ Get the index of the current level """
+
+        return self._current_level
+
+    @current_level_index.setter
+    def current_level_index(self, value: int) -> None:
+        """ Set the index of the current level """
+
+        self._current_level = value
+
     def next_level(self) -> bool:
         """ Increase the level index"""
 
@@ -71,28 +82,42 @@ class SavegameState:
         @return: SettingsState
         """
 
-        with open(savegame_path(), 'r', encoding=DEFAULT_ENCODING) as f:
-            state = jsonpickle.decode(f.read())
+        return SavegameState.from_dict(StateStore.read(savegame_path()))
+
+    def save(self) -> None:
+        """ Write the savegame to disk in the background """
+
+        StateStore.write(savegame_path(), self.to_dict())
+
+    def to_dict(self) -> dict:
+        """ Savegame as plain JSON data """
+
+        return {
+            'version': self._version,
+            'current_level': self._current_level
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Create a savegame state from plain JSON data
+        @raise ValueError: if the data is invalid
+        """
 
-            # jsonpickle don't calls __init__()
-            # So when loading a state attributes added since then are missing
-            # I added a version number
-            # If the state version from the code is newer than the stored version
-            # discard the old settings state and return a new one
-            if SavegameState().version != state.version:
-                return SavegameState()
+        state = cls()
 
+        # Savegames of another version are discarded
+        if data.get('version') != state.version:
             return state
 
-    def save(self) -> None:
-        """ Save settings as json file """
+        current_level = data.get('current_level', 0)
+
+        if not isinstance(current_level, int) or isinstance(current_level, bool):
+            raise ValueError('savegame: current_level has an invalid type')
 
-        directory = os.path.dirname(savegame_path())
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+        state.current_level_index = current_level
 
-        with open(savegame_path(), 'w', encoding=DEFAULT_ENCODING) as f:
-            f.write(jsonpickle.encode(self, unpicklable=True))
+        return state
 
     @property
     def version(self) -> int:
@@ -103,5 +128,4 @@ class SavegameState:
     @staticmethod
     def delete():
         """ Delete savegame """
-        if SavegameState.exists():
-            os.unlink(savegame_path())
+        StateStore.delete(savegame_path())
@@ -1,11 +1,11 @@
 """ Settings state """
 
+import copy
 import logging
-import os
+import threading
+import weakref
 
-import jsonpickle
-
-from app.constants.gameinfo import DEFAULT_ENCODING, BASE_HEIGHT, BASE_WIDTH
+from app.constants.gameinfo import BASE_HEIGHT, BASE_WIDTH
 from app.constants.settings import (
     SETTINGS_DEFAULT_SHOW_FPS, \
     SETTINGS_DEFAULT_VSYNC, \
@@ -20,19 +20,65 @@ from app.constants.settings import (
     SETTINGS_DEFAULT_PARTICLES,
     SETTINGS_DEFAULT_DRAW_RATE, \
     SETTINGS_DEFAULT_DEBUG, SETTINGS_DEFAULT_AUDIO_DRIVER,
-    SETTINGS_DEFAULT_RUMBLE
+    SETTINGS_DEFAULT_RUMBLE,
+    SETTINGS_DEFAULT_BAKE_LAYERS,
+    SETTINGS_DEFAULT_EFFECT_BUDGET,
+    SETTINGS_DEFAULT_QUALITY_AUTO,
+    SETTINGS_SAVE_DELAY
 )
 from app.helpers.display import fullscreen_resolution, window_resolution, \
     default_rate
 from app.helpers.localization import default_language
 from app.helpers.paths import settings_path
 from app.utils.audiovolumes import AudioVolumes
+from app.utils.statestore import StateStore
 
 VERSION = 3
 
+# Change events
+EVENT_VOLUMES = 'volumes'
+EVENT_PARTICLES = 'particles'
+EVENT_SUBTITLES = 'subtitles'
+EVENT_DRAW_RATE = 'draw_rate'
+EVENT_QUALITY = 'quality'
+
+# Key in settings.json => type
+# audio_volumes is stored as a nested object
+FIELDS = {
+    'version': int,
+    'vsync': bool,
+    'show_fps': bool,
+    'fullscreen': bool,
+    'antialiasing': int,
+    'particles': (int, float),
+    'bake_layers': bool,
+    'effect_budget': (int, float),
+    'quality_auto': bool,
+    'draw_rate': int,
+    'audio_driver': str,
+    'subtitle_enabled': bool,
+    'subtitle_size': int,
+    'language': str,
+    'rumble': bool,
+    'debug': bool,
+    'base_width': int,
+    'base_height': int,
+    'skip_slowmo': bool,
+}
+
 
 class SettingsState:
-    """ Game settings """
+    """
+    Game settings
+
+    The settings are loaded from disk once, load() hands out the live
+    object afterwards. save() writes the file in the background after
+    SETTINGS_SAVE_DELAY seconds, so a burst of changes ends up in one write.
+    """
+
+    _current = None
+    _subscribers = {}
+    _lock = threading.RLock()
 
     def __init__(self):
         """ Constructor """
@@ -45,6 +91,9 @@ class SettingsState:
         self._fullscreen = SETTINGS_DEFAULT_FULLSCREEN
         self._antialiasing = SETTINGS_DEFAULT_ANTIALIASING
         self._particles = SETTINGS_DEFAULT_PARTICLES
+        self._bake_layers = SETTINGS_DEFAULT_BAKE_LAYERS
+        self._effect_budget = SETTINGS_DEFAULT_EFFECT_BUDGET
+        self._quality_auto = SETTINGS_DEFAULT_QUALITY_AUTO
         self._draw_rate = SETTINGS_DEFAULT_DRAW_RATE
 
         # Audio
@@ -74,11 +123,21 @@ class SettingsState:
     def exists() -> bool:
         """ Check if there is an existing settings file for the launcher """
 
-        return os.path.exists(settings_path())
+        return StateStore.exists(settings_path())
 
     @staticmethod
     def load():
-        """ Loads the settings state """
+        """ Get the live settings state, read it from disk on first use """
+
+        with SettingsState._lock:
+            if SettingsState._current is None:
+                SettingsState._current = SettingsState.read()
+
+            return SettingsState._current
+
+    @staticmethod
+    def read():
+        """ Read the settings state from disk """
 
         try:
             return SettingsState._load()
@@ -99,28 +158,107 @@ class SettingsState:
         @return: SettingsState
         """
 
-        with open(settings_path(), 'r', encoding=DEFAULT_ENCODING) as f:
-            state = jsonpickle.decode(f.read())
+        return SettingsState.from_dict(StateStore.read(settings_path()))
+
+    def save(self) -> None:
+        """
+        Make this the live state and write it to disk after a short delay
+        """
+
+        with SettingsState._lock:
+            SettingsState._current = self
+
+        StateStore.write(settings_path(), self.to_dict(), SETTINGS_SAVE_DELAY)
+
+    def to_dict(self) -> dict:
+        """ Settings as plain JSON data """
 
-            # jsonpickle don't calls __init__()
-            # So when loading a state attributes added since then are missing
-            # I added a version number
-            # If the state version from the code is newer than the stored version
-            # discard the old settings state and return a new one
-            if SettingsState().version != state.version:
-                return SettingsState()
+        data = {key: getattr(self, '_' + key) for key in FIELDS}
+        data['audio_volumes'] = self._audio_volumes.to_dict()
 
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Create a settings state from plain JSON data
+        @raise ValueError: if the data is invalid
+        """
+
+        state = cls()
+
+        # Settings of another version are discarded
+        if data.get('version') != state.version:
             return state
 
-    def save(self) -> None:
-        """ Save settings as json file """
+        for key, value_type in FIELDS.items():
+            if key == 'version' or key not in data:
+                continue
+
+            value = data[key]
+
+            # bool is a subclass of int
+            if not isinstance(value, value_type) or (
+                    isinstance(value, bool) and value_type is not bool
+            ):
+                raise ValueError(f"settings: {key} has an invalid type")
+
+            setattr(state, key, value)
+
+        if 'audio_volumes' in data:
+            state.audio_volumes = AudioVolumes.from_dict(data['audio_volumes'])
+
+        return state
+
+    def copy(self):
+        """ Detached copy, e.g. to compare settings after changing them """
+
+        return copy.deepcopy(self)
+
+    @staticmethod
+    def subscribe(event: str, callback: callable) -> None:
+        """
+        Call back on a change event with the settings state
+        Bound methods are held weakly so the subscriber may go away
+        """
+
+        subscribers = SettingsState._subscribers.setdefault(event, [])
+
+        if any(ref() == callback for ref in subscribers):
+            return
+
+        if hasattr(callback, '__self__'):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback  # pylint: disable=unnecessary-lambda-assignment
+
+        subscribers.append(ref)
+
+    @staticmethod
+    def unsubscribe(event: str, callback: callable) -> None:
+        """ Remove a subscriber """
 
-        directory = os.path.dirname(settings_path())
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+        SettingsState._subscribers[event] = [
+            ref for ref in SettingsState._subscribers.get(event, [])
+            if ref() not in (None, callback)
+        ]
 
-        with open(settings_path(), 'w', encoding=DEFAULT_ENCODING) as f:
-            f.write(jsonpickle.encode(self, unpicklable=True))
+    def publish(self, event: str) -> None:
+        """ Notify the subscribers of an event """
+
+        refs = SettingsState._subscribers.get(event, [])
+        alive = []
+
+        for ref in refs:
+            callback = ref()
+
+            if callback is None:
+                continue
+
+            alive.append(ref)
+            callback(self)
+
+        SettingsState._subscribers[event] = alive
 
     @property
     def show_fps(self) -> bool:
@@ -145,6 +283,7 @@ class SettingsState:
         """ V-Sync """
 
         self._vsync = value
+        self.publish(EVENT_DRAW_RATE)
 
     @property
     def fullscreen(self) -> bool:
@@ -177,7 +316,7 @@ class SettingsState:
     def audio_volumes(self, value: AudioVolumes) -> None:
         """ Audio volumes """
 
-        self.audio_volumes = value
+        self._audio_volumes = value
 
     @property
     def subtitle_enabled(self) -> bool:
@@ -190,6 +329,7 @@ class SettingsState:
         """ Subtitles enabled """
 
         self._subtitle_enabled = value
+        self.publish(EVENT_SUBTITLES)
 
     @property
     def subtitle_size(self) -> int:
@@ -202,6 +342,7 @@ class SettingsState:
         """ Subtitle size """
 
         self._subtitle_size = value
+        self.publish(EVENT_SUBTITLES)
 
     @property
     def antialiasing(self) -> int:
@@ -225,6 +366,44 @@ class SettingsState:
         """ Particle count modifier """
 
         self._particles = value
+        self.publish(EVENT_PARTICLES)
+
+    @property
+    def bake_layers(self) -> bool:
+        """ Bake the static layers into textures """
+
+        return self._bake_layers
+
+    @bake_layers.setter
+    def bake_layers(self, value: bool) -> None:
+        """ Bake the static layers into textures """
+
+        self._bake_layers = value
+
+    @property
+    def effect_budget(self) -> float:
+        """ Milliseconds the effects may take per frame """
+
+        return self._effect_budget
+
+    @effect_budget.setter
+    def effect_budget(self, value: float) -> None:
+        """ Milliseconds the effects may take per frame """
+
+        self._effect_budget = value
+
+    @property
+    def quality_auto(self) -> bool:
+        """ Adapt the quality to the measured frame times """
+
+        return self._quality_auto
+
+    @quality_auto.setter
+    def quality_auto(self, value: bool) -> None:
+        """ Adapt the quality to the measured frame times """
+
+        self._quality_auto = value
+        self.publish(EVENT_QUALITY)
 
     @property
     def draw_rate(self) -> int:
@@ -235,6 +414,7 @@ class SettingsState:
     def draw_rate(self, value: int) -> None:
         """ Set the draw_rate """
         self._draw_rate = value
+        self.publish(EVENT_DRAW_RATE)
 
     @property
     def actual_draw_rate(self) -> int:
@@ -253,6 +433,12 @@ class SettingsState:
 
         return self._debug
 
+    @debug.setter
+    def debug(self, value: bool) -> None:
+        """ Enable debug mode """
+
+        self._debug = value
+
     @property
     def audio_driver(self) -> str:
         """ Get audio driver """
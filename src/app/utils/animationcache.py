@@ -0,0 +1,103 @@
+""" Animation cache """
+
+import logging
+import os
+import threading
+
+from arcade import TextureAnimation, TextureAnimationSprite, TextureKeyframe
+from arcade.resources import resolve
+
+from app.helpers.sprite import load_gif_animation
+from app.helpers.string import label_value
+
+
+class AnimationCache:
+    """
+    Process-wide cache of decoded GIF animations.
+
+    The entries are keyed by (path, flip). A GIF is decoded only once,
+    the flipped variant reuses the textures of the decoded frames
+    with a flip transform, so it is neither decoded nor uploaded again.
+    All sprites made from an entry share its keyframes.
+    """
+
+    _animations = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(
+            cls,
+            resource_name: str,
+            flip_horizontally: bool = False
+    ) -> TextureAnimation:
+        """ Get the animation of a GIF, decode it if it isn't cached yet """
+
+        path = os.path.abspath(resolve(resource_name))
+        key = (path, flip_horizontally)
+
+        with cls._lock:
+            animation = cls._animations.get(key)
+
+            if animation:
+                return animation
+
+            animation = cls._decoded(path)
+
+            if flip_horizontally:
+                animation = TextureAnimation(keyframes=[
+                    TextureKeyframe(
+                        keyframe.texture.flip_left_right(),
+                        keyframe.duration
+                    )
+                    for keyframe in animation.keyframes
+                ])
+                cls._animations[key] = animation
+
+        return animation
+
+    @classmethod
+    def _decoded(cls, path: str) -> TextureAnimation:
+        """ Get the unflipped animation, the lock has to be held """
+
+        key = (path, False)
+
+        if key not in cls._animations:
+            cls._animations[key] = load_gif_animation(path)
+            logging.debug(label_value('Animation decoded', path))
+
+        return cls._animations[key]
+
+    @classmethod
+    def sprite(
+            cls,
+            resource_name: str,
+            flip_horizontally: bool = False
+    ) -> TextureAnimationSprite:
+        """ Create a sprite playing a cached animation """
+
+        return TextureAnimationSprite(
+            animation=cls.get(resource_name, flip_horizontally)
+        )
+
+    @classmethod
+    def evict(cls, resource_name: str | None = None) -> None:
+        """
+        Remove an animation with its flipped variant from the cache
+        Without a resource name the whole cache is cleared
+        """
+
+        with cls._lock:
+            if resource_name is None:
+                cls._animations.clear()
+                return
+
+            path = os.path.abspath(resolve(resource_name))
+
+            for flip_horizontally in [False, True]:
+                cls._animations.pop((path, flip_horizontally), None)
+
+    @classmethod
+    def size(cls) -> int:
+        """ Number of cached animations """
+
+        return len(cls._animations)
@@ -0,0 +1,204 @@
+""" Texture atlas manifest """
+
+import json
+import logging
+import math
+import os
+
+import PIL.Image
+import arcade
+
+from app.constants.gameinfo import DEFAULT_ENCODING
+from app.constants.layers import LAYER_EAGLE
+from app.helpers.string import label_value
+
+MANIFEST_VERSION = 1
+
+# Layers with an image larger than this get an atlas of their own
+ATLAS_BYPASS_SIZE = 2048
+
+# Border arcade keeps around every image in the atlas
+ATLAS_BORDER = 2
+
+# Room for the packing waste, the UI and the player
+ATLAS_SLACK = 1.5
+
+# GIF animations of the effects, relative to the root directory
+EFFECT_ANIMATIONS = [
+    os.path.join('resources', 'animations', 'vhs.gif'),
+    os.path.join('resources', 'animations', 'grain.gif'),
+]
+EAGLE_ANIMATION = os.path.join(
+    'resources', 'images', 'sprites', 'eagle', 'flying', 'animation.gif'
+)
+
+
+class AtlasManifest:
+    """
+    Sizes of the textures atlases of a map.
+
+    The manifest is generated offline by the 'atlas' duty from the TMX
+    and the effects of the map and stored next to the map as
+    <map>.atlas.json. It lists every texture with its size, the size
+    the default atlas needs and the layers which bypass the default atlas
+    because of an oversized image, together with the size of their own atlas.
+    """
+
+    def __init__(self, size: list, bypass: dict, textures: list):
+        """
+        Constructor
+        @param size: [width, height] of the default atlas
+        @param bypass: Layer name => [width, height] of its own atlas
+        @param textures: Textures as dicts with layer, width and height
+        """
+        self.size = size
+        self.bypass = bypass
+        self.textures = textures
+
+    @staticmethod
+    def path(root_dir: str, map_name: str) -> str:
+        """ Path of the manifest of a map """
+
+        return os.path.join(
+            root_dir, 'resources', 'maps', f"{map_name}.atlas.json"
+        )
+
+    @staticmethod
+    def load(root_dir: str, map_name: str):
+        """
+        Read the manifest of a map
+        @return: The manifest or None if there is no valid one
+        """
+
+        try:
+            with open(
+                    AtlasManifest.path(root_dir, map_name),
+                    'r',
+                    encoding=DEFAULT_ENCODING
+            ) as f:
+                data = json.load(f)
+        except OSError as e:
+            logging.error(e)
+            return None
+        except ValueError as e:
+            logging.error(e)
+            return None
+
+        if data.get('version') != MANIFEST_VERSION:
+            return None
+
+        return AtlasManifest(data['size'], data['bypass'], data['textures'])
+
+    def save(self, root_dir: str, map_name: str) -> str:
+        """ Write the manifest next to the map """
+
+        path = AtlasManifest.path(root_dir, map_name)
+
+        with open(path, 'w', encoding=DEFAULT_ENCODING) as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'size': self.size,
+                'bypass': self.bypass,
+                'textures': self.textures
+            }, f, indent=4)
+
+        return path
+
+    @staticmethod
+    def build(root_dir: str, map_name: str):
+        """ Collect the textures of a map and size its atlases """
+
+        tilemap = arcade.TileMap(
+            os.path.join(root_dir, 'resources', 'maps', f"{map_name}.tmx"),
+            lazy=True
+        )
+
+        textures = []
+
+        for name, sprite_list in tilemap.sprite_lists.items():
+            # The atlas stores every image once
+            images = {}
+
+            for sprite in sprite_list:
+                keyframes = getattr(sprite, 'animation', None)
+                frames = [sprite.texture]
+
+                if keyframes:
+                    frames += [frame.texture for frame in keyframes.keyframes]
+
+                for texture in frames:
+                    images[texture.image_data.hash] = texture.image.size
+
+            textures += [
+                {'layer': name, 'width': width, 'height': height}
+                for width, height in images.values()
+            ]
+
+        animations = list(EFFECT_ANIMATIONS)
+
+        if LAYER_EAGLE in tilemap.sprite_lists:
+            animations.append(EAGLE_ANIMATION)
+
+        for animation in animations:
+            path = os.path.join(root_dir, animation)
+
+            if not os.path.exists(path):
+                logging.error(label_value('Animation missing', path))
+                continue
+
+            with PIL.Image.open(path) as image:
+                textures += [{
+                    'layer': None,
+                    'width': image.width,
+                    'height': image.height
+                }] * getattr(image, 'n_frames', 1)
+
+        bypass = {
+            texture['layer'] for texture in textures
+            if max(texture['width'], texture['height']) > ATLAS_BYPASS_SIZE
+        }
+
+        return AtlasManifest(
+            AtlasManifest.square(
+                [t for t in textures if t['layer'] not in bypass]
+            ),
+            {
+                layer: AtlasManifest.stacked(
+                    [t for t in textures if t['layer'] == layer]
+                )
+                for layer in sorted(bypass)
+            },
+            textures
+        )
+
+    @staticmethod
+    def stacked(textures: list) -> list:
+        """
+        Size of an atlas with the textures on top of each other
+        It fits no matter in which order they are added
+        """
+
+        return [
+            max(t['width'] for t in textures) + ATLAS_BORDER * 2,
+            sum(t['height'] + ATLAS_BORDER * 2 for t in textures)
+        ]
+
+    @staticmethod
+    def square(textures: list) -> list:
+        """ Power of two square atlas size holding the textures """
+
+        if not textures:
+            return [0, 0]
+
+        area = sum(
+            (t['width'] + ATLAS_BORDER * 2) * (t['height'] + ATLAS_BORDER * 2)
+            for t in textures
+        )
+        longest = max(
+            max(t['width'], t['height']) + ATLAS_BORDER * 2 for t in textures
+        )
+        side = 2 ** math.ceil(
+            math.log2(max(math.sqrt(area * ATLAS_SLACK), longest))
+        )
+
+        return [side, side]
@@ -18,6 +18,34 @@ class AudioVolumes:
         self._volume_speech = volume_speech
         self._volume_master = volume_master
 
+    def to_dict(self) -> dict:
+        """ Volumes as plain JSON data """
+
+        return {
+            'volume_music': self._volume_music,
+            'volume_sound': self._volume_sound,
+            'volume_speech': self._volume_speech,
+            'volume_master': self._volume_master
+        }
+
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        Create audio volumes from plain JSON data
+        @raise ValueError: if the data is invalid
+        """
+
+        keys = ['volume_music', 'volume_sound', 'volume_master', 'volume_speech']
+
+        if not isinstance(data, dict) or not all(
+                isinstance(data.get(key), (int, float))
+                and not isinstance(data.get(key), bool)
+                for key in keys
+        ):
+            raise ValueError('settings: invalid audio volumes')
+
+        return AudioVolumes(**{key: data[key] for key in keys})
+
     @property
     def volume_master(self) -> int:
         """ Volume master """
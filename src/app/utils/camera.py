@@ -59,6 +59,13 @@ class Camera(Camera2D):
         self._state = SettingsState().load()
         self._player = player
 
+    @property
+    def visible_area(self) -> arcade.types.Rect:
+        """ Area of the world the camera shows """
+
+        x, y = self.position
+        return arcade.XYWH(x, y, self.width, self.height)
+
     @property
     def camera_movement(self) -> tuple:
         """ Get camera movement """
@@ -0,0 +1,209 @@
+""" Glyph atlas """
+
+import logging
+import os
+
+import arcade
+from PIL import Image, ImageDraw, ImageFont
+
+from app.constants.fonts import FONT_FILES
+from app.helpers.string import label_value
+
+# Font sizes are points like in pyglet, which renders at 96 DPI
+FONT_DPI = 96
+POINTS_PER_INCH = 72
+
+GLYPH_COLOR = (255, 255, 255, 255)
+
+
+class Glyph:
+    """ Rasterized character """
+
+    def __init__(
+            self,
+            texture: arcade.Texture | None,
+            offset: tuple,
+            advance: float
+    ):
+        """
+        Constructor
+        @param texture: Image of the character, None for white space
+        @param offset: Center of the texture relative to the pen position
+                       on the baseline
+        @param advance: Distance to the next pen position
+        """
+        self.texture = texture
+        self.offset = offset
+        self.advance = advance
+
+
+class GlyphAtlas:
+    """
+    Characters of a font size rasterized once per process.
+
+    The glyphs are drawn with PIL and added to the default texture
+    atlas when they are rasterized, so drawing them never uploads
+    anything. get() shares one instance per (font, size), add() only
+    rasterizes the characters which are missing. GlyphText draws them.
+    """
+
+    _atlases = {}
+
+    def __init__(self, path: str, font_name: str, font_size: int):
+        """ Constructor """
+
+        self._font = ImageFont.truetype(
+            path,
+            round(font_size * FONT_DPI / POINTS_PER_INCH)
+        )
+        self._name = f"{font_name}:{font_size}"
+        self.ascent, self.descent = self._font.getmetrics()
+        self.glyphs = {}
+
+    @classmethod
+    def get(cls, root_dir: str, font_name: str, font_size: int):
+        """ Get the glyph atlas of a font size """
+
+        key = (font_name, font_size)
+
+        if key not in cls._atlases:
+            path = os.path.join(root_dir, 'resources', 'fonts', FONT_FILES[font_name])
+            cls._atlases[key] = GlyphAtlas(path, font_name, font_size)
+
+        return cls._atlases[key]
+
+    def add(self, chars) -> None:
+        """ Rasterize the characters which aren't in the atlas yet """
+
+        missing = sorted(set(chars) - self.glyphs.keys())
+
+        if not missing:
+            return
+
+        atlas = arcade.get_window().ctx.default_atlas
+
+        for char in missing:
+            left, top, right, bottom = self._font.getbbox(char)
+            advance = self._font.getlength(char)
+
+            if right <= left or bottom <= top:
+                self.glyphs[char] = Glyph(None, (0, 0), advance)
+                continue
+
+            image = Image.new('RGBA', (right - left, bottom - top))
+            ImageDraw.Draw(image).text(
+                (-left, -top),
+                char,
+                font=self._font,
+                fill=GLYPH_COLOR
+            )
+
+            texture = arcade.Texture(
+                image,
+                hash=f"glyph:{self._name}:{ord(char)}",
+                hit_box_algorithm=arcade.hitbox.algo_bounding_box
+            )
+            atlas.add(texture)
+
+            # The top of the image is the ascent above the baseline
+            self.glyphs[char] = Glyph(
+                texture,
+                (
+                    left + image.width / 2,
+                    self.ascent - top - image.height / 2
+                ),
+                advance
+            )
+
+        logging.debug(label_value(f"Glyphs rasterized {self._name}", len(missing)))
+
+    def width(self, text: str) -> float:
+        """ Width of a line of text """
+
+        return sum(
+            self.glyphs[char].advance for char in text if char in self.glyphs
+        )
+
+
+class GlyphText:
+    """
+    Text drawn with a pool of glyph sprites.
+
+    The sprite list is allocated for a capacity up front and the
+    sprites are only retextured and moved when the text changes,
+    so changing the text creates neither textures nor OpenGL objects.
+    """
+
+    def __init__(self, capacity: int, color: tuple = GLYPH_COLOR):
+        """ Constructor """
+
+        self._color = color
+        self._sprites = []
+        self._sprite_list = arcade.SpriteList(capacity=capacity)
+
+    def reserve(self, count: int) -> None:
+        """ Fill the pool up front and draw it once hidden """
+
+        while len(self._sprites) < count:
+            self.add_sprite()
+
+        # The first draw creates the vertex array
+        self._sprite_list.draw()
+
+    def add_sprite(self) -> None:
+        """ Add a hidden glyph sprite to the pool """
+
+        sprite = arcade.Sprite()
+        sprite.color = self._color
+        sprite.visible = False
+        self._sprites.append(sprite)
+        self._sprite_list.append(sprite)
+
+    def show(
+            self,
+            glyph_atlas: GlyphAtlas,
+            text: str,
+            x: float,
+            baseline: float
+    ) -> None:
+        """
+        Lay out a text, a line break continues one line below at x
+        @param baseline: Baseline of the first line
+        """
+
+        left = x
+        count = 0
+
+        for char in text:
+            if char == '\n':
+                x = left
+                baseline -= glyph_atlas.ascent + glyph_atlas.descent
+                continue
+
+            glyph = glyph_atlas.glyphs[char]
+
+            if glyph.texture:
+                if count == len(self._sprites):
+                    self.add_sprite()
+
+                sprite = self._sprites[count]
+                sprite.texture = glyph.texture
+                sprite.position = (x + glyph.offset[0], baseline + glyph.offset[1])
+                sprite.visible = True
+                count += 1
+
+            x += glyph.advance
+
+        for sprite in self._sprites[count:]:
+            sprite.visible = False
+
+    def hide(self) -> None:
+        """ Hide all glyphs """
+
+        for sprite in self._sprites:
+            sprite.visible = False
+
+    def draw(self) -> None:
+        """ Draw the text """
+
+        self._sprite_list.draw()
@@ -0,0 +1,78 @@
+""" GPU timer """
+
+import ctypes
+from collections import deque
+from contextlib import contextmanager
+
+from pyglet import gl
+
+# Queries in flight, the results arrive a few frames late
+GPU_TIMER_QUERIES = 4
+
+NANOSECONDS_PER_MS = 1000000
+
+
+class GpuTimer:
+    """
+    Measures how long the GPU takes for a pass with timer queries.
+
+    The result of a query is only read once the GPU made it available,
+    so measuring never waits for the GPU to catch up. If all queries are
+    still in flight, the pass isn't measured.
+    """
+
+    def __init__(self):
+        """ Constructor """
+
+        self._queries = (gl.GLuint * GPU_TIMER_QUERIES)()
+        gl.glGenQueries(GPU_TIMER_QUERIES, self._queries)
+        self._free = deque(self._queries)
+        self._pending = deque()
+
+    @contextmanager
+    def measure(self):
+        """ Measure the commands issued in the block """
+
+        if not self._free:
+            yield
+            return
+
+        query = self._free.popleft()
+        gl.glBeginQuery(gl.GL_TIME_ELAPSED, query)
+
+        try:
+            yield
+        finally:
+            gl.glEndQuery(gl.GL_TIME_ELAPSED)
+            self._pending.append(query)
+
+    def results(self) -> list:
+        """ Milliseconds of the passes the GPU finished since the last call """
+
+        results = []
+        available = gl.GLint()
+        value = gl.GLuint64()
+
+        while self._pending:
+            query = self._pending[0]
+            gl.glGetQueryObjectiv(
+                query,
+                gl.GL_QUERY_RESULT_AVAILABLE,
+                ctypes.byref(available)
+            )
+
+            if not available.value:
+                break
+
+            gl.glGetQueryObjectui64v(query, gl.GL_QUERY_RESULT, ctypes.byref(value))
+            results.append(value.value / NANOSECONDS_PER_MS)
+            self._free.append(self._pending.popleft())
+
+        return results
+
+    def release(self) -> None:
+        """ Delete the queries """
+
+        gl.glDeleteQueries(GPU_TIMER_QUERIES, self._queries)
+        self._free.clear()
+        self._pending.clear()
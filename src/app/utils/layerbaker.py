@@ -0,0 +1,306 @@
+""" Layer baker """
+
+import logging
+import math
+
+import arcade
+import numpy as np
+from arcade.gl.geometry import quad_2d
+from arcade.types import Rect
+
+from app.helpers.string import label_value
+
+# Size of the baked chunks in world units
+BAKE_CHUNK_SIZE = 2048
+
+# Chunks baked per frame while the camera moves
+BAKE_CHUNKS_PER_FRAME = 2
+
+# Baked chunks further away from the visible area are evicted
+BAKE_EVICT_DISTANCE = 2048
+
+VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in vec2 in_vert;
+in vec2 in_uv;
+
+out vec2 v_uv;
+
+void main() {
+    v_uv = in_uv;
+    gl_Position = window.projection * window.view * vec4(in_vert, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D texture0;
+
+in vec2 v_uv;
+
+out vec4 f_color;
+
+void main() {
+    f_color = texture(texture0, v_uv);
+}
+"""
+
+
+class LayerGroup:
+    """ Consecutive static layers baked together """
+
+    def __init__(self, sprite_lists: list):
+        """ Constructor """
+
+        self.sprite_lists = sprite_lists
+        self.counts = []
+        self.bounds = np.empty((0, 4))
+        self.chunks = {}
+        self.scale = None
+
+        self.measure()
+
+    def measure(self) -> None:
+        """ Store the sprite counts and the bounds of the sprites """
+
+        self.counts = [len(sprite_list) for sprite_list in self.sprite_lists]
+        self.bounds = np.array([
+            (sprite.left, sprite.right, sprite.bottom, sprite.top)
+            for sprite_list in self.sprite_lists
+            for sprite in sprite_list
+        ]).reshape(-1, 4)
+
+    @property
+    def changed(self) -> bool:
+        """ Were sprites added or removed since the last bake """
+
+        return self.counts != [len(sprite_list) for sprite_list in self.sprite_lists]
+
+    @staticmethod
+    def keys(area: Rect, margin: float = 0) -> list:
+        """ Chunks overlapping an area """
+
+        left, right, bottom, top = area.lrbt
+
+        return [
+            (x, y)
+            for x in range(
+                math.floor((left - margin) / BAKE_CHUNK_SIZE),
+                math.floor((right + margin) / BAKE_CHUNK_SIZE) + 1
+            )
+            for y in range(
+                math.floor((bottom - margin) / BAKE_CHUNK_SIZE),
+                math.floor((top + margin) / BAKE_CHUNK_SIZE) + 1
+            )
+        ]
+
+    def is_empty(self, key: tuple) -> bool:
+        """ Check if no sprite overlaps a chunk """
+
+        left, bottom = key[0] * BAKE_CHUNK_SIZE, key[1] * BAKE_CHUNK_SIZE
+        right, top = left + BAKE_CHUNK_SIZE, bottom + BAKE_CHUNK_SIZE
+        b = self.bounds
+
+        return not np.any(
+            (b[:, 0] < right) & (b[:, 1] > left)
+            & (b[:, 2] < top) & (b[:, 3] > bottom)
+        )
+
+
+class LayerBaker:
+    """
+    Renders runs of static layers into textures.
+
+    The world is split into chunks of BAKE_CHUNK_SIZE. A chunk is baked
+    into a texture at the resolution of the window when it comes into
+    view, and drawn as a single textured quad afterwards.
+    Chunks are baked again when the window size changes or sprites are
+    added to or removed from a group, and evicted when the camera is
+    far away. The textures hold premultiplied alpha, so layers baked
+    together blend exactly like drawing their sprites.
+    """
+
+    def __init__(self, groups: list):
+        """ Constructor """
+
+        self._groups = [LayerGroup(sprite_lists) for sprite_lists in groups]
+        self._first = {}
+        self._members = set()
+        self._program = None
+        self._budget = 0
+
+        for group in self._groups:
+            self._first[id(group.sprite_lists[0])] = group
+            self._members.update(map(id, group.sprite_lists))
+
+        logging.info(
+            label_value(
+                'Baked layer groups',
+                ', '.join(
+                    '+'.join(str(len(sprite_list)) for sprite_list in group.sprite_lists)
+                    for group in self._groups
+                )
+            )
+        )
+
+    def covers(self, sprite_list: arcade.SpriteList) -> bool:
+        """ Check if a sprite list is baked """
+
+        return id(sprite_list) in self._members
+
+    def group(self, sprite_list: arcade.SpriteList) -> LayerGroup | None:
+        """ Get the group a sprite list starts """
+
+        return self._first.get(id(sprite_list))
+
+    @property
+    def size(self) -> int:
+        """ Bytes of the baked textures """
+
+        return sum(
+            chunk[0].color_attachments[0].width
+            * chunk[0].color_attachments[0].height * 4
+            for group in self._groups
+            for chunk in group.chunks.values()
+            if chunk
+        )
+
+    def release(self) -> None:
+        """ Release the baked textures """
+
+        for group in self._groups:
+            group.chunks.clear()
+
+        self._groups = []
+        self._first = {}
+        self._members = set()
+        self._program = None
+
+    def start_frame(self, chunks: int = BAKE_CHUNKS_PER_FRAME) -> None:
+        """ Set the number of chunks which may be baked until the next frame """
+
+        self._budget = chunks
+
+    def prepare(self, area: Rect, scale: float) -> None:
+        """ Bake the visible chunks of all groups right away """
+
+        self.start_frame(len(self._groups) * len(LayerGroup.keys(area)))
+
+        for group in self._groups:
+            self.update(group, area, scale)
+
+    def update(self, group: LayerGroup, area: Rect, scale: float) -> bool:
+        """
+        Bake the visible chunks of a group and evict the distant ones
+        @param area: Visible area in world coordinates
+        @param scale: Pixels per world unit
+        @return: False if not all visible chunks are baked yet
+        """
+
+        if group.changed or group.scale != scale:
+            group.chunks.clear()
+            group.measure()
+            group.scale = scale
+
+        keep = set(group.keys(area, BAKE_EVICT_DISTANCE))
+        for key in list(group.chunks):
+            if key not in keep:
+                del group.chunks[key]
+
+        for key in group.keys(area):
+            if key in group.chunks:
+                continue
+
+            if self._budget <= 0:
+                return False
+
+            group.chunks[key] = self.bake(group, key, scale)
+            self._budget -= 1
+
+        return True
+
+    def draw(self, group: LayerGroup, area: Rect) -> None:
+        """ Draw the baked chunks of a group which overlap an area """
+
+        ctx = arcade.get_window().ctx
+
+        if not self._program:
+            self._program = ctx.program(
+                vertex_shader=VERTEX_SHADER,
+                fragment_shader=FRAGMENT_SHADER
+            )
+
+        with ctx.enabled(ctx.BLEND):
+            ctx.blend_func = ctx.ONE, ctx.ONE_MINUS_SRC_ALPHA
+
+            for key in group.keys(area):
+                chunk = group.chunks.get(key)
+
+                if not chunk:
+                    continue
+
+                framebuffer, geometry = chunk
+                framebuffer.color_attachments[0].use(0)
+                geometry.render(self._program)
+
+    @staticmethod
+    def bake(group: LayerGroup, key: tuple, scale: float) -> tuple | None:
+        """
+        Render a chunk of a group into a texture
+        @return: Framebuffer and quad geometry, None if the chunk is empty
+        """
+
+        if group.is_empty(key):
+            return None
+
+        ctx = arcade.get_window().ctx
+        size = min(
+            math.ceil(BAKE_CHUNK_SIZE * scale),
+            ctx.info.MAX_TEXTURE_SIZE
+        )
+
+        framebuffer = ctx.framebuffer(
+            color_attachments=[
+                # Filtering at fractional positions must not wrap around
+                ctx.texture(
+                    (size, size),
+                    components=4,
+                    wrap_x=ctx.CLAMP_TO_EDGE,
+                    wrap_y=ctx.CLAMP_TO_EDGE
+                )
+            ]
+        )
+
+        center = (
+            (key[0] + 0.5) * BAKE_CHUNK_SIZE,
+            (key[1] + 0.5) * BAKE_CHUNK_SIZE
+        )
+        half = BAKE_CHUNK_SIZE / 2
+
+        camera = arcade.camera.Camera2D(
+            viewport=arcade.LBWH(0, 0, size, size),
+            position=center,
+            projection=arcade.LRBT(-half, half, -half, half),
+            render_target=framebuffer
+        )
+
+        with camera.activate():
+            framebuffer.clear(color=(0, 0, 0, 0))
+
+            # Premultiply the colors and accumulate the coverage in alpha
+            blend = (ctx.SRC_ALPHA, ctx.ONE_MINUS_SRC_ALPHA,
+                     ctx.ONE, ctx.ONE_MINUS_SRC_ALPHA)
+
+            for sprite_list in group.sprite_lists:
+                sprite_list.draw(blend_function=blend)
+
+        geometry = quad_2d(size=(BAKE_CHUNK_SIZE, BAKE_CHUNK_SIZE), pos=center)
+
+        return framebuffer, geometry
@@ -1,18 +1,15 @@
 """ Level """
 
-import json
-import logging
-import os
-import time
+import gc
 
 import arcade
 import pyglet
 from arcade import FACE_RIGHT, FACE_LEFT
 
-from app.constants.gameinfo import DEFAULT_ENCODING, MAPS_FIRST
+from app.constants.gameinfo import MAPS_FIRST
 from app.constants.layers import (
-    LAYER_WALL,
-    LAYER_FADEOUT, LAYER_PLAYER, LAYER_FADEIN, LAYER_DOUBLEJUMP
+    LAYER_FADEOUT, LAYER_PLAYER, LAYER_FADEIN, LAYER_DOUBLEJUMP,
+    LAYERS_VOICEOVER
 )
 from app.constants.player import (
     PLAYER_MOVE_SPEED,
@@ -23,12 +20,19 @@ from app.constants.player import (
     PLAYER_MOVE_ANGLE
 )
 from app.containers.callbacks import Callbacks
+from app.containers.level_data import LevelData
 from app.effects.effect_manager import EffectManager
 from app.entities.player import Player
 from app.state.savegamestate import SavegameState
 from app.state.settingsstate import SettingsState
 from app.utils.audiovolumes import AudioVolumes
 from app.utils.camera import Camera
+from app.utils.animationcache import AnimationCache
+from app.utils.levelcache import LevelCache
+from app.utils.levelloader import LevelLoader
+from app.utils.memoryreport import MemoryReport
+from app.utils.proximitytriggers import ProximityTriggers
+from app.utils.tracer import trace
 from app.utils.voiceovertriggers import VoiceOverTiggers, \
     LIGHT_COLLISION_CHECK_THRESHOLD
 from app.views.tobecontinued import ToBeContinued
@@ -71,95 +75,121 @@ class Level:
         self._player = None
         self._state = None
         self._first_drawed = False
+        self._preloader = None
+        self._triggers = None
+        self._walls = None
+        self._map_config = None
 
-    def setup(self, root_dir: str, map_name: str, audio_volumes: AudioVolumes):
+    def setup(
+            self,
+            root_dir: str,
+            map_name: str,
+            audio_volumes: AudioVolumes,
+            level_data: LevelData | None = None
+    ):
         """ Setup level """
 
         self._first_drawed = False
         self._root_dir = root_dir
         self._state = SettingsState().load()
+        self._preloader = None
+
+        if not level_data:
+            level_data = LevelLoader(root_dir, map_name).load()
+
+        profiler = level_data.profiler
 
-        self.load_tilemap(
-            os.path.join(root_dir, 'resources', 'maps', f"{map_name}.tmx"))
-        self.load_config()
+        with profiler.stage('player'):
+            self.load_tilemap(level_data)
 
-        h = arcade.get_window().height
+        with profiler.stage('camera'):
+            h = arcade.get_window().height
 
-        zoom = h / self._state.base_height
-        self._camera = Camera(zoom=zoom)
-        self._camera.setup(player=self._player.sprite)
-        self._camera.on_update(0)
+            zoom = h / self._state.base_height
+            self._camera = Camera(zoom=zoom)
+            self._camera.setup(player=self._player.sprite)
+            self._camera.on_update(0)
 
-        self._camera_gui = arcade.camera.Camera2D()
+            self._camera_gui = arcade.camera.Camera2D()
 
-        self.setup_physics_engine()
-        self.wait_for_begin()
+        with profiler.stage('physics'):
+            self.setup_physics_engine()
+            self.wait_for_begin()
 
-        config = self.load_config()
-        map_config = {}
+        map_config = level_data.map_config
+        self._map_config = map_config
 
-        if map_name in config:
-            map_config = config[map_name]
+        with profiler.stage('playback'):
+            if level_data.music:
+                self._music = level_data.music.play(
+                    volume=audio_volumes.volume_music_normalized *
+                           VOLUME_MUSIC_MODIFIER,
+                    loop=map_config.music_loop
+                )
 
-        if 'music' in map_config:
-            music_file = os.path.join(root_dir, 'resources', 'music',
-                                      map_config['music'])
-            music = arcade.load_sound(music_file, streaming=True)
-            loop = 'musicLoop' in map_config and map_config['musicLoop']
-            self._music = music.play(
-                volume=audio_volumes.volume_music_normalized *
-                       VOLUME_MUSIC_MODIFIER,
-                loop=loop
+            if level_data.atmo:
+                self._atmo = level_data.atmo.play(
+                    volume=audio_volumes.volume_sound_normalized * VOLUME_ATMO_MODIFIER,
+                    loop=True)
+
+        with profiler.stage('voiceovers'):
+            callbacks = Callbacks(on_level_completed=self.on_level_completed)
+            self._voiceover_triggers = VoiceOverTiggers().setup(
+                voiceover_range=map_config.voiceovers,
+                callbacks=callbacks,
+                tilemap=self._tilemap,
+                subtitles=level_data.subtitles,
+                root_dir=root_dir
             )
 
-        atmo_file = os.path.join(
-            root_dir,
-            'resources',
-            'sounds',
-            'atmos',
-            f"{map_name}.mp3"
-        )
+            self.setup_triggers()
 
-        if os.path.exists(atmo_file):
-            atmo = arcade.load_sound(atmo_file, streaming=True)
-            self._atmo = atmo.play(
-                volume=audio_volumes.volume_sound_normalized * VOLUME_ATMO_MODIFIER,
-                loop=True)
-
-        callbacks = Callbacks(on_level_completed=self.on_level_completed)
-        self._voiceover_triggers = VoiceOverTiggers().setup(
-            voiceover_range=map_config['voiceovers'],
-            callbacks=callbacks,
-            tilemap=self._tilemap
-        )
+        with profiler.stage('effects'):
+            self._effect_manager = EffectManager()
+            self._effect_manager.setup(
+                map_config,
+                self._scene,
+                self._tilemap,
+                root_dir,
+                self._triggers
+            )
+            arcade.get_window().performance_overlay.watch(
+                self._effect_manager,
+                self._scene
+            )
 
-        self._effect_manager = EffectManager()
-        self._effect_manager.setup(
-            map_config,
-            self._scene,
-            self._tilemap,
-            root_dir
-        )
-        color = WHITE
+        with profiler.stage('fade'):
+            color = WHITE
 
-        # If the level is the first
-        if map_name == MAPS_FIRST:
-            color = BLUE
+            # If the level is the first
+            if map_name == MAPS_FIRST:
+                color = BLUE
 
-        # Add fade sprite to scene
-        sprite = arcade.sprite.SpriteSolidColor(
-            width=self._state.base_width,
-            height=self._state.base_height,
-            color=color
-        )
+            # Add fade sprite to scene
+            sprite = arcade.sprite.SpriteSolidColor(
+                width=self._state.base_width,
+                height=self._state.base_height,
+                color=color
+            )
 
-        camera_x, camera_y = self._camera.position
+            camera_x, camera_y = self._camera.position
 
-        sprite.alpha = 255
-        sprite.center_x = camera_x
-        sprite.center_y = camera_y
+            sprite.alpha = 255
+            sprite.center_x = camera_x
+            sprite.center_y = camera_y
+
+            self._scene.add_sprite(LAYER_FADEIN, sprite)
+
+        # Now that the effects have added their sprites
+        with profiler.stage('classify'):
+            self._scene.classify()
 
-        self._scene.add_sprite(LAYER_FADEIN, sprite)
+        if self._state.bake_layers:
+            with profiler.stage('bake'):
+                area = self._camera.visible_area
+                self._scene.bake(area, arcade.get_window().height / area.height)
+
+        profiler.finish()
 
     def setup_physics_engine(self):
         """ Setup physics engine """
@@ -172,25 +202,22 @@ class Level:
         self._physics_engine = arcade.PhysicsEnginePlatformer(
             self._player.sprite,
             ladders=None,
-            walls=self._scene[LAYER_WALL],
+            walls=self._walls,
             gravity_constant=gravity,
         )
 
         self._player.setup_physics_engine(self._physics_engine)
 
-    def load_tilemap(self, path):
+    def load_tilemap(self, level_data: LevelData):
         """ Load tilemap """
 
-        time_start = time.time()
-
-        self._tilemap = arcade.load_tilemap(path)
-        self._scene = arcade.Scene.from_tilemap(self._tilemap)
+        self._tilemap = level_data.tilemap
+        self._scene = level_data.scene
+        self._walls = level_data.walls
         self._player = Player()
         self._player.setup(self._scene[LAYER_PLAYER][0], self._root_dir)
 
-        time_end = time.time() - time_start
-        logging.info(f"Scene loaded in f{time_end} seconds")
-
+    @trace
     def on_update(self, delta_time: float) -> None:
         """ On update"""
 
@@ -234,7 +261,6 @@ class Level:
         self._camera.camera_movement = camera_movement
 
         self.check_collisions()
-        self.check_powerup()
 
         self._effect_manager.on_fixed_update(delta_time)
 
@@ -247,40 +273,76 @@ class Level:
 
         self.update_fade()
 
-    def check_powerup(self):
+    def setup_triggers(self) -> None:
+        """ Build the proximity triggers of the level """
 
-        # TODO: Move this into a separate class
-        if not LAYER_DOUBLEJUMP in self._scene:
+        self._triggers = ProximityTriggers()
+
+        for layer in LAYERS_VOICEOVER:
+            self._triggers.add(
+                self._scene,
+                layer,
+                LIGHT_COLLISION_CHECK_THRESHOLD,
+                self.on_voiceover_trigger
+            )
+
+        self._triggers.add(
+            self._scene,
+            LAYER_DOUBLEJUMP,
+            LIGHT_COLLISION_CHECK_THRESHOLD,
+            self.on_powerup
+        )
+
+    def on_voiceover_trigger(self, layer: str, sprites: list) -> None:
+        """ Player reached a voiceover light """
+
+        if not sprites:
             return
 
-        for sprite in self._scene[LAYER_DOUBLEJUMP]:
-            if arcade.get_distance_between_sprites(self._player.sprite,
-                                                   sprite) < LIGHT_COLLISION_CHECK_THRESHOLD:
-                sprite.remove_from_sprite_lists()
-                self._player.jump_count += 1
-                self._physics_engine.enable_multi_jump(self._player.jump_count)
-                file = os.path.join(
-                    self._root_dir,
-                    'resources',
-                    'sounds',
-                    'fx',
-                    'ability_learn.mp3'
-                )
-                
-                sound = arcade.load_sound(file, streaming=True)
-                sound.play(
-                    volume=self._state.audio_volumes.volume_sound_normalized * VOLUME_MODIFIER_ABILITY_LEARN
-                )
-                return
+        sprite = self._voiceover_triggers.trigger(
+            sprites[0],
+            layer,
+            self._root_dir,
+            self._state.audio_volumes,
+            self._music,
+        )
+
+        if sprite:
+            self._triggers.remove(sprite)
+            self._rumble = LIGHT_LAUNCHING_RUMBLE
+
+    def on_powerup(self, layer: str, sprites: list) -> None:
+        """ Player reached a double jump power up """
 
+        if not sprites:
+            return
+
+        sprite = sprites[0]
+        self._triggers.remove(sprite)
+        sprite.remove_from_sprite_lists()
+
+        self._player.jump_count += 1
+        self._physics_engine.enable_multi_jump(self._player.jump_count)
+        arcade.get_window().sound_bank.play(
+            'fx/ability_learn.mp3',
+            volume=self._state.audio_volumes.volume_sound_normalized * VOLUME_MODIFIER_ABILITY_LEARN
+        )
+
+    @trace
     def draw(self) -> None:
         """ Draw level """
 
         self._first_drawed = True
-        self._camera.use()
-        self._scene.draw()
+        world_target = arcade.get_window().world_target
+
+        with world_target.activate():
+            self._camera.viewport = world_target.viewport
+            self._camera.use()
+            self._scene.draw(area=self._camera.visible_area)
 
-        self._effect_manager.draw()
+            self._effect_manager.draw()
+
+        world_target.draw()
 
         self._camera_gui.use()
         self._voiceover_triggers.draw_subtitle()
@@ -361,20 +423,12 @@ class Level:
 
         pyglet.clock.schedule_once(self.wait_for_begin, 1 / 4)
 
+    @trace
     def check_collisions(self):
         """ Check for collisions """
 
-        # Check for collisions with Power Ups
-        self.check_powerup()
-
-        if self._voiceover_triggers.check_for_collision(
-                self._player.sprite,
-                self._scene,
-                self._root_dir,
-                self._state.audio_volumes,
-                self._music,
-        ):
-            self._rumble = LIGHT_LAUNCHING_RUMBLE
+        # Voiceover lights, power ups and bushes
+        self._triggers.update(self._player.sprite.position)
 
     def unsetup(self):
         """ On exit stop and delete sounds """
@@ -389,6 +443,61 @@ class Level:
             if sound:
                 arcade.stop_sound(sound)
 
+    @trace
+    def teardown(self, next_level: LevelData | None = None) -> None:
+        """
+        Release the resources of the level
+        @param next_level: Preloaded next level, its sounds,
+                           animations and images are kept
+        """
+
+        if not self._scene:
+            return
+
+        self.unsetup()
+        pyglet.clock.unschedule(self.wait_for_begin)
+
+        animations = set(EffectManager.animations(self._root_dir, self._scene))
+        sounds = set(self._map_config.sounds if self._map_config else [])
+        tiled_map = self._tilemap.tiled_map
+        next_tiled_map = None
+
+        if next_level:
+            next_tiled_map = next_level.tilemap.tiled_map
+            animations -= set(
+                EffectManager.animations(self._root_dir, next_level.scene)
+            )
+            sounds -= set(next_level.map_config.sounds)
+
+        self._effect_manager.teardown()
+        self._voiceover_triggers.teardown()
+        self._scene.teardown()
+        self._walls.clear()
+
+        self._scene = None
+        self._tilemap = None
+        self._walls = None
+        self._physics_engine = None
+        self._player = None
+        self._triggers = None
+        self._effect_manager = None
+        self._music = None
+        self._atmo = None
+        self._map_config = None
+
+        for animation in animations:
+            AnimationCache.evict(animation)
+
+        sound_bank = arcade.get_window().sound_bank
+        for sound in sounds:
+            sound_bank.evict(sound)
+
+        LevelCache.evict(tiled_map, keep=next_tiled_map)
+
+        # The atlas drops the textures when they are collected
+        gc.collect()
+        arcade.get_window().ctx.gc()
+
     def on_pause(self):
         """ On pause game """
 
@@ -437,6 +546,7 @@ class Level:
                 sound.play()
 
         self._effect_manager.refresh()
+        self._voiceover_triggers.refresh()
         self._player.refresh()
 
     def on_level_completed(self) -> None:
@@ -446,6 +556,13 @@ class Level:
         savegame_state.next_level()
         savegame_state.save()
 
+        # Start loading the next level while fading out
+        if savegame_state.current_level is not None:
+            self._preloader = LevelLoader(
+                self._root_dir,
+                savegame_state.current_level
+            ).start()
+
         # Add fade sprite to scene
         sprite = arcade.sprite.SpriteSolidColor(
             width=self._state.base_width,
@@ -488,6 +605,10 @@ class Level:
         if not any(self._scene[LAYER_FADEOUT]):
             return
 
+        # Upload the textures of the next level while fading out
+        if self._preloader:
+            self._preloader.update()
+
         sprite = self._scene[LAYER_FADEOUT][0]
 
         sprite.center_x = camera_x
@@ -498,27 +619,30 @@ class Level:
             sprite.alpha = min(sprite.alpha + ALPHA_SPEED, ALPHA_MAX)
 
             if sprite.alpha >= ALPHA_MAX:
-                self.unsetup()
+                before = MemoryReport()
+                before.log('Memory before transition')
 
                 current_level = SavegameState.load().current_level
+                level_data = None
+
+                if current_level is not None and self._preloader:
+                    level_data = self._preloader.result()
+
+                self.teardown(level_data)
+
                 if current_level is not None:
                     self.setup(
                         root_dir=self._root_dir,
                         map_name=current_level,
-                        audio_volumes=self._state.audio_volumes
+                        audio_volumes=self._state.audio_volumes,
+                        level_data=level_data
                     )
+                    MemoryReport().log('Memory after transition', before)
                 else:
                     view = ToBeContinued()
                     view.setup(self._root_dir)
                     arcade.get_window().show_view(view)
 
-    def load_config(self) -> dict:
-        """ Load map config """
-
-        path = os.path.join(self._root_dir, 'resources', 'maps', 'maps.json')
-        with open(path, mode='r', encoding=DEFAULT_ENCODING) as file:
-            return json.load(file)
-
     @property
     def rumble(self) -> int:
         """ Get rumble """
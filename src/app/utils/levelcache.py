@@ -0,0 +1,270 @@
+""" Compiled level cache """
+
+import hashlib
+import logging
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import PIL.Image
+import arcade
+import pytiled_parser
+from arcade import hitbox
+from arcade.texture import ImageData, Texture
+
+from app.helpers.paths import cache_path
+from app.helpers.string import label_value
+
+# Bump this if the layout of the cache file changes
+CACHE_VERSION = 1
+CACHE_EXTENSION = '.levelcache'
+
+
+class LevelCache:
+    """
+    Compiled level cache
+
+    Holds the parsed tilemap of a TMX file together with the hash and
+    the hit box points of every referenced image.
+    The cache is keyed by the content hash of the TMX file,
+    so it is invalidated as soon as the map is changed.
+    """
+
+    def __init__(self, map_file: str):
+        """ Constructor """
+
+        self._map_file = Path(map_file).resolve()
+        self._hash = None
+        self._images = {}
+        self._dirty = False
+
+    @property
+    def path(self) -> str:
+        """ Path of the cache file """
+
+        filename = os.path.splitext(self._map_file.name)[0] + CACHE_EXTENSION
+        return os.path.join(cache_path(), 'levels', filename)
+
+    def load(self) -> pytiled_parser.TiledMap:
+        """
+        Load the tilemap from the cache or parse the TMX file
+        @return: The parsed tilemap
+        """
+
+        with open(self._map_file, 'rb') as f:
+            self._hash = hashlib.sha256(f.read()).hexdigest()
+
+        data = self._read()
+
+        if data:
+            tiled_map = data['tiled_map']
+            tiled_map.map_file = self._map_file
+            self._images = data['images']
+            self.warm_textures(tiled_map)
+            return tiled_map
+
+        logging.info(label_value('Level cache miss', self._map_file.name))
+        self._dirty = True
+        self._images = {}
+
+        tiled_map = pytiled_parser.parse_map(self._map_file)
+        self.warm_textures(tiled_map)
+
+        return tiled_map
+
+    def _read(self) -> dict | None:
+        """ Read the cache file if it matches the TMX file """
+
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError,
+                AttributeError, ImportError) as e:
+            logging.error(e)
+            return None
+
+        if data.get('version') != CACHE_VERSION:
+            return None
+
+        if data.get('hash') != self._hash:
+            return None
+
+        return data
+
+    def warm_textures(self, tiled_map: pytiled_parser.TiledMap) -> None:
+        """
+        Decode the images of the tilemap in parallel and put them
+        into the texture cache. Images with a valid cache entry get
+        their texture with the stored hash and hit box, for the others
+        arcade only has to compute the hit box.
+        """
+
+        manager = arcade.texture.default_texture_cache
+        paths = []
+
+        for path in self.image_paths(tiled_map):
+            name = Texture.create_image_cache_name(str(path))
+
+            if not manager.image_data_cache.get(name):
+                paths.append(path)
+
+        # PIL and hashlib release the GIL, so the images decode concurrently
+        with ThreadPoolExecutor(thread_name_prefix='LevelCache') as executor:
+            results = list(executor.map(self.decode, paths))
+
+        for path, (image_data, texture) in zip(paths, results):
+            name = Texture.create_image_cache_name(str(path))
+            manager.image_data_cache.put(name, image_data)
+
+            if texture:
+                manager.texture_cache.put(texture)
+            else:
+                self._dirty = True
+
+        logging.debug(label_value('Images decoded', len(paths)))
+
+    def decode(self, path: Path) -> tuple:
+        """
+        Decode an image, runs on a worker thread
+        @return: The image data and the texture if the cache entry is valid
+        """
+
+        image = PIL.Image.open(path).convert('RGBA')
+        entry = self._images.get(str(path))
+
+        if not entry or entry['stat'] != self.stat(path):
+            return ImageData(image), None
+
+        image_data = ImageData(image, hash=entry['hash'])
+
+        texture = Texture(
+            image_data,
+            hit_box_algorithm=hitbox.algo_default,
+            hit_box_points=entry['hit_box_points']
+        )
+        texture.file_path = path
+        texture.crop_values = (0, 0, image.width, image.height)
+
+        return image_data, texture
+
+    def save(self, tiled_map: pytiled_parser.TiledMap) -> None:
+        """ Write the cache file if something has changed """
+
+        if not self._dirty:
+            return
+
+        manager = arcade.texture.default_texture_cache
+
+        for path in self.image_paths(tiled_map):
+            image_data = manager.image_data_cache.get(
+                Texture.create_image_cache_name(str(path))
+            )
+
+            if not image_data:
+                continue
+
+            texture = manager.texture_cache.get_with_config(
+                image_data.hash,
+                hitbox.algo_default
+            )
+
+            if not texture:
+                continue
+
+            self._images[str(path)] = {
+                'stat': self.stat(path),
+                'hash': image_data.hash,
+                'hit_box_points': tuple(texture.hit_box_points)
+            }
+
+        data = {
+            'version': CACHE_VERSION,
+            'hash': self._hash,
+            'tiled_map': tiled_map,
+            'images': self._images
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (OSError, pickle.PicklingError) as e:
+            logging.error(e)
+            return
+
+        self._dirty = False
+        logging.info(label_value('Level cache written', self.path))
+
+    @staticmethod
+    def evict(
+            tiled_map: pytiled_parser.TiledMap,
+            keep: pytiled_parser.TiledMap | None = None
+    ) -> int:
+        """
+        Remove the images of a tilemap from the texture cache, so the
+        atlas drops them once the sprites are collected
+        @param keep: Tilemap whose images stay cached
+        @return: The number of removed images
+        """
+
+        manager = arcade.texture.default_texture_cache
+        kept = set(LevelCache.image_paths(keep)) if keep else set()
+        hashes = set()
+
+        for path in LevelCache.image_paths(tiled_map):
+            name = Texture.create_image_cache_name(str(path))
+            image_data = manager.image_data_cache.get(name)
+
+            if path in kept or not image_data:
+                continue
+
+            hashes.add(image_data.hash)
+            manager.image_data_cache.delete(name)
+
+        # Textures of the same image loaded from another path
+        for path in kept:
+            image_data = manager.image_data_cache.get(
+                Texture.create_image_cache_name(str(path))
+            )
+
+            if image_data:
+                hashes.discard(image_data.hash)
+
+        for texture in manager.texture_cache.get_all_textures():
+            if texture.image_data.hash in hashes:
+                manager.texture_cache.delete(texture)
+
+        return len(hashes)
+
+    @staticmethod
+    def image_paths(tiled_map: pytiled_parser.TiledMap) -> list:
+        """
+        Get the paths of all images referenced by the tilesets
+        The paths are built the same way as arcade does it
+        """
+
+        map_directory = os.path.dirname(tiled_map.map_file)
+        paths = []
+
+        for tileset in tiled_map.tilesets.values():
+            if tileset.image:
+                paths.append(Path(map_directory, tileset.image))
+
+            for tile in (tileset.tiles or {}).values():
+                if tile.image:
+                    paths.append(Path(map_directory, tile.image))
+
+        return list(dict.fromkeys(
+            filter(os.path.exists, paths)
+        ))
+
+    @staticmethod
+    def stat(path: Path) -> tuple:
+        """ Size and modification time of an image """
+
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
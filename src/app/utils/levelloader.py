@@ -0,0 +1,353 @@
+""" Level loader """
+
+import logging
+import os
+import threading
+
+import arcade
+
+from app.constants.layers import LAYER_WALL
+from app.containers.level_data import LevelData
+from app.containers.map_config import MapConfig
+from app.helpers.collision import collision_list
+from app.helpers.string import label_value
+from app.utils.atlasmanifest import AtlasManifest
+from app.utils.levelcache import LevelCache
+from app.utils.levelscene import LevelScene
+from app.utils.loadprofiler import LoadProfiler
+from app.utils.mapregistry import MapRegistry
+from app.utils.subtitle import Subtitle
+from app.utils.voiceovertriggers import VoiceOverTiggers, VOICEOVER_DEFAULT
+
+# Share of the total progress per loading stage
+PROGRESS_TILEMAP = 0.3
+PROGRESS_SPRITES = 0.4
+PROGRESS_AUDIO = 0.05
+PROGRESS_SUBTITLES = 0.05
+PROGRESS_UPLOAD = 0.2
+
+
+class LevelLoader:
+    """
+    Loads everything a level needs that doesn't require the OpenGL context.
+
+    The sprite lists are created lazy, so the loader can run
+    on a background thread. The textures are uploaded on the main thread
+    by calling update() once per frame, one sprite list at a time.
+    Sprite lists which are not uploaded by then are uploaded
+    when they are drawn the first time.
+
+    The default atlas is sized from the manifests when the window is
+    set up, the layers listed as bypass in the manifest of the map
+    get an atlas of their own sized before loading.
+    """
+
+    def __init__(
+            self,
+            root_dir: str,
+            map_name: str,
+            on_progress: callable = None
+    ):
+        """ Constructor """
+
+        self._root_dir = root_dir
+        self._map_name = map_name
+        self._on_progress = on_progress
+        self._atlas = None
+        self._atlas_size = None
+        self._bypass = None
+        self._thread = None
+        self._result = None
+        self._error = None
+        self._progress = 0.0
+        self._uploads = None
+        self._uploads_total = 0
+        self._profiler = LoadProfiler(map_name)
+
+    def start(self):
+        """ Start loading in a background thread """
+
+        # Prepare the atlases here since this needs the main thread
+        self.prepare_atlases()
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"LevelLoader {self._map_name}",
+            daemon=True
+        )
+        self._thread.start()
+
+        return self
+
+    def prepare_atlases(self) -> None:
+        """ Create the atlases of the bypass layers """
+
+        self._atlas = arcade.get_window().ctx.default_atlas
+        self._atlas_size = self._atlas.size
+        self._bypass = {}
+
+        with self._profiler.stage('atlas'):
+            manifest = AtlasManifest.load(self._root_dir, self._map_name)
+
+            if not manifest or not manifest.bypass:
+                return
+
+            for layer, size in manifest.bypass.items():
+                self._bypass[layer] = arcade.DefaultTextureAtlas(
+                    tuple(size),
+                    auto_resize=False
+                )
+
+        logging.info(
+            label_value(
+                'Bypass texture atlases',
+                ', '.join(
+                    f"{layer} {atlas.width}x{atlas.height}"
+                    for layer, atlas in self._bypass.items()
+                )
+            )
+        )
+
+    def _run(self) -> None:
+        """ Thread target """
+
+        try:
+            self._result = self.load()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.error(e)
+            self._error = e
+
+    @property
+    def done(self) -> bool:
+        """ Is loading done """
+
+        return self._thread is not None and not self._thread.is_alive()
+
+    def result(self) -> LevelData:
+        """ Wait for the background thread and get the loaded level """
+
+        if not self._thread:
+            return self.load()
+
+        self._thread.join()
+
+        if self._error:
+            raise self._error
+
+        return self._result
+
+    @property
+    def progress(self) -> float:
+        """ Loading progress from 0.0 to 1.0 """
+
+        progress = self._progress
+
+        if self._uploads is not None and self._uploads_total > 0:
+            uploaded = self._uploads_total - len(self._uploads)
+            progress += PROGRESS_UPLOAD * uploaded / self._uploads_total
+        elif self._uploads is not None:
+            progress += PROGRESS_UPLOAD
+
+        return min(progress, 1.0)
+
+    def update(self) -> bool:
+        """
+        Upload the next sprite list on the main thread
+        @return: True if the level is completely loaded
+        """
+
+        if not self.done:
+            self.notify()
+            return False
+
+        if self._uploads is None:
+            sprite_lists = self.result().tilemap.sprite_lists.values()
+            self._uploads = list(
+                filter(lambda sprite_list: len(sprite_list) > 0, sprite_lists)
+            )
+            self._uploads_total = len(self._uploads)
+        elif self._uploads:
+            with self._profiler.stage('upload'):
+                self._uploads.pop(0).initialize()
+
+            if not self._uploads:
+                self.check_atlas()
+
+        self.notify()
+
+        return not self._uploads
+
+    def check_atlas(self) -> None:
+        """ Warn if the default atlas had to grow while loading """
+
+        if self._atlas.size != self._atlas_size:
+            logging.warning(
+                label_value(
+                    f"Texture atlas grew while loading {self._map_name}",
+                    f"{self._atlas.width}x{self._atlas.height}, "
+                    "regenerate the atlas manifest"
+                )
+            )
+
+    def notify(self) -> None:
+        """ Report the progress to the callback """
+
+        if self._on_progress:
+            self._on_progress(self.progress)
+
+    def load(self) -> LevelData:
+        """ Load the level """
+
+        profiler = self._profiler
+
+        if self._bypass is None:
+            self.prepare_atlases()
+
+        path = os.path.join(
+            self._root_dir,
+            'resources',
+            'maps',
+            f"{self._map_name}.tmx"
+        )
+
+        cache = LevelCache(path)
+        with profiler.stage('tilemap'):
+            tiled_map = cache.load()
+        self._progress += PROGRESS_TILEMAP
+
+        with profiler.stage('sprites'):
+            tilemap = arcade.TileMap(
+                tiled_map=tiled_map,
+                texture_atlas=self._atlas,
+                lazy=True
+            )
+
+        with profiler.stage('cache'):
+            cache.save(tiled_map)
+
+        with profiler.stage('bypass'):
+            self.bypass_atlas(tilemap)
+        self._progress += PROGRESS_SPRITES
+
+        with profiler.stage('scene'):
+            scene = LevelScene.from_tilemap(tilemap)
+            map_config = self.load_config()
+
+        with profiler.stage('walls'):
+            walls = self.load_walls(tilemap, scene)
+
+        data = LevelData(
+            map_name=self._map_name,
+            map_config=map_config,
+            tilemap=tilemap,
+            scene=scene,
+            walls=walls,
+            profiler=profiler
+        )
+
+        with profiler.stage('audio'):
+            if map_config.music:
+                data.music = arcade.load_sound(
+                    os.path.join(
+                        self._root_dir,
+                        'resources',
+                        'music',
+                        map_config.music
+                    ),
+                    streaming=True
+                )
+
+            if map_config.atmo:
+                data.atmo = arcade.load_sound(
+                    os.path.join(
+                        self._root_dir,
+                        'resources',
+                        'sounds',
+                        'atmos',
+                        map_config.atmo
+                    ),
+                    streaming=True
+                )
+
+            arcade.get_window().sound_bank.preload(map_config.sounds)
+        self._progress += PROGRESS_AUDIO
+
+        with profiler.stage('subtitles'):
+            data.subtitles = self.load_subtitles(map_config)
+        self._progress += PROGRESS_SUBTITLES
+
+        return data
+
+    def bypass_atlas(self, tilemap: arcade.TileMap) -> None:
+        """ Move the bypass layers to their own atlas """
+
+        for name, atlas in self._bypass.items():
+            if name not in tilemap.sprite_lists:
+                continue
+
+            old_list = tilemap.sprite_lists[name]
+            sprite_list = arcade.SpriteList(
+                use_spatial_hash=old_list.spatial_hash is not None,
+                atlas=atlas,
+                lazy=True,
+                visible=old_list.visible
+            )
+            sprite_list.properties = old_list.properties
+            sprite_list.alpha = old_list.alpha
+            sprite_list.extend(list(old_list))
+            old_list.clear()
+
+            tilemap.sprite_lists[name] = sprite_list
+
+    @staticmethod
+    def load_walls(
+            tilemap: arcade.TileMap,
+            scene: arcade.Scene
+    ) -> arcade.SpriteList:
+        """ Merge the wall tiles into collision boxes """
+
+        if LAYER_WALL not in scene:
+            return arcade.SpriteList(use_spatial_hash=True, lazy=True)
+
+        walls = collision_list(
+            scene[LAYER_WALL],
+            round(tilemap.tile_width * tilemap.scaling),
+            round(tilemap.tile_height * tilemap.scaling)
+        )
+
+        logging.info(
+            label_value(
+                'Wall collision boxes',
+                f"{len(walls)} of {len(scene[LAYER_WALL])} sprites"
+            )
+        )
+
+        return walls
+
+    def load_subtitles(self, map_config: MapConfig) -> dict:
+        """ Read the subtitles of all voiceovers of the level """
+
+        voiceovers = [VOICEOVER_DEFAULT]
+        voiceovers += VoiceOverTiggers.voiceovers(map_config.voiceovers)
+
+        subtitles = {}
+
+        for voiceover in voiceovers:
+            filename = VoiceOverTiggers.voiceover_path(
+                self._root_dir,
+                os.environ['LANG'],
+                voiceover
+            )
+
+            try:
+                subtitles[filename] = Subtitle.read(filename)
+            except OSError as e:
+                logging.error(e)
+
+        return subtitles
+
+    def load_config(self) -> MapConfig:
+        """ Get the map config from the registry """
+
+        MapRegistry.load(self._root_dir)
+        return MapRegistry.get(self._map_name)
@@ -0,0 +1,387 @@
+""" Level scene """
+
+import logging
+from typing import Iterable
+
+import arcade
+import numpy as np
+from arcade.types import Rect
+
+from app.constants.layers import LAYERS_DYNAMIC, LAYERS_MOVING, \
+    LAYERS_CHANGING
+from app.helpers.string import label_value
+from app.utils.layerbaker import LayerBaker
+
+# Width of the columns the layers with fixed sprites are split into
+CHUNK_WIDTH = 2048
+
+
+class LevelScene(arcade.Scene):
+    """
+    Scene which only updates the layers that can change.
+
+    classify() sorts the layers into static, dynamic and animated ones.
+    update() only walks the dynamic layers and update_animation()
+    only the animated ones. Layers added after classify()
+    are treated as dynamic and animated until classify() is called again.
+
+    draw() culls against the visible area of the camera. The layers
+    whose sprites never move are split into columns of CHUNK_WIDTH,
+    only the columns overlapping the visible area are drawn.
+    bake() replaces the runs of static layers by baked textures.
+    """
+
+    def __init__(self) -> None:
+        """ Constructor """
+
+        super().__init__()
+        self._static = []
+        self._dynamic = None
+        self._animated = None
+        # id(sprite list) => sprite list, held so the ids aren't reused
+        self._classified = {}
+        # id(sprite list) => [((left, right, bottom, top), sprite list)]
+        self._chunks = {}
+        self._drawn = 0
+        self._culled = 0
+        self._baker = None
+
+    def classify(self) -> None:
+        """ Classify the layers by their current sprites """
+
+        self._static, self._dynamic, self._animated = [], [], []
+        self._chunks = {}
+        self._baker = None
+
+        for name, sprite_list in self._name_mapping.items():
+            dynamic = self.is_dynamic(name, sprite_list)
+            animated = self.is_animated(sprite_list)
+
+            if dynamic:
+                self._dynamic.append(name)
+
+            if animated:
+                self._animated.append(name)
+
+            if not dynamic and name not in LAYERS_MOVING:
+                self._chunks[id(sprite_list)] = self.chunk(sprite_list)
+
+            if dynamic or animated:
+                continue
+
+            self._static.append(name)
+
+            if name not in LAYERS_MOVING:
+                sprite_list.enable_spatial_hashing()
+
+        self._classified = {
+            id(sprite_list): sprite_list
+            for sprite_list in self._name_mapping.values()
+        }
+
+        logging.info(
+            label_value(
+                'Scene layers',
+                f"{len(self._static)} static, {len(self._dynamic)} dynamic, "
+                f"{len(self._animated)} animated, "
+                f"{sum(map(len, self._chunks.values()))} chunks"
+            )
+        )
+
+    @staticmethod
+    def chunk(sprite_list: arcade.SpriteList) -> list:
+        """
+        Split a layer into columns by the left edge of the sprites
+        @return: List of (bounds, sprite list), the layer itself if it
+                 fits into one column or if splitting it would change
+                 the draw order of overlapping sprites
+        """
+
+        if len(sprite_list) == 0:
+            return []
+
+        left, right, bottom, top = np.array(
+            [
+                (sprite.left, sprite.right, sprite.bottom, sprite.top)
+                for sprite in sprite_list
+            ]
+        ).T
+        columns = (left // CHUNK_WIDTH).astype(int)
+
+        bounds = (left.min(), right.max(), bottom.min(), top.max())
+
+        if columns.min() == columns.max() or LevelScene.reorders(
+                left, right, bottom, top, columns
+        ):
+            return [(bounds, sprite_list)]
+
+        chunks = []
+
+        for column in np.unique(columns):
+            indices = np.flatnonzero(columns == column)
+            chunk = arcade.SpriteList(atlas=sprite_list.atlas)
+            chunk.extend([sprite_list[i] for i in indices])
+
+            chunks.append(((
+                left[indices].min(),
+                right[indices].max(),
+                bottom[indices].min(),
+                top[indices].max()
+            ), chunk))
+
+        return chunks
+
+    @staticmethod
+    def reorders(
+            left: np.ndarray,
+            right: np.ndarray,
+            bottom: np.ndarray,
+            top: np.ndarray,
+            columns: np.ndarray
+    ) -> bool:
+        """ Check if drawing column by column swaps overlapping sprites """
+
+        indices = np.arange(len(left))
+
+        # Sprites of different columns only overlap
+        # if one of them reaches into the next column
+        for i in np.flatnonzero(right > (columns + 1) * CHUNK_WIDTH):
+            overlaps = (
+                    (left < right[i]) & (right > left[i])
+                    & (bottom < top[i]) & (top > bottom[i])
+                    & (columns != columns[i])
+            )
+            swapped = (indices < i) != (columns < columns[i])
+
+            if np.any(overlaps & swapped):
+                return True
+
+        return False
+
+    @staticmethod
+    def is_dynamic(name: str, sprite_list: arcade.SpriteList) -> bool:
+        """ Check if SpriteList.update() can change a layer """
+
+        if name in LAYERS_DYNAMIC:
+            return True
+
+        for sprite in sprite_list:
+            if type(sprite).update is not arcade.Sprite.update:
+                return True
+
+            if sprite.change_x or sprite.change_y or sprite.change_angle:
+                return True
+
+        return False
+
+    @staticmethod
+    def is_animated(sprite_list: arcade.SpriteList) -> bool:
+        """ Check if a layer contains animated sprites """
+
+        return any(
+            type(sprite).update_animation
+            is not arcade.BasicSprite.update_animation
+            for sprite in sprite_list
+        )
+
+    def _unclassified(self) -> list:
+        """ Layers added since the last classify() """
+
+        return [
+            name for name, sprite_list in self._name_mapping.items()
+            if id(sprite_list) not in self._classified
+        ]
+
+    @property
+    def static_layers(self) -> list:
+        """ Names of the static layers """
+
+        return self._static
+
+    @property
+    def drawn(self) -> int:
+        """ Sprites submitted by the last draw() """
+
+        return self._drawn
+
+    @property
+    def baker(self) -> LayerBaker | None:
+        """ Baker of the static layers if baking is enabled """
+
+        return self._baker
+
+    @property
+    def culled(self) -> int:
+        """ Sprites skipped by the last draw() """
+
+        return self._culled
+
+    def draw(
+            self,
+            names: Iterable[str] | None = None,
+            filter=None,  # pylint: disable=redefined-builtin
+            pixelated: bool = False,
+            blend_function=None,
+            area: Rect | None = None,
+            **kwargs
+    ) -> None:
+        """
+        Draw the layers
+        @param area: Visible area in world coordinates, nothing is culled
+                     without it
+        """
+
+        if names or area is None:
+            super().draw(names, filter, pixelated, blend_function, **kwargs)
+            return
+
+        self._drawn = 0
+        self._culled = 0
+
+        baker = self._baker
+        if baker:
+            baker.start_frame()
+
+        # Baked at the window resolution, a smaller viewport only scales
+        # the chunks down, so it doesn't rebake them
+        scale = arcade.get_window().height / area.height
+
+        for sprite_list in self._sprite_lists:
+            sprite_lists = [sprite_list]
+
+            if baker and baker.covers(sprite_list):
+                group = baker.group(sprite_list)
+
+                # Drawn with the first layer of the group
+                if not group:
+                    continue
+
+                if baker.update(group, area, scale):
+                    baker.draw(group, area)
+                    continue
+
+                # Not baked yet
+                sprite_lists = group.sprite_lists
+
+            for layer in sprite_lists:
+                self._draw_layer(
+                    layer,
+                    area,
+                    filter=filter,
+                    pixelated=pixelated,
+                    blend_function=blend_function,
+                    **kwargs
+                )
+
+    def _draw_layer(
+            self,
+            sprite_list: arcade.SpriteList,
+            area: Rect,
+            **kwargs
+    ) -> None:
+        """ Draw the chunks of a layer which overlap the visible area """
+
+        if not sprite_list.visible:
+            return
+
+        left, right, bottom, top = area.lrbt
+        chunks = self._chunks.get(id(sprite_list))
+
+        # Sprites may have been added since classify(),
+        # without bounds the layer isn't culled
+        if chunks is None or len(sprite_list) != sum(
+                len(chunk) for _bounds, chunk in chunks
+        ):
+            chunks = [((), sprite_list)]
+
+        for bounds, chunk in chunks:
+            if bounds and (
+                    bounds[0] > right or bounds[1] < left
+                    or bounds[2] > top or bounds[3] < bottom
+            ):
+                self._culled += len(chunk)
+                continue
+
+            chunk.draw(**kwargs)
+            self._drawn += len(chunk)
+
+    def bake(self, area: Rect, scale: float) -> None:
+        """
+        Bake the runs of static layers into textures
+        @param area: Bake the chunks of this area right away
+        @param scale: Pixels per world unit
+        """
+
+        names = {id(sprite_list): name for name, sprite_list in self._name_mapping.items()}
+        groups = [[]]
+
+        for sprite_list in self._sprite_lists:
+            name = names.get(id(sprite_list))
+
+            if (name in self._static and name not in LAYERS_MOVING
+                    and name not in LAYERS_CHANGING and len(sprite_list) > 0):
+                groups[-1].append(sprite_list)
+            elif groups[-1]:
+                groups.append([])
+
+        self._baker = LayerBaker(list(filter(None, groups)))
+        self._baker.prepare(area, scale)
+
+    def teardown(self) -> None:
+        """
+        Release the layers and the baked textures
+        Clearing the sprite lists breaks the references between the
+        sprites and their lists, so their textures can be collected
+        """
+
+        if self._baker:
+            self._baker.release()
+            self._baker = None
+
+        for chunks in self._chunks.values():
+            for _bounds, chunk in chunks:
+                chunk.clear()
+
+        for sprite_list in self._sprite_lists:
+            sprite_list.clear()
+
+        self._chunks = {}
+        self._static = []
+        self._dynamic = None
+        self._animated = None
+        self._classified = {}
+        self._sprite_lists = []
+        self._name_mapping = {}
+
+    # The signatures are the ones of arcade.Scene
+    def update(  # pylint: disable=keyword-arg-before-vararg
+            self,
+            delta_time: float,
+            names: Iterable[str] | None = None,
+            *args,
+            **kwargs
+    ) -> None:
+        """ Update the dynamic layers """
+
+        if names is None and self._dynamic is not None:
+            names = [
+                name for name in self._dynamic if name in self._name_mapping
+            ] + self._unclassified()
+
+        super().update(delta_time, names, *args, **kwargs)
+
+    def update_animation(  # pylint: disable=keyword-arg-before-vararg
+            self,
+            delta_time: float,
+            names: Iterable[str] | None = None,
+            *args,
+            **kwargs
+    ) -> None:
+        """ Update the animated layers """
+
+        if names is None and self._animated is not None:
+            names = [
+                name for name in self._animated if name in self._name_mapping
+            ] + self._unclassified()
+
+        super().update_animation(delta_time, names, *args, **kwargs)
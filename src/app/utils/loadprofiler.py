@@ -0,0 +1,149 @@
+""" Load profiler """
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import arcade
+import psutil
+
+from app.constants.gameinfo import DEFAULT_ENCODING
+from app.helpers.paths import log_path
+from app.helpers.string import label_value
+from app.utils.tracer import Tracer
+
+# Number of stages named in the summary line
+SUMMARY_STAGES = 3
+
+
+class LoadProfiler:
+    """
+    Measures the stages of a level load.
+
+    Every stage records its duration, the bytes read by the process,
+    the textures added to the default atlas and the bytes uploaded
+    for their images. The atlas is only sampled on the main thread,
+    stages of a level loaded in the background record None for it.
+    A stage entered more than once accumulates.
+    finish() logs a summary line and, if enabled by --profile-load,
+    writes a JSON report to the log directory.
+    """
+
+    enabled = False
+
+    def __init__(self, name: str):
+        """ Constructor """
+
+        self._name = name
+        self._stages = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """ Measure a stage """
+
+        before = self.sample()
+
+        try:
+            with Tracer.span(f"{self._name}:{name}"):
+                yield
+        finally:
+            after = self.sample()
+            stage = self._stages.setdefault(name, {
+                'seconds': 0.0,
+                'bytes_read': 0,
+                'textures': None,
+                'upload_bytes': None
+            })
+
+            for key, value in stage.items():
+                if before[key] is None or after[key] is None:
+                    continue
+
+                stage[key] = (value or 0) + after[key] - before[key]
+
+    @staticmethod
+    def sample() -> dict:
+        """
+        Current time, bytes read, atlas textures and atlas image bytes
+        keyed like the stages
+        The atlas values are None outside of the main thread
+        """
+
+        try:
+            counters = psutil.Process().io_counters()
+            # read_chars includes reads served by the page cache
+            bytes_read = getattr(counters, 'read_chars', counters.read_bytes)
+        except (AttributeError, psutil.Error):
+            bytes_read = 0
+
+        sample = {
+            'seconds': time.perf_counter(),
+            'bytes_read': bytes_read,
+            'textures': None,
+            'upload_bytes': None
+        }
+
+        # The atlas is only consistent on the main thread, which draws
+        if threading.current_thread() is threading.main_thread():
+            atlas = arcade.get_window().ctx.default_atlas
+            sample['textures'] = len(atlas.textures)
+            sample['upload_bytes'] = sum(
+                image.width * image.height * 4 for image in atlas.images
+            )
+
+        return sample
+
+    def finish(self) -> dict:
+        """ Log the summary and write the report """
+
+        # The stages of a level loaded in the background are spread over
+        # the frames of the menu, so the total is the sum of the stages
+        total = sum(stage['seconds'] for stage in self._stages.values())
+        slowest = sorted(
+            self._stages.items(),
+            key=lambda item: item[1]['seconds'],
+            reverse=True
+        )[:SUMMARY_STAGES]
+
+        logging.info(
+            label_value(
+                f"Level {self._name} loaded",
+                f"{total:.3f} seconds, slowest " + ', '.join(
+                    f"{name} {stage['seconds']:.3f}" for name, stage in slowest
+                )
+            )
+        )
+
+        report = {
+            'name': self._name,
+            'seconds': total,
+            'elapsed': time.perf_counter() - self._started,
+            'stages': self._stages
+        }
+
+        if LoadProfiler.enabled:
+            self.write(report)
+
+        return report
+
+    def write(self, report: dict) -> None:
+        """ Write a report to the log directory """
+
+        filename = f"load-{self._name}-{datetime.now():%Y%m%d-%H%M%S}.json"
+        path = os.path.join(log_path(), filename)
+
+        try:
+            os.makedirs(log_path(), exist_ok=True)
+
+            with open(path, 'w', encoding=DEFAULT_ENCODING) as f:
+                json.dump(report, f, indent=4)
+        except OSError as e:
+            logging.error(e)
+            return
+
+        logging.info(label_value('Load report', path))
@@ -0,0 +1,80 @@
+""" Map config registry """
+
+import json
+import logging
+import os
+import threading
+
+from app.constants.gameinfo import DEFAULT_ENCODING, MAPS
+from app.containers.map_config import MapConfig
+from app.helpers.string import label_value
+
+
+class MapRegistry:
+    """
+    Process-wide registry of the map configs.
+
+    maps.json is parsed and validated once, every consumer reads
+    the MapConfig records from memory afterwards.
+    """
+
+    _configs = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls, root_dir: str) -> dict:
+        """
+        Parse maps.json if not done yet
+        @raise ValueError: if maps.json is invalid
+        @return: map name => MapConfig
+        """
+
+        with cls._lock:
+            if not cls._configs:
+                cls._configs = cls.parse(root_dir)
+
+        return cls._configs
+
+    @classmethod
+    def get(cls, map_name: str) -> MapConfig:
+        """ Get the config of a map """
+
+        if not cls._configs:
+            raise RuntimeError('MapRegistry.load() was not called')
+
+        return cls._configs[map_name]
+
+    @staticmethod
+    def parse(root_dir: str) -> dict:
+        """ Parse and validate maps.json """
+
+        path = os.path.join(root_dir, 'resources', 'maps', 'maps.json')
+        with open(path, mode='r', encoding=DEFAULT_ENCODING) as file:
+            data = json.load(file)
+
+        missing = set(MAPS) - set(data)
+        if missing:
+            raise ValueError(
+                f"maps.json: no config for {', '.join(sorted(missing))}"
+            )
+
+        configs = {}
+
+        for map_name, entry in data.items():
+            atmo = f"{map_name}.mp3"
+            atmo_file = os.path.join(
+                root_dir,
+                'resources',
+                'sounds',
+                'atmos',
+                atmo
+            )
+
+            if not os.path.exists(atmo_file):
+                atmo = ''
+
+            configs[map_name] = MapConfig.from_dict(map_name, entry, atmo=atmo)
+
+        logging.info(label_value('Map configs loaded', len(configs)))
+
+        return configs
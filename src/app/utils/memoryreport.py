@@ -0,0 +1,68 @@
+""" Memory report """
+
+import logging
+
+import arcade
+import psutil
+
+from app.helpers.string import label_value
+from app.utils.atlasmanifest import ATLAS_BORDER
+
+MEGABYTE = 1024 * 1024
+
+
+class MemoryReport:
+    """
+    Snapshot of the memory used by the game.
+
+    It records the resident set size of the process, the textures and
+    the fill of the default atlas and the OpenGL textures which are
+    alive. Level transitions log one before and one after,
+    so resources which survive a transition show up as growth.
+    """
+
+    def __init__(self):
+        """ Take the snapshot """
+
+        try:
+            self.rss = psutil.Process().memory_info().rss
+        except psutil.Error:
+            self.rss = 0
+
+        ctx = arcade.get_window().ctx
+        atlas = ctx.default_atlas
+
+        self.textures = len(atlas.textures)
+        self.atlas_fill = sum(
+            (image.width + ATLAS_BORDER * 2) * (image.height + ATLAS_BORDER * 2)
+            for image in atlas.images
+        ) / (atlas.width * atlas.height)
+
+        created, freed = ctx.stats.texture
+        self.gl_textures = created - freed
+
+    def __str__(self) -> str:
+        return (
+            f"rss {self.rss / MEGABYTE:.1f} MB, "
+            f"textures {self.textures}, "
+            f"atlas fill {self.atlas_fill * 100:.1f}%, "
+            f"gl textures {self.gl_textures}"
+        )
+
+    def log(self, label: str, before=None) -> None:
+        """
+        Log the snapshot
+        @param label: What was measured
+        @param before: Earlier snapshot to log the difference to
+        """
+
+        text = str(self)
+
+        if before:
+            text += (
+                f" (rss {(self.rss - before.rss) / MEGABYTE:+.1f} MB, "
+                f"textures {self.textures - before.textures:+d}, "
+                f"gl textures {self.gl_textures - before.gl_textures:+d})"
+            )
+
+        logging.info(label_value(label, text))
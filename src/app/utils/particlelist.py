@@ -0,0 +1,207 @@
+""" Vectorized particle list """
+
+import arcade
+import numpy as np
+from arcade.gl import BufferDescription
+
+VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in vec2 in_vert;
+in vec2 in_pos;
+in float in_radius;
+in vec4 in_color;
+
+out vec2 v_uv;
+out vec4 v_color;
+
+void main() {
+    v_uv = in_vert;
+    v_color = in_color;
+    vec2 position = in_pos + in_vert * in_radius;
+    gl_Position = window.projection * window.view * vec4(position, 0.0, 1.0);
+}
+"""
+
+# Same falloff as arcade.make_soft_circle_texture()
+FRAGMENT_SHADER = """
+#version 330
+
+in vec2 v_uv;
+in vec4 v_color;
+
+out vec4 f_color;
+
+void main() {
+    float distance = length(v_uv);
+    if (distance > 1.0) {
+        discard;
+    }
+    f_color = vec4(v_color.rgb, v_color.a * (1.0 - distance));
+}
+"""
+
+QUAD = np.array([-1, -1, 1, -1, -1, 1, 1, 1], dtype=np.float32)
+
+
+class ParticleList(arcade.SpriteList):
+    """
+    Soft circle particles stored in NumPy arrays.
+
+    The effects move the particles with vectorized operations
+    on the arrays. draw() uploads the positions in one buffer
+    and renders all particles with a single instanced draw call.
+    It is a SpriteList without sprites so it keeps its place
+    in the draw order of a scene.
+    """
+
+    def __init__(self):
+        """ Constructor """
+
+        super().__init__(lazy=True)
+
+        self.rng = np.random.default_rng()
+        self.positions = np.zeros((0, 2), dtype=np.float32)
+        self.radii = np.zeros(0, dtype=np.float32)
+        self.colors = np.zeros((0, 4), dtype=np.float32)
+
+        self._program = None
+        self._geometry = None
+        self._buffer_positions = None
+        self._buffer_attributes = None
+        self._capacity = 0
+        self._attributes_dirty = True
+
+    @staticmethod
+    def in_scene(scene: arcade.Scene, name: str):
+        """ Get the particle list of a scene layer or add it on top """
+
+        if name in scene and isinstance(scene[name], ParticleList):
+            return scene[name]
+
+        particles = ParticleList()
+        scene.add_sprite_list(name, sprite_list=particles)
+
+        return particles
+
+    @property
+    def count(self) -> int:
+        """ Number of particles """
+
+        return len(self.radii)
+
+    def add(
+            self,
+            positions: np.ndarray,
+            radii: np.ndarray,
+            colors: np.ndarray
+    ) -> None:
+        """
+        Add particles
+        @param positions: (n, 2) centers
+        @param radii: (n,) radii
+        @param colors: (n, 4) RGBA colors from 0 to 255
+        """
+
+        self.positions = np.concatenate(
+            (self.positions, np.asarray(positions, dtype=np.float32))
+        )
+        self.radii = np.concatenate(
+            (self.radii, np.asarray(radii, dtype=np.float32))
+        )
+        self.colors = np.concatenate(
+            (self.colors, np.asarray(colors, dtype=np.float32) / 255)
+        )
+        self._attributes_dirty = True
+
+    def resize(self, count: int) -> None:
+        """ Remove particles from the end """
+
+        self.positions = self.positions[:count]
+        self.radii = self.radii[:count]
+        self.colors = self.colors[:count]
+        self._attributes_dirty = True
+
+    def clear(self, *, capacity: int | None = None, deep: bool = True) -> None:
+        """ Remove all particles """
+
+        super().clear(capacity=capacity, deep=deep)
+        self.resize(0)
+
+    def _init_gl(self) -> None:
+        """ Create the shader and buffers """
+
+        ctx = arcade.get_window().ctx
+        self._program = ctx.program(
+            vertex_shader=VERTEX_SHADER,
+            fragment_shader=FRAGMENT_SHADER
+        )
+
+        self._capacity = max(self.count, 1)
+        self._buffer_positions = ctx.buffer(reserve=self._capacity * 8)
+        self._buffer_attributes = ctx.buffer(reserve=self._capacity * 20)
+
+        self._geometry = ctx.geometry(
+            [
+                BufferDescription(ctx.buffer(data=QUAD), '2f', ['in_vert']),
+                BufferDescription(
+                    self._buffer_positions,
+                    '2f',
+                    ['in_pos'],
+                    instanced=True
+                ),
+                BufferDescription(
+                    self._buffer_attributes,
+                    '1f 4f',
+                    ['in_radius', 'in_color'],
+                    instanced=True
+                ),
+            ],
+            mode=ctx.TRIANGLE_STRIP
+        )
+
+    def _upload(self) -> None:
+        """ Write the particle data into the buffers """
+
+        if self.count > self._capacity:
+            self._capacity = self.count * 2
+            self._buffer_positions.orphan(size=self._capacity * 8)
+            self._buffer_attributes.orphan(size=self._capacity * 20)
+            self._attributes_dirty = True
+
+        if self._attributes_dirty:
+            attributes = np.column_stack((self.radii, self.colors))
+            self._buffer_attributes.write(
+                attributes.astype(np.float32).tobytes()
+            )
+            self._attributes_dirty = False
+
+        self._buffer_positions.write(self.positions.tobytes())
+
+    def draw(
+            self,
+            *,
+            filter=None,  # pylint: disable=redefined-builtin
+            pixelated=None,
+            blend_function=None,
+            **kwargs
+    ) -> None:
+        """ Draw all particles with one instanced draw call """
+
+        if not self.visible or self.count == 0:
+            return
+
+        if not self._program:
+            self._init_gl()
+
+        self._upload()
+
+        ctx = arcade.get_window().ctx
+        with ctx.enabled(ctx.BLEND):
+            ctx.blend_func = blend_function or ctx.BLEND_DEFAULT
+            self._geometry.render(self._program, instances=self.count)
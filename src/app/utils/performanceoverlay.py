@@ -0,0 +1,386 @@
+""" Performance overlay """
+
+import csv
+import logging
+import os
+import time
+import weakref
+from datetime import datetime
+
+import arcade
+import numpy as np
+
+from app.constants.fonts import FONT_MONOTYPE
+from app.constants.ui import MARGIN
+from app.helpers.paths import log_path
+from app.helpers.string import label_value
+from app.state.settingsstate import SettingsState, EVENT_DRAW_RATE
+from app.utils.glyphatlas import GlyphAtlas, GlyphText
+
+FONT_SIZE_OVERLAY = 14
+FONT_COLOR_OVERLAY = arcade.csscolor.WHITE
+OVERLAY_CHARS = '0123456789.- fpsmax'
+
+# Frames kept in the ring buffer, five minutes at 60 FPS
+RING_SIZE = 60 * 60 * 5
+
+# Seconds of frames the percentiles are computed over
+PERCENTILE_SECONDS = 5
+
+# Seconds between two updates of the text
+UPDATE_INTERVAL = 0.5
+
+# Frames and size in pixels of the frame time graph
+GRAPH_FRAMES = 240
+GRAPH_WIDTH = 240
+GRAPH_HEIGHT = 80
+GRAPH_MAX_MS = 50
+
+GRAPH_COLOR = (80, 220, 80, 255)
+GRAPH_COLOR_SLOW = (230, 60, 60, 255)
+GRAPH_COLOR_BUDGET = (255, 255, 255, 120)
+
+# Ring buffer columns
+COLUMNS = ['time', 'frame_ms', 'update_ms', 'fixed_update_ms', 'draw_ms']
+COLUMN_TIME = 0
+COLUMN_FRAME = 1
+COLUMN_UPDATE = 2
+COLUMN_FIXED_UPDATE = 3
+COLUMN_DRAW = 4
+
+VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in vec2 in_vert;
+in vec4 in_color;
+
+out vec4 v_color;
+
+void main() {
+    v_color = in_color;
+    gl_Position = window.projection * window.view * vec4(in_vert, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+
+in vec4 v_color;
+
+out vec4 f_color;
+
+void main() {
+    f_color = v_color;
+}
+"""
+
+
+class PerformanceOverlay:
+    """
+    Frame time overlay.
+
+    GameWindow.dispatch_event() reports the duration of every update,
+    fixed update and draw event. A frame ends with its draw, its row
+    in the ring buffer holds the time since the previous frame and the
+    time spent in the events. The overlay shows the FPS, the p50, p95
+    and p99 frame times and the worst frame of the last
+    PERCENTILE_SECONDS, drawn from a glyph atlas, followed by the sprites
+    drawn and culled by the scene and the cost of the effects of the
+    level which is watched. The graph of the
+    last GRAPH_FRAMES frame times is a single draw of one vertex buffer.
+    dump() writes the ring buffer to a CSV file in the log directory.
+    """
+
+    def __init__(self):
+        """ Constructor """
+
+        self._window = None
+        self._camera = None
+        self._frames = np.zeros((RING_SIZE, len(COLUMNS)))
+        self._count = 0
+        self._current = np.zeros(len(COLUMNS))
+        self._last_frame = None
+        self._last_update = 0
+        self._budget_ms = 0
+        self._glyph_atlas = None
+        self._text = None
+        self._program = None
+        self._buffer = None
+        self._geometry = None
+        self._effect_manager = None
+        self._scene = None
+
+    def setup(self, window: arcade.Window):
+        """ Setup the overlay """
+
+        self._window = window
+        self._camera = arcade.camera.Camera2D()
+        self.on_change_draw_rate(SettingsState.load())
+        SettingsState.subscribe(EVENT_DRAW_RATE, self.on_change_draw_rate)
+
+        self._glyph_atlas = GlyphAtlas.get(
+            window.root_dir,
+            FONT_MONOTYPE,
+            FONT_SIZE_OVERLAY
+        )
+        self._glyph_atlas.add(OVERLAY_CHARS)
+        self._text = GlyphText(len(self.format()), FONT_COLOR_OVERLAY)
+
+        ctx = window.ctx
+        self._program = ctx.program(
+            vertex_shader=VERTEX_SHADER,
+            fragment_shader=FRAGMENT_SHADER
+        )
+        # Line segments between the frames and the budget line
+        self._buffer = ctx.buffer(reserve=GRAPH_FRAMES * 2 * 12)
+        self._geometry = ctx.geometry(
+            [arcade.gl.BufferDescription(
+                self._buffer,
+                '2f 4f1',
+                ['in_vert', 'in_color'],
+                normalized=['in_color']
+            )],
+            mode=ctx.LINES
+        )
+        self._geometry.num_vertices = 0
+
+        return self
+
+    def on_change_draw_rate(self, state: SettingsState) -> None:
+        """ On change draw rate setting """
+
+        self._budget_ms = 1000 / state.draw_rate
+
+    def watch(self, effect_manager, scene) -> None:
+        """ Show the timings of the effects and the culling of a level """
+
+        self._effect_manager = weakref.ref(effect_manager)
+        self._scene = weakref.ref(scene)
+
+    @property
+    def enabled(self) -> bool:
+        """ Is the overlay shown """
+
+        return arcade.timings_enabled()
+
+    def record(self, event_type: str, seconds: float) -> None:
+        """
+        Record the duration of a window event
+        @param event_type: on_update, on_fixed_update or on_draw
+        """
+
+        ms = seconds * 1000
+
+        if event_type == 'on_update':
+            self._current[COLUMN_UPDATE] += ms
+        elif event_type == 'on_fixed_update':
+            self._current[COLUMN_FIXED_UPDATE] += ms
+        elif event_type == 'on_draw':
+            self._current[COLUMN_DRAW] += ms
+            self.end_frame()
+
+    def end_frame(self) -> None:
+        """ Store the current frame in the ring buffer """
+
+        now = time.perf_counter()
+
+        if self._last_frame is not None:
+            self._current[COLUMN_TIME] = now
+            self._current[COLUMN_FRAME] = (now - self._last_frame) * 1000
+            self._frames[self._count % RING_SIZE] = self._current
+            self._count += 1
+
+        self._last_frame = now
+        self._current = np.zeros(len(COLUMNS))
+
+    def recent(self, frames: int | None = None) -> np.ndarray:
+        """ The last frames in order, all of the ring buffer by default """
+
+        count = min(self._count, RING_SIZE)
+
+        if frames is not None:
+            count = min(count, frames)
+
+        indices = np.arange(self._count - count, self._count) % RING_SIZE
+
+        return self._frames[indices]
+
+    def statistics(self) -> tuple:
+        """
+        Statistics of the frames of the last PERCENTILE_SECONDS
+        @return: FPS, p50, p95, p99 and worst frame time in ms
+        """
+
+        frames = self.recent()
+        frames = frames[frames[:, COLUMN_TIME] >= time.perf_counter() - PERCENTILE_SECONDS]
+
+        if len(frames) == 0:
+            return 0, 0, 0, 0, 0
+
+        frame_ms = frames[:, COLUMN_FRAME]
+        p50, p95, p99 = np.percentile(frame_ms, [50, 95, 99])
+
+        return 1000 / frame_ms.mean(), p50, p95, p99, frame_ms.max()
+
+    @staticmethod
+    def format(statistics: tuple = (0, 0, 0, 0, 0)) -> str:
+        """ Text of the overlay """
+
+        fps, p50, p95, p99, worst = statistics
+
+        return (
+            f"{fps:5.0f} fps\n"
+            f"p50 {p50:6.1f} ms\n"
+            f"p95 {p95:6.1f} ms\n"
+            f"p99 {p99:6.1f} ms\n"
+            f"max {worst:6.1f} ms"
+        )
+
+    def format_scene(self) -> str:
+        """ Text of the sprites drawn and culled, empty without a level """
+
+        scene = self._scene() if self._scene else None
+
+        if not scene:
+            return ''
+
+        return f"\n\nsprites {scene.drawn:6d} drawn\n        {scene.culled:6d} culled"
+
+    def format_effects(self) -> str:
+        """ Text of the effect timings, empty without a level """
+
+        effect_manager = self._effect_manager() if self._effect_manager else None
+
+        if not effect_manager or not effect_manager.timings:
+            return ''
+
+        lines = [f"effects {effect_manager.frame_ms:5.2f} ms"]
+
+        for timing in effect_manager.timings:
+            rate = ''
+
+            if timing.throttle:
+                rate = f" 1/{timing.interval}" if timing.interval else ' off'
+
+            lines.append(
+                f"{timing.name:<15}{timing.update_ms:6.2f}{timing.draw_ms:6.2f}{rate}"
+            )
+
+        return '\n\n' + '\n'.join(lines)
+
+    def on_update(self) -> None:
+        """ Update the text and the graph """
+
+        if not self.enabled:
+            return
+
+        self.update_graph()
+
+        if time.time() < self._last_update + UPDATE_INTERVAL:
+            return
+
+        self._last_update = time.time()
+
+        text = (
+            self.format(self.statistics())
+            + self.format_scene()
+            + self.format_effects()
+        )
+
+        # The names of the effects are rasterized on first sight
+        self._glyph_atlas.add(text)
+
+        self._text.show(
+            self._glyph_atlas,
+            text,
+            MARGIN,
+            self._window.height - MARGIN - self._glyph_atlas.ascent
+        )
+
+    def update_graph(self) -> None:
+        """ Write the line segments of the graph into the vertex buffer """
+
+        frame_ms = self.recent(GRAPH_FRAMES)[:, COLUMN_FRAME]
+
+        if len(frame_ms) < 2:
+            return
+
+        left = self._window.width - MARGIN - GRAPH_WIDTH
+        top = self._window.height - MARGIN
+        bottom = top - GRAPH_HEIGHT
+
+        x = left + np.arange(len(frame_ms)) * GRAPH_WIDTH / (GRAPH_FRAMES - 1)
+        y = bottom + np.minimum(frame_ms, GRAPH_MAX_MS) * GRAPH_HEIGHT / GRAPH_MAX_MS
+        budget_y = bottom + min(self._budget_ms, GRAPH_MAX_MS) * GRAPH_HEIGHT / GRAPH_MAX_MS
+
+        # Each segment is colored by the frame it ends with
+        colors = np.where(
+            (frame_ms[1:] > self._budget_ms)[:, None],
+            np.array(GRAPH_COLOR_SLOW, dtype=np.uint8),
+            np.array(GRAPH_COLOR, dtype=np.uint8)
+        )
+
+        segments = len(frame_ms) - 1
+        positions = np.empty((segments + 1, 2, 2), dtype=np.float32)
+        positions[:segments, 0] = np.column_stack((x[:-1], y[:-1]))
+        positions[:segments, 1] = np.column_stack((x[1:], y[1:]))
+        positions[segments] = [(left, budget_y), (left + GRAPH_WIDTH, budget_y)]
+
+        vertex_colors = np.empty((segments + 1, 2, 4), dtype=np.uint8)
+        vertex_colors[:segments] = colors[:, None]
+        vertex_colors[segments] = GRAPH_COLOR_BUDGET
+
+        vertices = np.empty((segments + 1) * 2, dtype=[('vert', 'f4', 2), ('color', 'u1', 4)])
+        vertices['vert'] = positions.reshape(-1, 2)
+        vertices['color'] = vertex_colors.reshape(-1, 4)
+
+        self._buffer.write(vertices.tobytes())
+        self._geometry.num_vertices = len(vertices)
+
+    def draw(self) -> None:
+        """ Draw the overlay """
+
+        if not self.enabled:
+            return
+
+        ctx = self._window.ctx
+
+        self._camera.use()
+        self._text.draw()
+
+        with ctx.enabled(ctx.BLEND):
+            ctx.blend_func = ctx.BLEND_DEFAULT
+            self._geometry.render(self._program)
+
+    def dump(self) -> str | None:
+        """
+        Write the ring buffer to a CSV file in the log directory
+        @return: The path of the file
+        """
+
+        filename = f"frames-{datetime.now():%Y%m%d-%H%M%S}.csv"
+        path = os.path.join(log_path(), filename)
+        frames = self.recent()
+
+        try:
+            os.makedirs(log_path(), exist_ok=True)
+
+            with open(path, 'w', encoding='UTF-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(
+                    [f"{row[0]:.6f}"] + [f"{value:.3f}" for value in row[1:]]
+                    for row in frames
+                )
+        except OSError as e:
+            logging.error(e)
+            return None
+
+        logging.info(label_value('Frame times', f"{len(frames)} frames in {path}"))
+
+        return path
@@ -0,0 +1,128 @@
+""" Proximity triggers """
+
+import math
+
+import arcade
+
+# Edge length of a grid cell in pixels
+CELL_SIZE = 128
+
+
+class TriggerLayer:
+    """ A scene layer registered as proximity trigger """
+
+    __slots__ = ('name', 'radius', 'callback')
+
+    def __init__(self, name: str, radius: float, callback: callable):
+        """
+        Constructor.
+
+        :param name: Layer name
+        :param radius: Trigger radius in pixels
+        :param callback: Called with the layer name and the sprites in range
+        """
+        self.name = name
+        self.radius = radius
+        self.callback = callback
+
+
+class ProximityTriggers:
+    """
+    Uniform grid spatial index over the trigger layers of a level.
+
+    The sprites are bucketed by the cell of their center once when a
+    layer is added, so the trigger sprites are expected to stay in place.
+    A moved or removed sprite has to be removed with remove().
+    update() runs one grid query around the player per tick
+    and calls the callback of every layer with the sprites in range.
+    """
+
+    def __init__(self, cell_size: int = CELL_SIZE):
+        """ Constructor """
+
+        self._cell_size = cell_size
+        self._cells = {}
+        self._cell_of = {}
+        self._layers = {}
+        self._max_radius = 0
+
+    def add(
+            self,
+            scene: arcade.Scene,
+            layer: str,
+            radius: float,
+            callback: callable
+    ) -> None:
+        """
+        Register all sprites of a scene layer
+        Missing layers are ignored
+        """
+
+        if layer not in scene:
+            return
+
+        self._layers[layer] = TriggerLayer(layer, radius, callback)
+        self._max_radius = max(self._max_radius, radius)
+
+        for sprite in scene[layer]:
+            cell = self.cell(sprite.center_x, sprite.center_y)
+            self._cells.setdefault(cell, []).append((sprite, layer))
+            self._cell_of[sprite] = cell
+
+    def remove(self, sprite: arcade.BasicSprite) -> None:
+        """ Remove a sprite from the index """
+
+        cell = self._cell_of.pop(sprite, None)
+
+        if cell is None:
+            return
+
+        self._cells[cell] = [
+            entry for entry in self._cells[cell] if entry[0] is not sprite
+        ]
+
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def cell(self, x: float, y: float) -> tuple:
+        """ Grid cell of a position """
+
+        return int(x // self._cell_size), int(y // self._cell_size)
+
+    def query(self, x: float, y: float, radius: float) -> list:
+        """
+        Get the entries within a radius around a position
+        @return: List of (sprite, layer) tuples
+        """
+
+        min_x, min_y = self.cell(x - radius, y - radius)
+        max_x, max_y = self.cell(x + radius, y + radius)
+
+        found = []
+
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for sprite, layer in self._cells.get((cell_x, cell_y), ()):
+                    distance = math.hypot(
+                        sprite.center_x - x,
+                        sprite.center_y - y
+                    )
+
+                    if distance < min(radius, self._layers[layer].radius):
+                        found.append((sprite, layer))
+
+        return found
+
+    def update(self, position: tuple) -> None:
+        """ Fire the callbacks of all layers for a player position """
+
+        if not self._layers:
+            return
+
+        in_range = {layer: [] for layer in self._layers}
+
+        for sprite, layer in self.query(*position, self._max_radius):
+            in_range[layer].append(sprite)
+
+        for layer, sprites in in_range.items():
+            self._layers[layer].callback(layer, sprites)
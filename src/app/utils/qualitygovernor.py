@@ -0,0 +1,228 @@
+""" Quality governor """
+
+import logging
+import math
+import time
+
+import numpy as np
+
+from app.constants.settings import SETTINGS_UNLIMITED_DRAW_RATE
+from app.helpers.display import default_rate
+from app.helpers.string import label_value
+from app.state.settingsstate import SettingsState, EVENT_QUALITY
+from app.utils.performanceoverlay import (
+    PerformanceOverlay, COLUMN_TIME, COLUMN_FRAME, COLUMN_UPDATE,
+    COLUMN_FIXED_UPDATE, COLUMN_DRAW
+)
+from app.utils.rendertarget import RenderTarget, RENDER_SCALE_STEP
+
+# What is lowered first, one step per quality level
+QUALITY_STEPS = ['particles', 'effect updates', 'overlays', 'antialiasing']
+
+# Frames the decisions are based on
+QUALITY_WINDOW = 120
+
+# Seconds to wait after a change before the next one
+QUALITY_COOLDOWN = 2.0
+
+# The median frame time above the target frame time by this is a miss
+QUALITY_MISS_RATIO = 1.1
+
+# Quality is raised when the busy time stays below this share
+QUALITY_HEADROOM_RATIO = 0.6
+
+# Raising a level which was missed before waits twice as long each time
+QUALITY_BACKOFF_MAX = 5
+
+# Particle count modifier of the lowered particles step
+QUALITY_PARTICLES = 0.25
+
+# Frames an effect is throttled to by the lowered effect updates step
+QUALITY_EFFECT_THROTTLE = 1
+
+# Share of the target frame time the GPU may take for the world
+RENDER_SCALE_BUDGET = 0.75
+
+# Weight of the latest GPU time in the rolling average
+RENDER_SCALE_SMOOTHING = 0.1
+
+# Seconds between two changes of the render scale
+RENDER_SCALE_INTERVAL = 0.5
+
+
+class QualityGovernor:
+    """
+    Adaptive quality driven by the measured frame times.
+
+    With the auto quality setting it watches the last QUALITY_WINDOW
+    frames of the performance overlay. When the median frame time misses
+    the target frame time, the quality is lowered by one of QUALITY_STEPS
+    in order. When the time spent in the frame events leaves enough
+    headroom, the last step is raised again. Every level which was
+    missed doubles the wait before raising to it again, so a machine
+    just at the limit doesn't flip between two levels. The effects read
+    the current quality and are refreshed by EVENT_QUALITY.
+
+    Independent of the levels, the render scale of the world follows
+    the GPU time of the world pass, which grows with the square of
+    the scale. It is lowered right away to fit RENDER_SCALE_BUDGET
+    and raised one step at a time when two steps would fit.
+    """
+
+    def __init__(self):
+        """ Constructor """
+
+        self.level = 0
+        self._overlay = None
+        self._world_target = None
+        self._changed = 0
+        self._misses = [0] * (len(QUALITY_STEPS) + 1)
+        self._gpu_ms = None
+        self._scaled = 0
+        self._auto = False
+
+    def setup(self, overlay: PerformanceOverlay, world_target: RenderTarget):
+        """ Setup the governor """
+
+        self._overlay = overlay
+        self._world_target = world_target
+        self._changed = time.perf_counter()
+        # The render target is only set up at startup,
+        # so changing the setting needs a restart as well
+        self._auto = SettingsState.load().quality_auto
+
+        return self
+
+    @property
+    def particles(self) -> float:
+        """ Particle count modifier """
+
+        return QUALITY_PARTICLES if self.level >= 1 else 1.0
+
+    @property
+    def effect_throttle(self) -> int:
+        """ Throttle of the low priority effects """
+
+        return QUALITY_EFFECT_THROTTLE if self.level >= 2 else 0
+
+    @property
+    def overlays(self) -> bool:
+        """ Are the film grain and VHS overlays drawn """
+
+        return self.level < 3
+
+    @property
+    def samples(self) -> int:
+        """ Multisampling of the world """
+
+        return 0 if self.level >= 4 else SettingsState.load().antialiasing
+
+    @staticmethod
+    def target_ms() -> float:
+        """ Frame time of the draw rate, one refresh if it is unlimited """
+
+        draw_rate = SettingsState.load().actual_draw_rate
+
+        if draw_rate == SETTINGS_UNLIMITED_DRAW_RATE:
+            draw_rate = default_rate()
+
+        return 1000 / draw_rate
+
+    def on_update(self) -> None:
+        """ Lower or raise the quality """
+
+        if not self._auto:
+            return
+
+        self.update_scale()
+
+        now = time.perf_counter()
+
+        if now < self._changed + QUALITY_COOLDOWN:
+            return
+
+        frames = self._overlay.recent(QUALITY_WINDOW)
+
+        # Only frames drawn with the current quality
+        frames = frames[frames[:, COLUMN_TIME] > self._changed]
+
+        if len(frames) < QUALITY_WINDOW:
+            return
+
+        target_ms = self.target_ms()
+        frame_ms = np.median(frames[:, COLUMN_FRAME])
+        busy_ms = np.percentile(
+            frames[:, [COLUMN_UPDATE, COLUMN_FIXED_UPDATE, COLUMN_DRAW]].sum(axis=1),
+            90
+        )
+        reason = f"frame {frame_ms:.1f} ms, busy {busy_ms:.1f} ms, target {target_ms:.1f} ms"
+
+        if frame_ms > target_ms * QUALITY_MISS_RATIO:
+            if self.level < len(QUALITY_STEPS):
+                self._misses[self.level] += 1
+                self.change(self.level + 1, reason)
+            return
+
+        if self.level == 0 or busy_ms > target_ms * QUALITY_HEADROOM_RATIO:
+            return
+
+        backoff = 2 ** min(self._misses[self.level - 1], QUALITY_BACKOFF_MAX)
+
+        if now < self._changed + QUALITY_COOLDOWN * backoff:
+            return
+
+        self.change(self.level - 1, reason)
+
+    def update_scale(self) -> None:
+        """ Choose the render scale from the GPU time of the world pass """
+
+        for gpu_ms in self._world_target.gpu_times():
+            if self._gpu_ms is None:
+                self._gpu_ms = gpu_ms
+
+            self._gpu_ms += (gpu_ms - self._gpu_ms) * RENDER_SCALE_SMOOTHING
+
+        now = time.perf_counter()
+
+        if self._gpu_ms is None or now < self._scaled + RENDER_SCALE_INTERVAL:
+            return
+
+        scale = self._world_target.scale
+        budget_ms = self.target_ms() * RENDER_SCALE_BUDGET
+        fitting = scale * math.sqrt(budget_ms / max(self._gpu_ms, 0.001))
+
+        if fitting >= scale + RENDER_SCALE_STEP * 2:
+            self._world_target.scale = scale + RENDER_SCALE_STEP
+        elif fitting < scale:
+            self._world_target.scale = fitting
+
+        if self._world_target.scale == scale:
+            return
+
+        logging.info(
+            label_value(
+                'Render scale',
+                f"{self._world_target.scale:.2f}, "
+                f"gpu {self._gpu_ms:.1f} ms, budget {budget_ms:.1f} ms"
+            )
+        )
+
+        # Until new measurements arrive, expect the pixels to cost the same
+        self._gpu_ms *= (self._world_target.scale / scale) ** 2
+        self._scaled = now
+
+    def change(self, level: int, reason: str) -> None:
+        """ Apply a quality level """
+
+        if level > self.level:
+            text = f"lowered {QUALITY_STEPS[level - 1]}"
+        else:
+            text = f"raised {QUALITY_STEPS[self.level - 1]}"
+
+        self.level = level
+        self._changed = time.perf_counter()
+
+        logging.info(label_value('Quality', f"{text} to level {level}, {reason}"))
+
+        self._world_target.samples = self.samples
+        SettingsState.load().publish(EVENT_QUALITY)
@@ -0,0 +1,234 @@
+""" Render target """
+
+import logging
+from contextlib import contextmanager
+
+import arcade
+from pyglet import gl
+
+from app.helpers.string import label_value
+from app.utils.gputimer import GpuTimer
+
+# Range of the render scale
+RENDER_SCALE_MIN = 0.5
+RENDER_SCALE_MAX = 1.0
+
+# The render scale changes in steps of this
+RENDER_SCALE_STEP = 0.05
+
+
+class RenderTarget:
+    """
+    Offscreen framebuffer the world is drawn into.
+
+    The window multisampling is fixed when the window is created, the
+    one of the render target can be changed at runtime. The world is
+    drawn into the bottom left part of the framebuffer given by the
+    render scale, the cameras of the world pass use viewport for it.
+    draw() resolves the multisampling and upscales that part to the
+    window with a filtered blit. The framebuffers are allocated for the
+    full size, so changing the scale allocates nothing. The GPU time of
+    the world pass is measured with a GpuTimer.
+    A render target which isn't set up draws straight to the window.
+    """
+
+    def __init__(self):
+        """ Constructor """
+
+        self._ctx = None
+        self._size = (0, 0)
+        self._samples = 0
+        self._scale = RENDER_SCALE_MAX
+        self._framebuffer = None
+        self._framebuffer_samples = None
+        self._gpu_timer = None
+
+    def setup(self, ctx: arcade.ArcadeContext, size: tuple, samples: int):
+        """ Create the framebuffers """
+
+        self._ctx = ctx
+        self._size = size
+        self._samples = min(samples, ctx.info.MAX_SAMPLES)
+        self._gpu_timer = GpuTimer()
+        self.create()
+
+        return self
+
+    def create(self) -> None:
+        """ Create the framebuffers for the size and samples """
+
+        self.release_framebuffers()
+
+        ctx = self._ctx
+        texture = ctx.texture(self._size)
+        self._framebuffer = ctx.framebuffer(color_attachments=[texture])
+
+        if self._samples:
+            self._framebuffer_samples = ctx.framebuffer(
+                color_attachments=[
+                    ctx.texture(self._size, samples=self._samples)
+                ]
+            )
+
+        logging.info(
+            label_value(
+                'Render target',
+                f"{self._size[0]}x{self._size[1]}, {self._samples} samples"
+            )
+        )
+
+    def release(self) -> None:
+        """ Release the framebuffers and the queries of the GPU timer """
+
+        self.release_framebuffers()
+
+        if self._gpu_timer:
+            self._gpu_timer.release()
+            self._gpu_timer = None
+
+    def release_framebuffers(self) -> None:
+        """
+        Delete the framebuffers and their textures right away,
+        the garbage collector may keep them for a while
+        """
+
+        for framebuffer in (self._framebuffer, self._framebuffer_samples):
+            if not framebuffer:
+                continue
+
+            for texture in framebuffer.color_attachments:
+                texture.delete()
+
+            framebuffer.delete()
+
+        self._framebuffer = None
+        self._framebuffer_samples = None
+
+    @property
+    def enabled(self) -> bool:
+        """ Is the world drawn offscreen """
+
+        return self._framebuffer is not None
+
+    @property
+    def samples(self) -> int:
+        """ Samples of the multisampling, 0 if it is off """
+
+        return self._samples
+
+    @samples.setter
+    def samples(self, value: int) -> None:
+        """ Change the multisampling """
+
+        if not self.enabled:
+            return
+
+        value = min(value, self._ctx.info.MAX_SAMPLES)
+
+        if value == self._samples:
+            return
+
+        self._samples = value
+        self.create()
+
+    @property
+    def scale(self) -> float:
+        """ Render resolution relative to the window """
+
+        return self._scale
+
+    @scale.setter
+    def scale(self, value: float) -> None:
+        """ Change the render resolution, in steps of RENDER_SCALE_STEP """
+
+        value = round(value / RENDER_SCALE_STEP) * RENDER_SCALE_STEP
+        self._scale = min(max(value, RENDER_SCALE_MIN), RENDER_SCALE_MAX)
+
+    @property
+    def viewport(self) -> arcade.types.Rect:
+        """ Viewport of the cameras of the world pass """
+
+        if not self.enabled:
+            return arcade.get_window().rect
+
+        width, height = self.scaled_size
+
+        return arcade.LBWH(0, 0, width, height)
+
+    @property
+    def scaled_size(self) -> tuple:
+        """ Size of the part of the framebuffer the world is drawn into """
+
+        return (
+            max(1, round(self._size[0] * self._scale)),
+            max(1, round(self._size[1] * self._scale))
+        )
+
+    @contextmanager
+    def activate(self):
+        """ Draw into the render target """
+
+        if not self.enabled:
+            yield
+            return
+
+        framebuffer = self._framebuffer_samples or self._framebuffer
+
+        with framebuffer.activate(), self._gpu_timer.measure():
+            framebuffer.clear(color=arcade.get_window().background_color)
+            yield
+
+    def gpu_times(self) -> list:
+        """ Milliseconds the GPU took for the world passes finished since the last call """
+
+        if not self.enabled:
+            return []
+
+        return self._gpu_timer.results()
+
+    def draw(self) -> None:
+        """ Draw the render target to the window """
+
+        if not self.enabled:
+            return
+
+        width, height = self.scaled_size
+
+        if self._framebuffer_samples:
+            self.blit(
+                self._framebuffer_samples,
+                self._framebuffer,
+                (width, height),
+                (width, height),
+                gl.GL_NEAREST
+            )
+
+        self.blit(
+            self._framebuffer,
+            self._ctx.screen,
+            (width, height),
+            self._ctx.screen.size,
+            gl.GL_LINEAR
+        )
+
+    def blit(
+            self,
+            source: arcade.gl.Framebuffer,
+            destination: arcade.gl.Framebuffer,
+            source_size: tuple,
+            destination_size: tuple,
+            blit_filter: int
+    ) -> None:
+        """ Copy the bottom left part of a framebuffer to another one """
+
+        gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, source.glo)
+        gl.glBindFramebuffer(gl.GL_DRAW_FRAMEBUFFER, destination.glo)
+        gl.glBlitFramebuffer(
+            0, 0, *source_size,
+            0, 0, *destination_size,
+            gl.GL_COLOR_BUFFER_BIT,
+            blit_filter
+        )
+
+        # The blit binds the framebuffers behind the back of arcade
+        self._ctx.active_framebuffer.use(force=True)
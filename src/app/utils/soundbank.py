@@ -0,0 +1,118 @@
+""" Sound bank """
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import arcade
+import pyglet
+
+from app.constants.gameinfo import DEFAULT_ENCODING
+from app.constants.settings import SOUND_BANK_BUDGET
+from app.helpers.string import label_value
+
+
+class SoundBank:
+    """
+    Decoded sound effects kept in memory.
+
+    The sounds are named by their path relative to resources/sounds.
+    The global sounds from resources/sounds/manifest.json are preloaded
+    on setup, the sounds of a map are preloaded by the level loader.
+    The decoded sources are kept within a byte budget, the least
+    recently used ones are evicted first.
+    """
+
+    def __init__(self, root_dir: str, budget: int = SOUND_BANK_BUDGET):
+        """ Constructor """
+
+        self._root_dir = root_dir
+        self._budget = budget
+        self._sounds = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def setup(self):
+        """ Preload the global sounds """
+
+        path = os.path.join(self._root_dir, 'resources', 'sounds',
+                            'manifest.json')
+        with open(path, mode='r', encoding=DEFAULT_ENCODING) as file:
+            manifest = json.load(file)
+
+        self.preload(manifest.get('global', []))
+
+        return self
+
+    @property
+    def size(self) -> int:
+        """ Decoded bytes in memory """
+
+        return self._size
+
+    def preload(self, names: list) -> None:
+        """ Decode sounds which aren't in the bank yet """
+
+        for name in names:
+            self.get(name)
+
+    def get(self, name: str) -> arcade.Sound:
+        """ Get a sound, decode it on a miss """
+
+        with self._lock:
+            if name in self._sounds:
+                self._sounds.move_to_end(name)
+                return self._sounds[name]
+
+        # Decode without holding the lock
+        sound = arcade.load_sound(
+            os.path.join(self._root_dir, 'resources', 'sounds', name),
+            streaming=False
+        )
+        logging.debug(label_value('Sound decoded', name))
+
+        with self._lock:
+            if name not in self._sounds:
+                self._sounds[name] = sound
+                self._size += self.sizeof(sound)
+                self._evict()
+
+        return sound
+
+    def play(self, name: str, volume: float = 1.0,
+             loop: bool = False) -> pyglet.media.Player:
+        """ Play a sound from the bank """
+
+        return self.get(name).play(volume=volume, loop=loop)
+
+    def evict(self, name: str) -> None:
+        """ Remove a sound from the bank """
+
+        with self._lock:
+            sound = self._sounds.pop(name, None)
+
+            if sound:
+                self._size -= self.sizeof(sound)
+
+    def _evict(self) -> None:
+        """ Evict the least recently used sounds until the bank fits """
+
+        # The newest sound stays even if it is larger than the budget
+        while self._size > self._budget and len(self._sounds) > 1:
+            name, sound = self._sounds.popitem(last=False)
+            self._size -= self.sizeof(sound)
+            logging.info(label_value('Sound evicted', name))
+
+    @staticmethod
+    def sizeof(sound: arcade.Sound) -> int:
+        """ Decoded size of a sound in bytes """
+
+        source = sound.source
+        audio_format = source.audio_format
+
+        if not audio_format or not source.duration:
+            return 0
+
+        return int(source.duration * audio_format.bytes_per_second)
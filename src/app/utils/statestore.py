@@ -0,0 +1,194 @@
+""" State store """
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from app.constants.gameinfo import DEFAULT_ENCODING
+from app.helpers.string import label_value
+
+# Key jsonpickle used to store the class of an object
+LEGACY_OBJECT_KEY = 'py/object'
+
+
+class StateStore:
+    """
+    Persistence of the settings and savegame files.
+
+    write() only queues a plain dict, a background thread writes it
+    to disk after a delay. Successive writes to the same file within
+    the delay are coalesced, only the latest data is written.
+    Files are written to a temporary file first and then renamed,
+    so a crash mid-write leaves the previous file intact.
+    read() returns queued data first, so a pending write is never
+    overtaken by an outdated read from disk.
+    """
+
+    # Path => (due time, data)
+    _pending = {}
+    # Path => data taken from the queue but not renamed into place yet
+    _writing = {}
+    _condition = threading.Condition()
+    _write_lock = threading.Lock()
+    _thread = None
+
+    @classmethod
+    def read(cls, path: str) -> dict:
+        """
+        Read a state file
+        @raise OSError: if the file can't be read
+        @raise ValueError: if the file isn't a JSON object
+        """
+
+        with cls._condition:
+            if path in cls._pending:
+                return cls._pending[path][1]
+
+            if path in cls._writing:
+                return cls._writing[path]
+
+        with open(path, 'r', encoding=DEFAULT_ENCODING) as f:
+            data = json.load(f)
+
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: state must be an object")
+
+        return cls.legacy(data)
+
+    @staticmethod
+    def legacy(data):
+        """
+        Convert a jsonpickle object graph to the plain schema
+        by dropping the class names and the leading underscores
+        """
+
+        if not isinstance(data, dict):
+            return data
+
+        return {
+            key.lstrip('_'): StateStore.legacy(value)
+            for key, value in data.items()
+            if key != LEGACY_OBJECT_KEY
+        }
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """ Check if a state file exists or is about to be written """
+
+        with cls._condition:
+            if path in cls._pending or path in cls._writing:
+                return True
+
+        return os.path.exists(path)
+
+    @classmethod
+    def write(cls, path: str, data: dict, delay: float = 0) -> None:
+        """
+        Queue a state to be written in the background
+        @param path: File path
+        @param data: JSON serializable dict, mustn't be changed afterwards
+        @param delay: Seconds to wait for further writes to the same file
+        """
+
+        with cls._condition:
+            cls._pending[path] = (time.monotonic() + delay, data)
+
+            if not cls._thread:
+                cls._thread = threading.Thread(
+                    target=cls._run,
+                    name='StateStore',
+                    daemon=True
+                )
+                cls._thread.start()
+
+            cls._condition.notify()
+
+    @classmethod
+    def delete(cls, path: str) -> None:
+        """ Drop a pending write and delete the file """
+
+        # The write lock waits for a write in progress
+        with cls._write_lock:
+            with cls._condition:
+                cls._pending.pop(path, None)
+
+            if os.path.exists(path):
+                os.unlink(path)
+
+    @classmethod
+    def flush(cls) -> None:
+        """ Write all pending states now """
+
+        with cls._write_lock:
+            cls._write_due(float('inf'))
+
+    @classmethod
+    def _run(cls) -> None:
+        """ Writer thread """
+
+        while True:
+            with cls._condition:
+                while not cls._pending:
+                    cls._condition.wait()
+
+                next_due = min(
+                    due_time for due_time, _data in cls._pending.values()
+                )
+                wait = next_due - time.monotonic()
+
+                if wait > 0:
+                    cls._condition.wait(wait)
+                    continue
+
+            with cls._write_lock:
+                cls._write_due(time.monotonic())
+
+    @classmethod
+    def _write_due(cls, now: float) -> None:
+        """
+        Write the states which are due, the write lock has to be held
+        Taking them from the queue under the write lock keeps the order
+        """
+
+        with cls._condition:
+            due = [
+                (path, cls._pending.pop(path)[1])
+                for path, (due_time, _data) in list(cls._pending.items())
+                if due_time <= now
+            ]
+            cls._writing.update(due)
+
+        # Only the queue is locked for writers, the disk access isn't
+        for path, data in due:
+            cls._write(path, data)
+
+        with cls._condition:
+            for path, _data in due:
+                cls._writing.pop(path, None)
+
+    @staticmethod
+    def _write(path: str, data: dict) -> None:
+        """ Write a file atomically through a temporary file """
+
+        temp_path = path + '.tmp'
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            with open(temp_path, 'w', encoding=DEFAULT_ENCODING) as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(temp_path, path)
+            logging.debug(label_value('State written', path))
+        except OSError as e:
+            logging.error(e)
+        except TypeError as e:
+            logging.error(e)
+
+
+atexit.register(StateStore.flush)
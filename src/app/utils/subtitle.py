@@ -1,108 +1,190 @@
 """ Subtitle """
 
+import bisect
 import logging
 import os
 
 import arcade
-from arcade import SpriteList
-
 from app.constants.fonts import FONT_DEFAULT
 from app.constants.ui import MARGIN
 from app.state.settingsstate import SettingsState
+from app.utils.glyphatlas import GlyphAtlas, GlyphText
+from app.utils.tracer import trace
 
 TEXT_COLOR = arcade.csscolor.WHITE
 
+# Glyph sprites the sprite list has room for without growing
+SUBTITLE_CAPACITY = 256
+
 
 class Subtitle:
-    """ Subtitle """
+    """
+    Subtitle
+
+    The cues of a subtitle file are parsed into sorted arrays and the
+    current cue is found by bisecting the playback time. The text is
+    drawn with a pool of glyph sprites from the GlyphAtlas of the
+    subtitle size. setup() rasterizes the characters of all subtitles
+    of the level, so starting a voiceover neither renders text
+    nor creates OpenGL objects.
+    """
 
     def __init__(self):
         """ Constructor """
+        self._root_dir = None
+        self._chars = set()
+        self._glyph_atlas = None
+        self._times = []
         self._texts = []
-        self._rendered_texts = []
-        self._current_text = None
+        self._index = -1
+        self._text = GlyphText(SUBTITLE_CAPACITY, TEXT_COLOR)
 
-    def load(self, filename: str) -> None:
-        """ Load subtitle file """
+    def setup(self, root_dir: str, subtitles: list) -> None:
+        """
+        Rasterize the characters of the subtitles
+        @param subtitles: Lines of every subtitle file of the level
+        """
 
-        self.clear()
+        self._root_dir = root_dir
+        longest = 0
 
-        filename_parts = os.path.splitext(filename)
-        text_file = f"{filename_parts[0]}.txt"
+        for texts in subtitles:
+            cues = self.parse(texts)[1]
+            self._chars.update(*cues)
+            longest = max([longest] + [len(text) for text in cues])
 
-        self._texts = []
+        self.prepare()
+        self._text.reserve(min(longest, SUBTITLE_CAPACITY))
+
+    def prepare(self) -> None:
+        """ Get the glyphs for the current subtitle size """
 
         state = SettingsState.load()
 
-        if not state.subtitle_enabled:
+        if not state.subtitle_enabled or state.subtitle_size == 0:
+            self._glyph_atlas = None
             return
 
-        if state.subtitle_size == 0:
-            return
+        self._glyph_atlas = GlyphAtlas.get(
+            self._root_dir,
+            FONT_DEFAULT,
+            state.subtitle_size
+        )
+        self._glyph_atlas.add(self._chars)
+
+    @staticmethod
+    def read(filename: str) -> list:
+        """
+        Read the subtitle file of a voiceover
+        @param filename: Path of the voiceover
+        @return: The lines of the subtitle file
+        """
+
+        filename_parts = os.path.splitext(filename)
+        text_file = f"{filename_parts[0]}.txt"
+
+        texts = []
 
         with open(text_file, 'r', encoding='UTF-8') as file:
             while line := file.readline():
-                self._texts.append(line.rstrip())
+                texts.append(line.rstrip())
 
-        self._rendered_texts = []
+        return texts
 
-        w = arcade.get_window().width
+    @staticmethod
+    def parse(texts: list) -> tuple:
+        """
+        Parse the lines of a subtitle file
+        @return: Sorted start times and the texts of the cues
+        """
 
-        for text in self._texts:
+        cues = []
 
+        for text in texts:
             parts = text.split(' ', maxsplit=1)
 
-            font_size = state.subtitle_size
-
-            sprite = arcade.create_text_sprite(
-                text=parts[1],
-                font_name=FONT_DEFAULT,
-                font_size=font_size,
-                color=TEXT_COLOR
-            )
-
-            if sprite.width > w:
-                logging.warning(
-                    f"Subtitle sprite width {sprite.width} is too large; {text}")
-
-            sprite.center_x = w / 2
-            sprite.bottom = MARGIN
-
-            sprite_list = SpriteList(lazy=True)
-            sprite_list.append(sprite)
-
             try:
                 time = float(parts[0])
             except ValueError:
                 logging.error(f"Can not parse subtitle timestamp {parts[0]}")
                 continue
 
-            self._rendered_texts.append({
-                'time': time,
-                'text': text,
-                'sprite_list': sprite_list
-            })
+            cues.append((time, parts[1] if len(parts) > 1 else ''))
 
-        self._current_text = self._rendered_texts[0]
+        cues.sort(key=lambda cue: cue[0])
+
+        return [cue[0] for cue in cues], [cue[1] for cue in cues]
+
+    @trace
+    def load(self, filename: str, texts: list | None = None) -> None:
+        """
+        Load subtitle file
+        @param texts: Lines read before, the file is read without them
+        """
+
+        self.clear()
+        self.prepare()
+
+        if not self._glyph_atlas:
+            return
+
+        if texts is None:
+            texts = self.read(filename)
+
+        self._times, self._texts = self.parse(texts)
+
+        # Only rasterizes characters which weren't known by setup()
+        for text in self._texts:
+            self._glyph_atlas.add(text)
+
+        if self._texts:
+            self.show(0)
 
     def on_update(self, player) -> None:
         """ Update subtitle """
 
-        for text in self._rendered_texts:
-            if player.time >= text['time']:
-                self._current_text = text
+        if not self._times:
+            return
+
+        # The first cue is shown until the second one starts
+        index = max(0, bisect.bisect_right(self._times, player.time) - 1)
+
+        if index != self._index:
+            self.show(index)
+
+    def show(self, index: int) -> None:
+        """ Lay out the glyph sprites of a cue """
+
+        self._index = index
+        text = self._texts[index]
+        glyph_atlas = self._glyph_atlas
+
+        w = arcade.get_window().width
+        width = glyph_atlas.width(text)
+
+        if width > w:
+            logging.warning(
+                f"Subtitle width {width} is too large; {text}")
+
+        self._text.show(
+            glyph_atlas,
+            text,
+            (w - width) / 2,
+            MARGIN + glyph_atlas.descent
+        )
 
     def clear(self) -> None:
         """ Clear """
 
+        self._times = []
         self._texts = []
-        self._rendered_texts = []
-        self._current_text = None
+        self._index = -1
+        self._text.hide()
 
     def draw(self) -> None:
         """ Draw """
 
-        if not self._current_text:
+        if self._index < 0:
             return
 
-        self._current_text['sprite_list'].draw()
+        self._text.draw()
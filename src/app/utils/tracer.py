@@ -0,0 +1,159 @@
+""" Trace event profiler """
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from app.constants.gameinfo import DEFAULT_ENCODING
+from app.helpers.paths import log_path
+from app.helpers.string import label_value
+
+# Command line argument which enables tracing
+TRACE_ARGUMENT = '--trace'
+
+# Spans kept in memory, the oldest are dropped first
+TRACE_CAPACITY = 500000
+
+MICROSECONDS = 1000000
+
+
+class Tracer:
+    """
+    Records spans of the game loop as Chrome trace events.
+
+    Tracing is enabled by --trace before the game modules are imported,
+    because the trace() decorator returns the function unchanged when it
+    is off, so the decorated methods cost nothing in release builds.
+    span() returns a shared null context when it is off. write() stores the recorded
+    spans as trace_event JSON in the log directory, which can be opened
+    in Perfetto or chrome://tracing.
+    """
+
+    enabled = False
+
+    _spans = deque(maxlen=TRACE_CAPACITY)
+    _threads = {}
+    _null_span = nullcontext()
+
+    @staticmethod
+    def span(name: str):
+        """ Context manager recording a span """
+
+        if not Tracer.enabled:
+            return Tracer._null_span
+
+        return Tracer._span(name)
+
+    @staticmethod
+    @contextmanager
+    def _span(name: str):
+        """ Measure a span """
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            Tracer.add(name, start, time.perf_counter())
+
+    @staticmethod
+    def add(name: str, start: float, end: float) -> None:
+        """
+        Add a finished span
+        @param start: perf_counter() when the span started
+        @param end: perf_counter() when the span ended
+        """
+
+        thread_id = threading.get_ident()
+
+        if thread_id not in Tracer._threads:
+            Tracer._threads[thread_id] = threading.current_thread().name
+
+        Tracer._spans.append((name, start, end, thread_id))
+
+    @staticmethod
+    def events() -> list:
+        """ The recorded spans as trace events """
+
+        pid = os.getpid()
+
+        events = [{
+            'name': 'thread_name',
+            'ph': 'M',
+            'pid': pid,
+            'tid': thread_id,
+            'args': {'name': thread_name}
+        } for thread_id, thread_name in list(Tracer._threads.items())]
+
+        events += [{
+            'name': name,
+            'ph': 'X',
+            'ts': start * MICROSECONDS,
+            'dur': (end - start) * MICROSECONDS,
+            'pid': pid,
+            'tid': thread_id
+        } for name, start, end, thread_id in list(Tracer._spans)]
+
+        return events
+
+    @staticmethod
+    def write() -> str | None:
+        """
+        Write the recorded spans to a JSON file in the log directory
+        @return: The path of the file
+        """
+
+        if not Tracer.enabled:
+            return None
+
+        filename = f"trace-{datetime.now():%Y%m%d-%H%M%S}.json"
+        path = os.path.join(log_path(), filename)
+        events = Tracer.events()
+
+        try:
+            os.makedirs(log_path(), exist_ok=True)
+
+            with open(path, 'w', encoding=DEFAULT_ENCODING) as f:
+                json.dump({
+                    'traceEvents': events,
+                    'displayTimeUnit': 'ms'
+                }, f)
+        except OSError as e:
+            logging.error(e)
+            return None
+
+        logging.info(label_value('Trace', f"{len(events)} events in {path}"))
+
+        return path
+
+
+def trace(func=None, *, name: str | None = None):
+    """
+    Decorator recording every call of a function as a span
+    @param name: Name of the span, the qualified name of the function by default
+    """
+
+    if func is None:
+        return functools.partial(trace, name=name)
+
+    if not Tracer.enabled:
+        return func
+
+    span_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            Tracer.add(span_name, start, time.perf_counter())
+
+    return wrapper
@@ -2,16 +2,18 @@
 import logging
 import os
 import random
+from concurrent.futures import ThreadPoolExecutor
 
 import arcade
 import pyglet
 from arcade import Sprite
 
-from app.constants.layers import LAYERS_VOICEOVER, LAYER_FIRST_VOICEOVER
+from app.constants.layers import LAYER_FIRST_VOICEOVER
 from app.containers.callbacks import Callbacks
 from app.helpers.string import label_value
 from app.utils.audiovolumes import AudioVolumes
 from app.utils.subtitle import Subtitle
+from app.utils.tracer import trace
 
 VOICEOVER_DEFAULT = 'text00.mp3'
 MULTIPLIER_MUSIC = 0.66
@@ -22,7 +24,18 @@ LIGHT_COLLISION_CHECK_THRESHOLD = 100
 
 
 class VoiceOverTiggers:
-    """ Voice over trigger handling """
+    """
+    Voice over trigger handling
+
+    The voiceover which is played next is prefetched when the level
+    starts and after each voiceover. A background thread opens the
+    streaming audio source and reads the subtitles, so play_voiceover()
+    starts without any I/O. The subtitle glyphs are rasterized by setup().
+    The first voiceover light always plays VOICEOVER_DEFAULT,
+    so it is prefetched as well.
+    """
+
+    _executor = None
 
     def __init__(self):
         """ Voice over trigger handling """
@@ -36,28 +49,104 @@ class VoiceOverTiggers:
         self.launching_sprite = None
         self._tilemap = None
         self._missile_sound = None
+        self._subtitles = {}
+        self._root_dir = None
+        # Filename => future of (sound, texts)
+        self._prefetched = {}
 
     def setup(self, voiceover_range: list, callbacks: Callbacks,
-              tilemap: arcade.TileMap):
+              tilemap: arcade.TileMap, subtitles: dict | None = None,
+              root_dir: str | None = None):
         """ Setup """
 
         self._callbacks = callbacks
         self._tilemap = tilemap
+        self._subtitles = subtitles or {}
+        self._root_dir = root_dir
+        self._subtitle.setup(root_dir, list(self._subtitles.values()))
 
-        voiceovers = []
-
-        for i in range(voiceover_range[0], voiceover_range[1]):
-            voiceovers.append("text" + str(i).rjust(2, '0') + '.mp3')
+        voiceovers = self.voiceovers(voiceover_range)
 
         random.shuffle(voiceovers)
 
         self.randomized_voiceovers = voiceovers
 
+        self.prefetch(VOICEOVER_DEFAULT)
+        self.prefetch_next()
+
         return self
 
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        """ Background thread of the prefetches """
+
+        if not cls._executor:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix='VoiceOverPrefetch'
+            )
+
+        return cls._executor
+
+    def prefetch_next(self) -> None:
+        """ Prefetch the voiceover which is played next """
+
+        if any(self.randomized_voiceovers):
+            self.prefetch(self.randomized_voiceovers[0])
+
+    def prefetch(self, voiceover: str) -> None:
+        """ Open a voiceover and read its subtitles in the background """
+
+        if not self._root_dir:
+            return
+
+        filename = self.voiceover_path(self._root_dir, os.environ['LANG'], voiceover)
+
+        if filename in self._prefetched:
+            return
+
+        self._prefetched[filename] = self.executor().submit(
+            self.fetch,
+            filename,
+            self._subtitles.get(filename)
+        )
+
+    @staticmethod
+    def fetch(filename: str, texts: list | None = None) -> tuple:
+        """ Open a voiceover and read its subtitles if not read yet """
+
+        sound = arcade.load_sound(filename, streaming=True)
+
+        if texts is None:
+            try:
+                texts = Subtitle.read(filename)
+            except OSError as e:
+                logging.error(e)
+                texts = []
+
+        return sound, texts
+
+    def take(self, filename: str) -> tuple:
+        """
+        Get a prefetched voiceover, fetch it now if it wasn't prefetched
+        @return: The sound and the subtitle lines
+        """
+
+        future = self._prefetched.pop(filename, None)
+
+        if not future:
+            logging.warning(label_value('Voiceover not prefetched', filename))
+            return self.fetch(filename, self._subtitles.get(filename))
+
+        return future.result()
+
     def on_speech_completed(self) -> None:
         """ Executed after voice playback is completed """
 
+        # The level was torn down while the speech was playing
+        if not self._callbacks:
+            return
+
         logging.info('Speech completed')
         self._subtitle.clear()
         self._media = None
@@ -72,6 +161,19 @@ class VoiceOverTiggers:
             self._music.volume = self._initial_volume
             self._music = None
 
+        self.prefetch_next()
+
+    @staticmethod
+    def voiceovers(voiceover_range: list) -> list:
+        """ Get the voiceover file names of a range """
+
+        voiceovers = []
+
+        for i in range(voiceover_range[0], voiceover_range[1]):
+            voiceovers.append("text" + str(i).rjust(2, '0') + '.mp3')
+
+        return voiceovers
+
     @staticmethod
     def voiceover_path(root_dir: str, language: str, voiceover: str) -> str:
         """ Get path to voiceover """
@@ -84,6 +186,7 @@ class VoiceOverTiggers:
             voiceover
         )
 
+    @trace
     def play_voiceover(
             self,
             delta_time: float,
@@ -98,11 +201,11 @@ class VoiceOverTiggers:
         logging.info(label_value('Play speech', voiceover))
 
         filename = self.voiceover_path(root_dir, os.environ['LANG'], voiceover)
-        sound = arcade.load_sound(filename, streaming=True)
+        sound, texts = self.take(filename)
 
         playback = sound.play(volume=audio_volumes.volume_speech_normalized)
         playback.on_player_eos = self.on_speech_completed
-        self._subtitle.load(filename)
+        self._subtitle.load(filename, texts)
 
         self._media = playback
 
@@ -123,6 +226,35 @@ class VoiceOverTiggers:
 
         return self.randomized_voiceovers.pop(0)
 
+    def teardown(self) -> None:
+        """ Stop the voiceover and release the references to the level """
+
+        pyglet.clock.unschedule(self.play_voiceover)
+
+        if self._media:
+            # Its end must not complete the level which is gone
+            del self._media.on_player_eos
+            arcade.stop_sound(self._media)
+
+        self._subtitle.clear()
+        self._subtitles = {}
+
+        for future in self._prefetched.values():
+            future.cancel()
+
+        self._prefetched = {}
+        self._media = None
+        self._music = None
+        self._missile_sound = None
+        self._tilemap = None
+        self._callbacks = None
+        self.launching_sprite = None
+
+    def refresh(self) -> None:
+        """ Refresh the subtitle glyphs after changing settings """
+
+        self._subtitle.prepare()
+
     def draw_subtitle(self) -> None:
         """ Draw subtitle """
 
@@ -165,44 +297,27 @@ class VoiceOverTiggers:
             self.launching_sprite.remove_from_sprite_lists()
             self.launching_sprite = None
 
-    def check_for_collision(
+    @trace
+    def trigger(
             self,
-            player,
-            scene,
+            found_sprite: Sprite,
+            found_layer: str,
             root_dir,
             volumes,
             music
     ) -> Sprite | None:
-        """ Check for collision with voiceover triggers"""
+        """ Launch a voiceover light the player has reached """
 
         if self.launching_sprite or self.playing:
             return None
 
-        found_sprite = None
-        found_layer = None
-        for layer in LAYERS_VOICEOVER:
-            if layer in scene:
-                for sprite in scene[layer]:
-                    if arcade.get_distance_between_sprites(
-                            player,
-                            sprite
-                    ) < LIGHT_COLLISION_CHECK_THRESHOLD:
-                        found_sprite = sprite
-                        found_layer = layer
-                        break
-
-        if not found_sprite:
-            return None
-
         logging.info(f'Collided with {found_layer}')
 
         self.launching_sprite = found_sprite
-        self.missile_sound = arcade.load_sound(
-            os.path.join(root_dir, 'resources', 'sounds',
-                         'lights',
-                         'missle-launch-001.mp3'),
-            streaming=True
-        ).play(volume=volumes.volume_sound_normalized)
+        self.missile_sound = arcade.get_window().sound_bank.play(
+            'lights/missle-launch-001.mp3',
+            volume=volumes.volume_sound_normalized
+        )
 
         self.playing = True
 
@@ -212,6 +327,9 @@ class VoiceOverTiggers:
             logging.error('No voiceovers left')
             return None
 
+        # Usually prefetched already, the launch animation gives it time
+        self.prefetch(voiceover)
+
         pyglet.clock.schedule_once(
             self.play_voiceover,
             2,
@@ -18,9 +18,11 @@ from app.constants.input.keyboard import (
     KEY_ESCAPE,
     KEY_SKIP_LEVEL, KEY_UNLOCK_DOUBLE_JUMP
 )
+from app.containers.level_data import LevelData
 from app.helpers.dev import is_frozen
 from app.state.settingsstate import SettingsState
 from app.utils.level import Level
+from app.utils.tracer import trace
 from app.views.view import View
 
 
@@ -51,10 +53,15 @@ class Game(View):
 
         self._camera_movement = (0, 0)
 
-    def setup_level(self, map_name: str):
+    def setup_level(self, map_name: str, level_data: LevelData | None = None):
         """ Setup level """
 
-        self._level.setup(self._root_dir, map_name, self.window.audio_volumes)
+        self._level.setup(
+            self._root_dir,
+            map_name,
+            self.window.audio_volumes,
+            level_data=level_data
+        )
 
     def on_update(self, delta_time: float) -> None:
         """ On update """
@@ -63,6 +70,7 @@ class Game(View):
             delta_time=delta_time
         )
 
+    @trace
     def on_fixed_update(self, delta_time: float):
         """ On level update """
 
@@ -192,4 +200,4 @@ class Game(View):
     def unsetup(self) -> None:
         """ Unsetup game """
 
-        self._level.unsetup()
+        self._level.teardown()
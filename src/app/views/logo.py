@@ -98,16 +98,10 @@ class Logo(View):
 
             if self._fade_sprite.alpha <= 0:
                 sound_number = random.randint(1, 5)
-                file = os.path.join(
-                    self._root_dir,
-                    'resources',
-                    'sounds',
-                    'grunt',
-                    f'{sound_number:03d}.mp3'
+                self.window.sound_bank.play(
+                    f'grunt/{sound_number:03d}.mp3',
+                    volume=self.window.audio_volumes.volume_sound_normalized
                 )
-                sound = arcade.load_sound(file, streaming=True)
-                sound.play(
-                    volume=self.window.audio_volumes.volume_sound_normalized)
 
                 self._phase = PHASE_WAIT
 
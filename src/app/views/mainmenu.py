@@ -16,7 +16,8 @@ from app.containers.effect_data import EffectData
 from app.effects.filmgrain import Filmgrain
 from app.effects.menu_particles import MenuParticles
 from app.state.savegamestate import SavegameState
-from app.state.settingsstate import SettingsState
+from app.state.settingsstate import SettingsState, EVENT_VOLUMES
+from app.utils.levelloader import LevelLoader
 from app.views.game import Game
 from app.views.tobecontinued import ToBeContinued
 from app.views.ui.settings.settings import Settings
@@ -48,7 +49,7 @@ class MainMenu(View):
         self._text_version = None
         self._text_load = None
 
-        self._scene2 = None
+        self._loader = None
         self._manager = None
         self._icon_itch_io = None
         self._icon_settings = None
@@ -63,15 +64,14 @@ class MainMenu(View):
 
         super().setup(root_dir)
 
-        self._scene2 = arcade.scene.Scene()
-
         # Background color
         arcade.set_background_color(BACKGROUND_COLOR)
         self.window.set_mouse_visible(not any(self.window.controllers))
 
         # Play music
         self.setup_music(root_dir)
-        self.setup_sounds(root_dir)
+        self.setup_sounds()
+        SettingsState.subscribe(EVENT_VOLUMES, self.on_change_volumes)
 
         self._effects = [
             MenuParticles(),
@@ -124,16 +124,16 @@ class MainMenu(View):
         if SavegameState.load().current_level == MAPS_FIRST:
             color = arcade.csscolor.WHITE
 
-        self._text_load = arcade.create_text_sprite(
+        self._text_load = arcade.Text(
             text=_('Loading...'),
+            x=0,
+            y=0,
             font_name=FONT_DEFAULT,
             font_size=FONT_SIZE,
-            color=color
+            color=color,
+            anchor_x='right'
         )
 
-        self._text_load.visible = False
-        self._scene2.add_sprite(SCENE_LAYER_TEXT, self._text_load)
-
         self._text_version = arcade.create_text_sprite(
             text=" ".join([_('Version'), VERSION_STRING]),
             font_name=FONT_DEFAULT,
@@ -181,13 +181,10 @@ class MainMenu(View):
             volume=self.window.audio_volumes.volume_music_normalized
         )
 
-    def setup_sounds(self, root_dir: str):
+    def setup_sounds(self):
         """ Setup sounds """
 
-        self._sound_hover = arcade.load_sound(
-            os.path.join(root_dir, 'resources', 'sounds', 'common',
-                         'hover.mp3'),
-        )
+        self._sound_hover = self.window.sound_bank.get('common/hover.mp3')
 
     def on_update(self, delta_time: float):
         """ On update """
@@ -201,8 +198,8 @@ class MainMenu(View):
         self._text_version.left = MARGIN
         self._text_version.bottom = MARGIN
 
-        self._text_load.right = self.window.width - MARGIN
-        self._text_load.bottom = MARGIN
+        self._text_load.x = self.window.width - MARGIN
+        self._text_load.y = MARGIN
 
         self._icon_itch_io.right = self.window.width - MARGIN
         self._icon_itch_io.bottom = MARGIN
@@ -241,10 +238,17 @@ class MainMenu(View):
             self.window.show_view(view)
             return
 
+        # Keep animating the menu until the level is loaded
+        if not self._loader.update():
+            return
+
         view = Game()
         view.setup(self._root_dir)
 
-        view.setup_level(save_game_state.current_level)
+        view.setup_level(
+            save_game_state.current_level,
+            level_data=self._loader.result()
+        )
 
         self.window.show_view(view)
 
@@ -259,7 +263,6 @@ class MainMenu(View):
             FADE_MAX
         )
 
-        self._text_load.visible = self._fade_sprite.alpha >= FADE_MAX
         self._music.volume = max(self._music.volume - MUSIC_FADE_SPEED, 0)
 
     def on_draw(self):
@@ -275,7 +278,7 @@ class MainMenu(View):
         if SCENE_LAYER_FADEIN in self._scene:
             self._scene[SCENE_LAYER_FADEIN].draw()
             if self._fade_sprite.alpha >= 255:
-                self._scene2.draw()
+                self._text_load.draw()
 
         for effect in self._effects:
             effect.draw()
@@ -375,6 +378,24 @@ class MainMenu(View):
         self._fade_sprite.alpha = 0
         self._scene.add_sprite(SCENE_LAYER_FADEIN, self._fade_sprite)
 
+        # Load the level in the background while fading out
+        current_level = SavegameState.load().current_level
+
+        if current_level is not None and not self._loader:
+            self._loader = LevelLoader(
+                self._root_dir,
+                current_level,
+                on_progress=self.on_load_progress
+            ).start()
+
+    def on_load_progress(self, progress: float) -> None:
+        """ On level loading progress """
+
+        text = f"{_('Loading...')} {int(progress * 100)}%"
+
+        if self._text_load.text != text:
+            self._text_load.text = text
+
     @staticmethod
     def on_itch_io() -> None:
         """ On open itch.io """
@@ -388,23 +409,14 @@ class MainMenu(View):
         self._scene[SCENE_LAYER_ICON].visible = False
         self._manager = Settings()
         self._manager.from_main_menu = True
-        self._manager.setup(on_close=self.on_close_settings,
-                            on_change=self.on_change_settings)
+        self._manager.setup(on_close=self.on_close_settings)
         self._manager.enable()
 
-    def on_change_settings(
-            self,
-            state: SettingsState = None,
-            refresh_particles: bool = False
-    ) -> None:
-        """ On change settings """
-        if state:
-            self._music.volume = state.audio_volumes.volume_music_normalized
-            self.window.audio_volumes = state.audio_volumes
-
-        if refresh_particles:
-            for effect in self._effects:
-                effect.refresh()
+    def on_change_volumes(self, state: SettingsState) -> None:
+        """ On change audio volumes """
+
+        self._music.volume = state.audio_volumes.volume_music_normalized
+        self.window.audio_volumes = state.audio_volumes
 
     def on_close_settings(self, new_manager=None) -> None:
         """ On close settings"""
@@ -47,8 +47,7 @@ class PauseMenu(arcade.View):
 
             self._manager.disable()
             self._manager2 = Settings()
-            self._manager2.setup(self.on_close_settings,
-                                 self.on_change_settings)
+            self._manager2.setup(self.on_close_settings)
 
         btn_exit_to_menu = make_button(text=_('Back to Menu'))
 
@@ -176,7 +175,7 @@ class PauseMenu(arcade.View):
         if key == KEY_START:
             self.on_continue()
 
-    def on_close_settings(self, new_manager=None, on_change=None):
+    def on_close_settings(self, new_manager=None):
         """ On close settings """
 
         self._manager2.disable()
@@ -185,8 +184,3 @@ class PauseMenu(arcade.View):
             return
 
         self._manager.enable()
-
-    def on_change_settings(self, refresh_particles=False):
-        """ On change settings """
-
-        return
@@ -10,16 +10,17 @@ from app.helpers.gui import make_label, make_button, make_slider, \
     make_ui_anchor_layout
 from app.helpers.localization import bool_to_on_off
 from app.helpers.string import label_value
+from app.state.settingsstate import EVENT_VOLUMES
 from app.views.ui.settings.settingsui import SettingsUi
 
 
 class Audio(SettingsUi):
     """ Audio settings menu """
 
-    def setup(self, on_close: callable, on_change: callable) -> None:
+    def setup(self, on_close: callable) -> None:
         """ Setup settings """
 
-        super().setup(on_close, on_change)
+        super().setup(on_close)
 
         grid = arcade.gui.UIGridLayout(column_count=3, row_count=1)
 
@@ -127,39 +128,37 @@ class Audio(SettingsUi):
         """ master volume changed """
 
         self._state.audio_volumes.volume_master = int(event.new_value)
-        self._on_change(self._state)
+        self._state.publish(EVENT_VOLUMES)
 
     def on_change_volume_sound(self, event: UIOnChangeEvent) -> None:
         """ Sound volume changed """
 
         self._state.audio_volumes.volume_sound = int(event.new_value)
-        self._on_change(self._state)
+        self._state.publish(EVENT_VOLUMES)
 
     def on_change_volume_speech(self, event: UIOnChangeEvent) -> None:
         """ Speech volume changed """
 
         self._state.audio_volumes.volume_speech = int(event.new_value)
-        self._on_change(self._state)
+        self._state.publish(EVENT_VOLUMES)
 
     def on_change_volume_music(self, event: UIOnChangeEvent) -> None:
         """ On change music volume """
 
         self._state.audio_volumes.volume_music = int(event.new_value)
-        self._on_change(self._state)
+        self._state.publish(EVENT_VOLUMES)
 
     def on_change_subtitle_size(self, event: UIOnChangeEvent) -> None:
         """ On change subtitle size """
 
         self._state.subtitle_size = int(event.new_value)
-        self._on_change(self._state)
 
     def on_toggle_subtitles(self, event: UIOnClickEvent) -> None:
         """ On toggle subtitles """
 
         self._state.subtitle_enabled = not self._state.subtitle_enabled
-        self._on_change(self._state)
         self._state.save()
-        self.setup(self._on_close, self._on_change)
+        self.setup(self._on_close)
 
     def on_change_driver(self, event: UIOnClickEvent) -> None:
         """ On change driver """
@@ -188,4 +187,4 @@ class Audio(SettingsUi):
     def refresh(self) -> None:
         """ On refresh view  """
 
-        self.setup(self._on_close, self._on_change)
+        self.setup(self._on_close)
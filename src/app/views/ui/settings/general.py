@@ -20,10 +20,10 @@ class General(SettingsUi):
 
         self._btn_languages = {}
 
-    def setup(self, on_close: callable, on_change: callable) -> None:
+    def setup(self, on_close: callable) -> None:
         """ Setup settings """
 
-        super().setup(on_close, on_change)
+        super().setup(on_close)
 
         self._btn_languages = {}
 
@@ -72,7 +72,7 @@ class General(SettingsUi):
     def refresh(self) -> None:
         """ On refresh """
 
-        self.setup(self._on_close, self._on_change)
+        self.setup(self._on_close)
 
     def on_toggle_vibration(self, event: UIOnClickEvent) -> None:
 
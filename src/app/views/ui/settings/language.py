@@ -19,10 +19,10 @@ class Language(SettingsUi):
 
         self._btn_languages = {}
 
-    def setup(self, on_close: callable, on_change: callable) -> None:
+    def setup(self, on_close: callable) -> None:
         """ Setup settings """
 
-        super().setup(on_close, on_change)
+        super().setup(on_close)
 
         self._btn_languages = {}
 
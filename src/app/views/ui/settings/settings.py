@@ -17,10 +17,10 @@ from app.views.ui.settings.video import Video
 class Settings(SettingsUi):
     """ Settings menu """
 
-    def setup(self, on_close: callable, on_change: callable) -> None:
+    def setup(self, on_close: callable) -> None:
         """ Setup settings """
 
-        super().setup(on_close, on_change)
+        super().setup(on_close)
 
         btn_back = make_button(text=_('Back'))
         btn_back.on_click = self.on_back
@@ -58,7 +58,7 @@ class Settings(SettingsUi):
 
         self.disable()
         menu = Video()
-        menu.setup(self.on_enable, self._on_change)
+        menu.setup(self.on_enable)
         self._on_close(menu)
 
     def on_audio(self, event: UIOnClickEvent) -> None:
@@ -66,7 +66,7 @@ class Settings(SettingsUi):
 
         self.disable()
         menu = Audio()
-        menu.setup(self.on_enable, self._on_change)
+        menu.setup(self.on_enable)
         self._on_close(menu)
 
     def on_general(self, event: UIOnClickEvent) -> None:
@@ -74,7 +74,7 @@ class Settings(SettingsUi):
 
         self.disable()
         menu = General()
-        menu.setup(self.on_enable, self._on_change)
+        menu.setup(self.on_enable)
         self._on_close(menu)
 
     def on_language(self, event: UIOnClickEvent) -> None:
@@ -82,7 +82,7 @@ class Settings(SettingsUi):
 
         self.disable()
         menu = Language()
-        menu.setup(self.on_enable, self._on_change)
+        menu.setup(self.on_enable)
         self._on_close(menu)
 
     def on_delete_savegame(
@@ -108,22 +108,19 @@ class Settings(SettingsUi):
         message_box.on_action = self.on_delete_savegame
         self.add(message_box)
 
-    def on_enable(self, refresh_particles: bool = False):
+    def on_enable(self):
         """ On enable settings """
 
         self.enable()
         self._on_close(self)
 
-    def on_back(self, event, refresh_particles=False):
+    def on_back(self, event):
         """ On go back """
 
-        if refresh_particles:
-            self._on_change(refresh_particles=True)
-
         self.disable()
         self._on_close()
 
     def refresh(self):
         """ On refresh view """
 
-        self.setup(self._on_close, self._on_change)
+        self.setup(self._on_close)
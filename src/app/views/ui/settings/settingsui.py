@@ -16,19 +16,17 @@ class SettingsUi(arcade.gui.UIManager):
         self._state = None
         self._old_state = None
         self._on_close = None
-        self._on_change = None
         self._from_main_menu = False
 
-    def setup(self, on_close: callable, on_change: callable) -> None:
+    def setup(self, on_close: callable) -> None:
         """ Setup settings UI"""
 
         self._on_close = on_close
-        self._on_change = on_change
 
         self._state = SettingsState.load()
 
         if not self._old_state:
-            self._old_state = SettingsState.load()
+            self._old_state = self._state.copy()
 
         self.disable()
         self.clear()
@@ -17,10 +17,10 @@ from app.views.ui.settings.settingsui import SettingsUi
 class Video(SettingsUi):
     """ Video settings menu """
 
-    def setup(self, on_close: callable, on_change: callable) -> None:
+    def setup(self, on_close: callable) -> None:
         """ Setup settings """
 
-        super().setup(on_close, on_change)
+        super().setup(on_close)
 
         grid = arcade.gui.UIGridLayout(
             column_count=3,
@@ -78,6 +78,22 @@ class Video(SettingsUi):
         btn_antialiasing.on_click = self.on_change_antialiasing
         grid.add(btn_toggle_fps, col_num=3, row_num=0)
 
+        btn_toggle_bake_layers = make_button(
+            text=label_value(
+                _('Baked layers'),
+                bool_to_on_off(self._state.bake_layers)
+            )
+        )
+        btn_toggle_bake_layers.on_click = self.on_toggle_bake_layers
+
+        btn_toggle_quality_auto = make_button(
+            text=label_value(
+                _('Auto quality'),
+                bool_to_on_off(self._state.quality_auto)
+            )
+        )
+        btn_toggle_quality_auto.on_click = self.on_toggle_quality_auto
+
         label_particles = make_label(text=_('Particles amount'))
         slider_particles = make_slider(value=self._state.particles,
                                        min_value=0.1, max_value=1.0)
@@ -90,6 +106,8 @@ class Video(SettingsUi):
             btn_fps_limit,
             btn_toggle_fps,
             btn_antialiasing,
+            btn_toggle_bake_layers,
+            btn_toggle_quality_auto,
             label_particles,
             slider_particles,
         ]
@@ -102,6 +120,7 @@ class Video(SettingsUi):
 
         compares = [
             (self._old_state.antialiasing, self._state.antialiasing),
+            (self._old_state.quality_auto, self._state.quality_auto),
             (self.window.fullscreen, self._state.fullscreen),
         ]
 
@@ -141,6 +160,20 @@ class Video(SettingsUi):
         self._state.save()
         self.refresh()
 
+    def on_toggle_bake_layers(self, event: UIOnClickEvent) -> None:
+        """ On toggle baked layers """
+
+        self._state.bake_layers = not self._state.bake_layers
+        self._state.save()
+        self.refresh()
+
+    def on_toggle_quality_auto(self, event: UIOnClickEvent) -> None:
+        """ On toggle auto quality """
+
+        self._state.quality_auto = not self._state.quality_auto
+        self._state.save()
+        self.refresh()
+
     def on_toggle_vsync(self, event: UIOnClickEvent) -> None:
         """ On toggle vsync """
 
@@ -158,7 +191,6 @@ class Video(SettingsUi):
 
         self._state.particles = float(event.new_value)
         self._state.save()
-        self._on_change(refresh_particles=True)
 
     def on_change_fps_limit(self, event):
         """ On change fps limit  """
@@ -204,4 +236,4 @@ class Video(SettingsUi):
     def refresh(self):
         """ On refresh view """
 
-        self.setup(self._on_close, self._on_change)
+        self.setup(self._on_close)
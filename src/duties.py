@@ -1,5 +1,7 @@
 """ Duty tasks """
 
+import os
+
 from duty import duty
 from duty.context import Context
 
@@ -25,3 +27,19 @@ def pylint(ctx: Context):
     """ Lint  code """
 
     print(ctx.run('pylint .'))
+
+
+@duty
+def atlas(ctx: Context):
+    """ Generate the texture atlas manifests of the maps """
+
+    # pylint: disable=import-outside-toplevel
+    from app.constants.gameinfo import MAPS
+    from app.utils.atlasmanifest import AtlasManifest
+
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+
+    for map_name in MAPS:
+        manifest = AtlasManifest.build(root_dir, map_name)
+        path = manifest.save(root_dir, map_name)
+        print(f"{path}: {manifest.size}, bypass {manifest.bypass}")